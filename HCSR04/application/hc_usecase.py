@@ -2,7 +2,7 @@
 from HCSR04.domain.entities.hc_sensor import HCSensorData
 from HCSR04.domain.repositories.hc_repository import HCSensorRepository
 from HCSR04.domain.ports.mqtt_publisher import MQTTPublisher
-from typing import List
+from typing import Dict, List, Optional
 import asyncio
 
 class HCUseCase:
@@ -11,29 +11,35 @@ class HCUseCase:
         self.repository = repository
         self.publisher = publisher
         self.is_connected = is_connected
-        self.consecutive_errors = 0
+        # Errores seguidos por nodo: las lecturas de cada ESP32 corren en paralelo
+        self.consecutive_errors: Dict[Optional[str], int] = {}
         self.max_consecutive_errors = 3
 
-    async def execute(self, project_id=1, event=False):
+    async def execute(self, project_id: Optional[int] = None, event=False, device_id=None):
+        """Sin project_id, el proyecto asignado al nodo que dio la lectura (HC_BLE_DEVICE_PROJECTS)."""
         try:
-            raw = await self.reader.read_async()
+            raw = await self.reader.read_async(device_id) if device_id else await self.reader.read_async()
             
             if not raw or 'distancia_cm' not in raw:
-                self.consecutive_errors += 1
-                if self.consecutive_errors <= self.max_consecutive_errors:
-                    print(f"🟡 HC-SR04: Sin datos del ESP32 (intento {self.consecutive_errors}/{self.max_consecutive_errors})")
+                errors = self._count_error(device_id)
+                if errors <= self.max_consecutive_errors:
+                    print(f"🟡 HC-SR04: Sin datos del ESP32{self._label(device_id)} (intento {errors}/{self.max_consecutive_errors})")
                 return None
 
-            self.consecutive_errors = 0
+            self.consecutive_errors.pop(device_id, None)
 
             distance = raw['distancia_cm']
             if distance <= 0 or distance > 400:
                 print(f"🟡 HC-SR04: Distancia fuera de rango: {distance} cm")
                 return None
 
+            if project_id is None:
+                project_id = self.project_for(raw.get('device_id') or device_id)
+
             data = HCSensorData(
                 id_project=project_id, 
                 distancia_cm=distance,
+                device_id=raw.get('device_id'),
                 event=event
             )
             
@@ -52,11 +58,18 @@ class HCUseCase:
             return data
             
         except Exception as e:
-            self.consecutive_errors += 1
-            if self.consecutive_errors <= self.max_consecutive_errors:
-                print(f"🔴 HC-SR04: Error en execute - {e}")
+            if self._count_error(device_id) <= self.max_consecutive_errors:
+                print(f"🔴 HC-SR04: Error en execute{self._label(device_id)} - {e}")
             return None
 
+    def _count_error(self, device_id: Optional[str]) -> int:
+        self.consecutive_errors[device_id] = self.consecutive_errors.get(device_id, 0) + 1
+        return self.consecutive_errors[device_id]
+
+    @staticmethod
+    def _label(device_id: Optional[str]) -> str:
+        return f" [{device_id}]" if device_id else ""
+
     async def create(self, data: HCSensorData):
         if not data.event:
             return {"msg": "No se almacenó porque event es False", "success": True}
@@ -151,9 +164,20 @@ class HCUseCase:
             print(f"🔴 HC-SR04: Error al obtener último dato - {e}")
             return None
 
+    def project_for(self, device_id: Optional[str]) -> int:
+        project_for = getattr(self.reader, "project_for", None)
+        return project_for(device_id) if device_id and project_for else 1
+
+    def list_devices(self) -> List[dict]:
+        devices = getattr(self.reader, "devices", None)
+        return devices() if devices else []
+
     def get_connection_status(self) -> dict:
         return {
             "reader_connected": hasattr(self.reader, 'is_connected') and self.reader.is_connected,
-            "consecutive_errors": self.consecutive_errors,
+            "consecutive_errors": max(self.consecutive_errors.values(), default=0),
+            "consecutive_errors_by_device": {
+                device_id or "default": errors for device_id, errors in self.consecutive_errors.items()
+            },
             "max_errors": self.max_consecutive_errors
         }
\ No newline at end of file
@@ -7,6 +7,7 @@ class HCSensorData(BaseModel):
     id: Optional[int] = None
     id_project: int
     distancia_cm: float
+    device_id: Optional[str] = None  # Nodo ESP32 que tomó la medición
     event: bool = False
     timestamp: datetime = datetime.utcnow()
 
@@ -0,0 +1,50 @@
+# HCSR04/infraestructure/ble/address_cache.py
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+class BLEAddressCache:
+    """
+    Últimas direcciones BLE conocidas {clave: dirección} en un archivo JSON local,
+    para reconectar directo sin escanear tras un reinicio del backend.
+    Se escribe de forma atómica (archivo temporal + os.replace).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("HC_BLE_CACHE_PATH", "./hc_ble_devices.json")
+        self._lock = threading.Lock()
+        self._data: Dict[str, str] = self._read()
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ HC-SR04 BLE: caché de direcciones ilegible ({self.path}): {e}")
+            return {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._data.get(key)
+
+    def all(self) -> Dict[str, str]:
+        return dict(self._data)
+
+    def set(self, key: str, address: str) -> None:
+        if self._data.get(key) == address:
+            return
+        with self._lock:
+            self._data[key] = address
+            tmp = f"{self.path}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"⚠️ HC-SR04 BLE: no se pudo guardar la caché de direcciones: {e}")
@@ -0,0 +1,217 @@
+# HCSR04/infraestructure/ble/hc_ble_manager.py
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from bleak import BleakScanner
+from HCSR04.domain.ports.ble_reader import BLEReader
+from HCSR04.infraestructure.ble.address_cache import BLEAddressCache
+from HCSR04.infraestructure.ble.hc_ble_reader import HCBLEReader
+
+
+def parse_device_projects(value: Optional[str]) -> Dict[str, int]:
+    """HC_BLE_DEVICE_PROJECTS="ESP32_SensorBLE_A=3,ESP32_SensorBLE_B=4" -> {device_id: id_project}."""
+    projects = {}
+    for item in (value or "").split(","):
+        device, _, project = item.partition("=")
+        if device.strip() and project.strip().isdigit():
+            projects[device.strip()] = int(project)
+    return projects
+
+
+class HCBLEManager(BLEReader):
+    """
+    Conexiones BLE concurrentes a varios nodos ESP32 con HC-SR04.
+
+    - Descubre dispositivos cuyo nombre empieza con `name_filter` o que anuncian
+      `service_uuid`, hasta `max_devices`. Los conocidos de la caché se conectan
+      directo al arrancar, sin esperar el escaneo.
+    - Cada dispositivo tiene su propio HCBLEReader (SampleRing y supervisor de
+      conexión), así un nodo lento o caído no frena a los demás.
+    - device_id = nombre anunciado; si dos nodos anuncian el mismo nombre, el
+      segundo se identifica como "<nombre>@<dirección>".
+    El escaneo periódico se espacia (hasta max_scan_interval) mientras no aparezcan
+    nodos nuevos, para no competir con las conexiones activas por la radio.
+    """
+
+    def __init__(
+        self,
+        name_filter: str = "ESP32_SensorBLE",
+        char_uuid: str = "beb5483e-36e1-4688-b7f5-ea07361b26a8",
+        service_uuid: Optional[str] = None,
+        max_devices: int = 8,
+        scan_timeout: float = 5.0,
+        scan_interval: float = 30.0,
+        max_scan_interval: float = 300.0,
+        address_cache: Optional[BLEAddressCache] = None,
+        device_projects: Optional[Dict[str, int]] = None,
+        default_project: int = 1,
+        client_factory=None,
+        scanner=None,
+    ):
+        self.name_filter = name_filter
+        self.char_uuid = char_uuid
+        self.service_uuid = service_uuid.lower() if service_uuid else None
+        self.max_devices = max_devices
+        self.scan_timeout = scan_timeout
+        self.scan_interval = scan_interval
+        self.max_scan_interval = max_scan_interval
+        self.address_cache = address_cache
+        self.device_projects = device_projects or {}
+        self.default_project = default_project
+        self.client_factory = client_factory
+        self.scanner = scanner
+        self.readers: Dict[str, HCBLEReader] = {}
+        self._discovery: Optional[asyncio.Task] = None
+        self.stats = {"scans": 0, "discovered": 0}
+
+    @property
+    def is_connected(self) -> bool:
+        return any(reader.is_connected for reader in self.readers.values())
+
+    def _matches(self, device, adv) -> bool:
+        name = device.name or adv.local_name or ""
+        if self.name_filter and name.startswith(self.name_filter):
+            return True
+        return bool(self.service_uuid and self.service_uuid in (u.lower() for u in adv.service_uuids))
+
+    def _add_reader(self, device_id: str, name: str, address: Optional[str]) -> HCBLEReader:
+        reader = HCBLEReader(
+            device_name=name,
+            char_uuid=self.char_uuid,
+            address_cache=self.address_cache,
+            device_id=device_id,
+            device_address=address,
+            client_factory=self.client_factory,
+            scanner=self.scanner,
+        )
+        self.readers[device_id] = reader
+        if address and self.address_cache:
+            self.address_cache.set(device_id, address)
+        if self._discovery is not None:
+            reader.start()
+        return reader
+
+    def _device_id(self, name: str, address: str) -> str:
+        known = self.readers.get(name)
+        if known is None or known.device_address in (None, address):
+            return name
+        return f"{name}@{address}"
+
+    async def _scan_once(self) -> int:
+        """Escaneo completo; registra los nodos nuevos que coinciden con el filtro."""
+        self.stats["scans"] += 1
+        found = await (self.scanner or BleakScanner).discover(timeout=self.scan_timeout, return_adv=True)
+        known = {reader.device_address for reader in self.readers.values()}
+        added = 0
+        for device, adv in found.values():
+            if len(self.readers) >= self.max_devices:
+                break
+            if device.address in known or not self._matches(device, adv):
+                continue
+            name = device.name or adv.local_name or device.address
+            device_id = self._device_id(name, device.address)
+            self._add_reader(device_id, name, device.address)
+            known.add(device.address)
+            added += 1
+            print(f"✅ HC-SR04 BLE: Nodo nuevo {device_id} | {device.address}")
+        self.stats["discovered"] += added
+        return added
+
+    async def _discover_loop(self):
+        interval = self.scan_interval
+        while True:
+            if len(self.readers) < self.max_devices:
+                try:
+                    if await self._scan_once():
+                        interval = self.scan_interval
+                    else:
+                        interval = min(interval * 2, self.max_scan_interval)
+                except Exception as e:
+                    print(f"🔵 HC-SR04 BLE: Error en escaneo - {e}")
+            await asyncio.sleep(interval)
+
+    def start(self):
+        """Conecta los nodos de la caché y lanza el descubrimiento (desde el event loop)."""
+        if self.address_cache:
+            for device_id, address in self.address_cache.all().items():
+                if device_id not in self.readers and len(self.readers) < self.max_devices:
+                    self._add_reader(device_id, device_id.split("@")[0], address)
+        if self._discovery is None or self._discovery.done():
+            self._discovery = asyncio.create_task(self._discover_loop())
+        for reader in self.readers.values():
+            reader.start()
+
+    async def stop(self):
+        if self._discovery is not None:
+            self._discovery.cancel()
+            try:
+                await self._discovery
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._discovery = None
+        await asyncio.gather(*(reader.stop() for reader in self.readers.values()), return_exceptions=True)
+
+    def get(self, device_id: Optional[str] = None) -> Optional[HCBLEReader]:
+        """El lector de `device_id`, o sin id el primero conectado (compatibilidad con un solo nodo)."""
+        if device_id is not None:
+            return self.readers.get(device_id)
+        connected = [reader for reader in self.readers.values() if reader.is_connected]
+        if connected:
+            return connected[0]
+        return next(iter(self.readers.values()), None)
+
+    def project_for(self, device_id: str) -> int:
+        return self.device_projects.get(device_id, self.default_project)
+
+    def connected_devices(self) -> List[str]:
+        return [device_id for device_id, reader in self.readers.items() if reader.is_connected]
+
+    async def read_async(self, device_id: Optional[str] = None) -> dict | None:
+        reader = self.get(device_id)
+        return await reader.read_async() if reader else None
+
+    def read(self, device_id: Optional[str] = None) -> dict | None:
+        """Última muestra sin I/O (el supervisor de cada nodo mantiene la conexión)."""
+        reader = self.get(device_id)
+        sample = reader.latest() if reader else None
+        if sample is None:
+            return None
+        return {"distancia_cm": sample.distancia_cm, "device_id": reader.device_id}
+
+    def devices(self) -> List[dict]:
+        result = []
+        for device_id, reader in self.readers.items():
+            sample = reader.latest()
+            result.append({
+                "device_id": device_id,
+                "name": reader.device_name,
+                "address": reader.device_address,
+                "connected": reader.is_connected,
+                "id_project": self.project_for(device_id),
+                "distancia_cm": sample.distancia_cm if sample else None,
+                "samples": reader.samples.total,
+            })
+        return result
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "max_devices": self.max_devices,
+            "devices": {device_id: reader.get_stats() for device_id, reader in self.readers.items()},
+        }
+
+
+def manager_from_env(name_filter: str, char_uuid: str, client_factory=None, scanner=None) -> HCBLEManager:
+    """Gestor configurado por entorno; con un backend inyectado (simulación) no se usa la caché de direcciones."""
+    simulated = client_factory is not None or scanner is not None
+    return HCBLEManager(
+        name_filter=os.getenv("HC_BLE_NAME_FILTER", name_filter),
+        char_uuid=char_uuid,
+        service_uuid=os.getenv("HC_BLE_SERVICE_UUID") or None,
+        max_devices=int(os.getenv("HC_BLE_MAX_DEVICES", "8")),
+        address_cache=None if simulated else BLEAddressCache(),
+        device_projects=parse_device_projects(os.getenv("HC_BLE_DEVICE_PROJECTS")),
+        client_factory=client_factory,
+        scanner=scanner,
+    )
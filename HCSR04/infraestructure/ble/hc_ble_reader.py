@@ -1,102 +1,266 @@
 # HCSR04/infraestructure/ble/hc_ble_reader.py
 import asyncio
 import json
+import random
+import struct
 import time
+from typing import List, NamedTuple, Optional
+
 from bleak import BleakClient, BleakScanner
 from HCSR04.domain.ports.ble_reader import BLEReader
+from HCSR04.infraestructure.ble.address_cache import BLEAddressCache
+from core.sample_ring import SampleRing
+from core.stream_log import stream_writer
+
+# Formato binario de la característica (little-endian):
+#   magic 0xA5 | count (u8) | seq (u16) | interval_ms (u16) | count × distancia_mm (u16)
+# La última muestra es la más reciente; 0xFFFF = sin eco. seq permite contar notificaciones perdidas.
+# Si el primer byte es '{' se interpreta el formato JSON anterior: {"distance": 12.3} o {"distance": [..]}.
+BINARY_MAGIC = 0xA5
+JSON_START = 0x7B
+NO_ECHO = 0xFFFF
+MAX_DISTANCE_CM = 400.0
+_HEADER = struct.Struct("<BBHH")
+_SAMPLES = [struct.Struct(f"<{n}H") for n in range(256)]  # Precompilados por cantidad de muestras
+
+
+class HCSample(NamedTuple):
+    timestamp: float   # epoch (s) estimado de la medición
+    monotonic: float   # reloj monotónico para calcular antigüedad
+    distancia_cm: float
+
+
+_new_sample = tuple.__new__  # Evita el __new__ en Python de NamedTuple en el camino caliente
+
 
 class HCBLEReader(BLEReader):
-    def __init__(self, device_name="ESP32_SensorBLE", char_uuid="beb5483e-36e1-4688-b7f5-ea07361b26a8"):
+    """
+    Lector BLE del HC-SR04 (ESP32).
+    El handler de notificaciones corre en el event loop: decodifica el lote
+    (binario o JSON), guarda cada muestra con timestamp en un SampleRing y solo
+    actualiza contadores; no hay prints en el camino caliente.
+
+    Conexión: start() lanza un supervisor que intenta primero la conexión directa
+    a la última dirección conocida (persistida en BLEAddressCache) y solo si falla
+    hace un escaneo dirigido (se detiene al primer dispositivo que coincide).
+    Los reintentos usan backoff exponencial con jitter; una desconexión despierta
+    al supervisor al instante vía disconnected_callback.
+    """
+
+    def __init__(self, device_name="ESP32_SensorBLE", char_uuid="beb5483e-36e1-4688-b7f5-ea07361b26a8",
+                 buffer_size=512, max_age=5.0, address_cache: Optional[BLEAddressCache] = None,
+                 connect_timeout=5.0, scan_timeout=5.0, backoff_min=0.5, backoff_max=30.0,
+                 device_id: Optional[str] = None, device_address: Optional[str] = None,
+                 client_factory=None, scanner=None):
         self.device_name = device_name
+        self.device_id = device_id or device_name  # Clave en la caché y en la API
         self.char_uuid = char_uuid
-        self.device_address = None
+        self.address_cache = address_cache
+        self.device_address = device_address or (address_cache.get(self.device_id) if address_cache else None)
         self.client = None
-        self.latest_data = None
+        # Backend BLE: BleakClient/BleakScanner salvo que se inyecte otro (p. ej. la radio simulada)
+        self.client_factory = client_factory
+        self.scanner = scanner
         self.is_connected = False
+        self.max_age = max_age
+        self.connect_timeout = connect_timeout
+        self.scan_timeout = scan_timeout
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self._supervisor: Optional[asyncio.Task] = None
+        self._link_lost = asyncio.Event()
+        self._lost_at: Optional[float] = None
+        self.samples: SampleRing[HCSample] = SampleRing(buffer_size)
+        self._last_seq: Optional[int] = None
+        self._record = stream_writer(f"hcsr04/{self.device_id}")  # Payloads crudos (RECORD_STREAMS)
+        self.stats = {
+            "notifications": 0,
+            "binary": 0,
+            "json": 0,
+            "invalid_samples": 0,
+            "decode_errors": 0,
+            "lost_notifications": 0,
+            "connects": 0,
+            "direct_connects": 0,
+            "scans": 0,
+            "disconnects": 0,
+            "last_reconnect_s": None,
+        }
+
+    def _matches(self, device, adv) -> bool:
+        if self.device_address and device.address == self.device_address:
+            return True
+        # Por nombre solo si el id es el nombre (nodos con nombre repetido se identifican por dirección)
+        return self.device_id == self.device_name and self.device_name in (device.name, adv.local_name)
 
     async def discover_device(self):
+        """Escaneo dirigido: termina apenas aparece el dispositivo (hasta scan_timeout)."""
+        self.stats["scans"] += 1
         try:
-            print("🔎 Escaneando dispositivos BLE...")
-            devices = await BleakScanner.discover(timeout=10.0)
-            
-            for device in devices:
-                print(f"🔍 Dispositivo encontrado: {device.name} | {device.address}")
-                if device.name == self.device_name:
-                    self.device_address = device.address
-                    print(f"✅ ESP32 encontrada: {device.name} | {device.address}")
-                    return True
-                    
-            print("❌ No se encontró la ESP32. Verifica que esté encendida.")
-            return False
+            print(f"🔎 HC-SR04 BLE: Buscando {self.device_id}...")
+            device = await (self.scanner or BleakScanner).find_device_by_filter(self._matches, timeout=self.scan_timeout)
+            if device is None:
+                print("❌ No se encontró la ESP32. Verifica que esté encendida.")
+                return False
+            self.device_address = device.address
+            if self.address_cache:
+                self.address_cache.set(self.device_id, device.address)
+            print(f"✅ ESP32 encontrada: {device.name} | {device.address}")
+            return True
         except Exception as e:
             print(f"🔵 HC-SR04 BLE: Error en descubrimiento - {e}")
             return False
 
     def _notification_handler(self, sender, data):
+        stats = self.stats
+        stats["notifications"] += 1
+        if self._record is not None:
+            self._record(data)
         try:
-            raw_data = data.decode('utf-8')
-            print(f"📩 Notificación recibida: {raw_data}")
-            
-            json_data = json.loads(raw_data)
-            
-            distance = json_data.get('distance')
-            
-            if distance is not None and distance > 0:
-                self.latest_data = {
-                    "distancia_cm": float(distance),
-                    "timestamp": time.time()
-                }
-                print(f"📩 HC-SR04 BLE: {distance} cm")
-            elif distance is None:
-                print("📩 HC-SR04 BLE: Sin lectura del sensor (null)")
+            if data and data[0] == BINARY_MAGIC:
+                self._ingest_binary(data)
+            elif data and data[0] == JSON_START:
+                self._ingest_json(data)
             else:
-                print(f"📩 HC-SR04 BLE: Distancia inválida: {distance}")
-                
-        except json.JSONDecodeError as e:
-            print(f"🔵 HC-SR04 BLE: Error JSON - {e}")
-            print(f"🔍 Datos recibidos (raw): {data}")
-        except Exception as e:
-            print(f"🔵 HC-SR04 BLE: Error inesperado - {e}")
+                stats["decode_errors"] += 1
+        except (struct.error, ValueError, TypeError):
+            stats["decode_errors"] += 1
 
-    async def connect(self):
-        try:
-            if not await self.discover_device():
-                return False
+    def _ingest_binary(self, data):
+        _, count, seq, interval_ms = _HEADER.unpack_from(data)
+        distances = _SAMPLES[count].unpack_from(data, _HEADER.size)
+        self.stats["binary"] += 1
+        last_seq = self._last_seq
+        if last_seq is not None:
+            gap = (seq - last_seq - 1) & 0xFFFF
+            if gap < 0x8000:  # Un salto "hacia atrás" es un reinicio de la ESP32, no una pérdida
+                self.stats["lost_notifications"] += gap
+        self._last_seq = seq
+        self._push(distances, interval_ms / 1000.0, scale=0.1)
 
-            if self.client:
-                try:
-                    if self.client.is_connected:
-                        await self.client.disconnect()
-                except:
-                    pass
-                self.client = None
+    def _ingest_json(self, data):
+        distance = json.loads(data).get("distance")
+        self.stats["json"] += 1
+        if distance is None:
+            self.stats["invalid_samples"] += 1
+            return
+        self._push(distance if isinstance(distance, list) else (distance,), 0.0, scale=1.0)
 
-            self.client = BleakClient(self.device_address)
-            
-            await self.client.connect()
-            
-            if self.client.is_connected:
-                print("🔗 Conectado con la ESP32")
-                
-                await self.client.start_notify(self.char_uuid, self._notification_handler)
-                print("🎧 Escuchando datos BLE...")
-                
-                self.is_connected = True
-                return True
+    def _push(self, values, interval: float, scale: float):
+        """Muestras de la más vieja a la más nueva, espaciadas `interval` s; la última es ~ahora."""
+        now, mono = time.time(), time.monotonic()
+        age = (len(values) - 1) * interval
+        push = self.samples.push
+        invalid = 0
+        for raw in values:
+            # None (JSON) y NO_ECHO (6553.5 cm) caen fuera de rango
+            distance = raw * scale if raw is not None else 0.0
+            if 0 < distance <= MAX_DISTANCE_CM:
+                push(_new_sample(HCSample, (now - age, mono - age, float(distance))))
             else:
-                print("❌ No se pudo conectar a la ESP32.")
-                return False
-                
+                invalid += 1
+            age -= interval
+        if invalid:
+            self.stats["invalid_samples"] += invalid
+
+    def latest(self) -> Optional[HCSample]:
+        """Última muestra, o None si es más vieja que max_age."""
+        sample = self.samples.latest()
+        if sample is None or time.monotonic() - sample.monotonic > self.max_age:
+            return None
+        return sample
+
+    def window(self, n: Optional[int] = None) -> List[HCSample]:
+        return self.samples.window(n)
+
+    def get_stats(self) -> dict:
+        return {
+            "device_id": self.device_id,
+            "address": self.device_address,
+            "connected": self.is_connected,
+            "samples": self.samples.total,
+            **self.stats,
+        }
+
+    def _on_disconnect(self, client):
+        if client is not self.client:
+            return
+        self.is_connected = False
+        self.stats["disconnects"] += 1
+        self._lost_at = time.monotonic()
+        self._link_lost.set()
+
+    async def _connect_to(self, address: str) -> bool:
+        client = (self.client_factory or BleakClient)(address, disconnected_callback=self._on_disconnect, timeout=self.connect_timeout)
+        try:
+            self.client = client
+            await client.connect()
+            await client.start_notify(self.char_uuid, self._notification_handler)
         except Exception as e:
-            print(f"🔵 HC-SR04 BLE: Error de conexión - {e}")
-            self.is_connected = False
-            if self.client:
-                try:
+            print(f"🔵 HC-SR04 BLE: Error de conexión con {address} - {e}")
+            self.client = None
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
+            return False
+
+        self.is_connected = True
+        self._link_lost.clear()
+        self.stats["connects"] += 1
+        if self._lost_at is not None:
+            self.stats["last_reconnect_s"] = round(time.monotonic() - self._lost_at, 3)
+            self._lost_at = None
+        print(f"🔗 Conectado con la ESP32 ({address}), escuchando datos BLE...")
+        return True
+
+    async def connect(self):
+        """Conexión directa a la dirección conocida; si falla, escaneo dirigido y reintento."""
+        if self.client:
+            try:
+                if self.client.is_connected:
                     await self.client.disconnect()
-                except:
-                    pass
-                self.client = None
+            except Exception:
+                pass
+            self.client = None
+
+        if self.device_address and await self._connect_to(self.device_address):
+            self.stats["direct_connects"] += 1
+            return True
+        if not await self.discover_device():
             return False
+        return await self._connect_to(self.device_address)
+
+    async def _supervise(self):
+        delay = self.backoff_min
+        while True:
+            if self.is_connected:
+                await self._link_lost.wait()
+                delay = self.backoff_min  # Tras perder el enlace se reintenta de inmediato
+                continue
+            if self._lost_at is None:
+                self._lost_at = time.monotonic()
+            if await self.connect():
+                delay = self.backoff_min
+                continue
+            # Backoff exponencial con jitter: varios nodos no reintentan en sincronía
+            await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+            delay = min(delay * 2, self.backoff_max)
+
+    def start(self):
+        """Lanza el supervisor de conexión (desde el event loop)."""
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._supervisor = None
+        await self.disconnect()
 
     async def disconnect(self):
         try:
@@ -109,10 +273,12 @@ class HCBLEReader(BLEReader):
         finally:
             self.is_connected = False
             self.client = None
-            self.latest_data = None
+            self._last_seq = None
 
     async def read_async(self) -> dict | None:
         if not self.is_connected:
+            if self._supervisor is not None:
+                return None  # El supervisor ya está reconectando en segundo plano
             if not await self.connect():
                 print("🔵 HC-SR04: Sin conexión a la ESP32, sin datos")
                 return None
@@ -122,18 +288,13 @@ class HCBLEReader(BLEReader):
             self.is_connected = False
             return None
             
-        if self.latest_data:
-            current_time = time.time()
-            data_age = current_time - self.latest_data.get("timestamp", 0)
-            
-            if data_age > 5.0:
+        sample = self.latest()
+        if sample is None:
+            if self.samples.total:
                 print("🔵 HC-SR04: Datos obsoletos, ESP32 podría estar desconectado")
-                self.latest_data = None
-                return None
-            
-            return {"distancia_cm": self.latest_data["distancia_cm"]}
-        
-        return None
+            return None
+
+        return {"distancia_cm": sample.distancia_cm, "device_id": self.device_id}
 
     def read(self) -> dict | None:
         """Método sincrónico"""
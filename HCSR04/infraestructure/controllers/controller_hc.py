@@ -7,8 +7,11 @@ class HCController:
     def __init__(self, usecase: HCUseCase):
         self.usecase = usecase
 
-    async def get_hc_data(self, project_id: int = 1, event: bool = True):
-        return await self.usecase.execute(project_id=project_id, event=event)
+    async def get_hc_data(self, project_id: int | None = None, event: bool = True, device_id: str | None = None):
+        return await self.usecase.execute(project_id=project_id, event=event, device_id=device_id)
+
+    async def list_devices(self):
+        return self.usecase.list_devices()
 
     async def create_sensor(self, data: HCSensorData):
         return await self.usecase.create(data)
@@ -1,10 +1,12 @@
 # HCSR04/infraestructure/dependencies.py
 from fastapi import FastAPI
-from HCSR04.infraestructure.ble.hc_ble_reader import HCBLEReader
+from HCSR04.infraestructure.ble.hc_ble_manager import manager_from_env
 from HCSR04.infraestructure.mqtt.publisher import RabbitMQPublisher
 from HCSR04.application.hc_usecase import HCUseCase
 from HCSR04.infraestructure.controllers.controller_hc import HCController
 from HCSR04.infraestructure.repositories.hc_repo_dual import DualHCSensorRepository
+from core.simulation import is_simulated, simulation_config
+from core.stream_log import get_replay_log, is_replayed, replay_loop, replay_speed
 
 def init_hc_dependencies(
     app: FastAPI,
@@ -16,7 +18,22 @@ def init_hc_dependencies(
     char_uuid="beb5483e-36e1-4688-b7f5-ea07361b26a8"
 ):
 
-    reader = HCBLEReader(device_name=device_name, char_uuid=char_uuid)
+    # Varios nodos ESP32: device_name actúa como prefijo del nombre anunciado (HC_BLE_NAME_FILTER)
+    radio = None
+    if is_replayed("hcsr04"):
+        # Radio BLE que reproduce los payloads grabados de cada nodo
+        from HCSR04.infraestructure.simulation.hc_replay import HCBLEReplay
+        radio = HCBLEReplay(get_replay_log(), replay_speed(), replay_loop())
+    elif is_simulated("hcsr04"):
+        # Radio BLE simulada: nodos ESP32 con el mismo formato de notificaciones
+        from HCSR04.infraestructure.simulation.hc_simulator import HCBLESimulator
+        radio = HCBLESimulator(simulation_config("hcsr04", 20.0), name=device_name)
+    if radio is not None:
+        radio.announce()
+        reader = manager_from_env(name_filter=device_name, char_uuid=char_uuid,
+                                  client_factory=radio.client, scanner=radio.scanner)
+    else:
+        reader = manager_from_env(name_filter=device_name, char_uuid=char_uuid)
     repository = DualHCSensorRepository(session_local_factory, session_remote_factory)
     publisher = RabbitMQPublisher(
         host=rabbitmq_config["host"],
@@ -28,5 +45,6 @@ def init_hc_dependencies(
     usecase = HCUseCase(reader, repository, publisher, is_connected)
     controller = HCController(usecase)
     app.state.hc_controller = controller
+    app.state.hc_reader = reader
     
     print(f"🔵 HC-SR04 BLE configurado: {device_name} | {char_uuid}")
\ No newline at end of file
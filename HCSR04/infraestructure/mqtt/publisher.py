@@ -1,7 +1,8 @@
 # HCSR04/infraestructure/mqtt/publisher.py
 from HCSR04.domain.ports.mqtt_publisher import MQTTPublisher
 from HCSR04.domain.entities.hc_sensor import HCSensorData
-from core.rabbitmq_pool import get_rabbitmq_pool
+from core.rabbitmq_pool import get_rabbitmq_pool, lane_for_sensor
+from core.serialization import encode_reading
 
 
 class RabbitMQPublisher(MQTTPublisher):
@@ -16,12 +17,13 @@ class RabbitMQPublisher(MQTTPublisher):
         self.routing_key = routing_key
 
     def publish(self, sensor: HCSensorData):
-        """Publica usando el pool compartido (no bloqueante)."""
+        """Publica usando el pool compartido (no bloqueante), en el carril que corresponde a la entidad."""
         try:
             pool = get_rabbitmq_pool(self.host, self.user, self.password)
             pool.publish(
                 routing_key=self.routing_key,
-                body=sensor.dict()
+                body=encode_reading(sensor),
+                lane=lane_for_sensor(sensor)
             )
         except Exception as e:
             print(f"[MQTT-HC] Error al encolar mensaje: {e}")
\ No newline at end of file
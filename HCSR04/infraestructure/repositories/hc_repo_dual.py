@@ -20,23 +20,25 @@ class DualHCSensorRepository(HCSensorRepository):
         """Retorna el semáforo apropiado según el tipo de BD."""
         return DB_SEMAPHORE_REMOTE if online else DB_SEMAPHORE_LOCAL
 
+    def local_model(self, sensor_data: HCSensorData) -> SensorHCModel:
+        """Fila local pendiente de sync (también la usa el snapshot multi-sensor)."""
+        return SensorHCModel(
+            id_project=sensor_data.id_project,
+            distancia_cm=sensor_data.distancia_cm,
+            distancia_m=sensor_data.distancia_m,
+            tiempo_vuelo_us=sensor_data.tiempo_vuelo_us,
+            device_id=sensor_data.device_id,
+            event=sensor_data.event,
+            timestamp=sensor_data.timestamp,
+            synced=False
+        )
+
     async def save(self, sensor_data: HCSensorData, online: bool):
         """Guarda localmente (rápido). La sincronización remota la hace sync_service en background."""
-        data_dict = {
-            "id_project": sensor_data.id_project,
-            "distancia_cm": sensor_data.distancia_cm,
-            "distancia_m": sensor_data.distancia_m,
-            "tiempo_vuelo_us": sensor_data.tiempo_vuelo_us,
-            "event": sensor_data.event,
-            "timestamp": sensor_data.timestamp,
-            "synced": False
-        }
-        
         # Solo guardar localmente - el sync_service se encarga del remoto
         async with self.local_factory() as session_local:
             try:
-                local_model = SensorHCModel(**data_dict)
-                session_local.add(local_model)
+                session_local.add(self.local_model(sensor_data))
                 await session_local.commit()
                 logger.debug("HC-SR04: Guardado local exitoso, pendiente de sync")
             except Exception as e:
@@ -1,5 +1,5 @@
 # HCSR04/infraestructure/repositories/schemas_sqlalchemy.py
-from sqlalchemy import Column, Integer, Float, Boolean, DateTime, Index
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, Index, String
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
@@ -13,6 +13,7 @@ class SensorHCModel(Base):
     distancia_cm = Column(Float, nullable=False)
     distancia_m = Column(Float, nullable=False)
     tiempo_vuelo_us = Column(Float, nullable=False)
+    device_id = Column(String(64), nullable=True)
     event = Column(Boolean, default=True)
     synced = Column(Boolean, default=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
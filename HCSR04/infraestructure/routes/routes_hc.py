@@ -2,19 +2,28 @@
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, Query, HTTPException
 from fastapi.responses import JSONResponse
 from HCSR04.domain.entities.hc_sensor import HCSensorData
-from HCSR04.infraestructure.ws.ws_manager import WebSocketManager_HC
-from typing import List
+from HCSR04.infraestructure.ws.ws_manager import ws_manager_hc  # Instancia compartida con el hub
+from typing import List, Optional
 from core.concurrency import RATE_LIMITERS
+from core.serialization import success_response
+from core.sse import sse_response
 import asyncio
 
 router = APIRouter()
 router_ws_hc = APIRouter()
-ws_manager_hc = WebSocketManager_HC()
 
 @router.get("/hc/sensor")
-async def get_hc_sensor(request: Request, project_id: int = Query(1), event: bool = True):
-    """Obtiene lectura actual del sensor HC-SR04 (ultrasonido)."""
-    if project_id <= 0:
+async def get_hc_sensor(
+    request: Request,
+    project_id: Optional[int] = Query(None),
+    event: bool = True,
+    device_id: Optional[str] = None
+):
+    """
+    Obtiene lectura actual del sensor HC-SR04 (ultrasonido). device_id elige el nodo ESP32.
+    Sin project_id se usa el proyecto asignado al nodo (HC_BLE_DEVICE_PROJECTS, o 1).
+    """
+    if project_id is not None and project_id <= 0:
         raise HTTPException(status_code=400, detail="El ID del proyecto debe ser un número positivo")
     
     if not await RATE_LIMITERS["hcsr04"].acquire():
@@ -23,11 +32,11 @@ async def get_hc_sensor(request: Request, project_id: int = Query(1), event: boo
     controller = request.app.state.hc_controller
     try:
         data = await asyncio.wait_for(
-            controller.get_hc_data(project_id=project_id, event=event),
+            controller.get_hc_data(project_id=project_id, event=event, device_id=device_id),
             timeout=5.0
         )
         if data:
-            return {"success": True, "data": data.dict()}
+            return success_response(data)
         return JSONResponse(
             status_code=503,
             content={"success": False, "error": "El sensor HC-SR04 no está disponible o no hay datos"}
@@ -37,6 +46,26 @@ async def get_hc_sensor(request: Request, project_id: int = Query(1), event: boo
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al leer sensor HC-SR04: {str(e)}")
 
+@router.get("/hc/devices")
+async def get_hc_devices(request: Request):
+    """Nodos ESP32 HC-SR04 conocidos: estado de conexión, proyecto asignado y última distancia."""
+    controller = request.app.state.hc_controller
+    return {"success": True, "data": await controller.list_devices()}
+
+@router.get("/hc/sensor/stream")
+async def hc_stream(
+    request: Request,
+    project_id: Optional[int] = None,
+    max_rate: Optional[float] = None,
+    aggregate: Optional[str] = None,
+    backfill: int = 0
+):
+    """
+    Stream SSE de lecturas HC-SR04 (mismo origen que los WebSocket).
+    Reanuda desde el historial en memoria con la cabecera Last-Event-ID.
+    """
+    return sse_response(request, "hcsr04", project_id, max_rate, aggregate, backfill)
+
 @router.post("/hc/sensor")
 async def post_hc_sensor(request: Request, payload: HCSensorData):
     """Guarda una nueva medición del sensor HC-SR04."""
@@ -137,7 +166,7 @@ async def get_hc_sensor_latest_by_project_id(request: Request, project_id: int):
         )
         
         if data:
-            return {"success": True, "data": data.dict()}
+            return success_response(data)
         return JSONResponse(
             status_code=404,
             content={"success": False, "error": f"No se encontró ninguna medición HC-SR04 para el proyecto {project_id}"}
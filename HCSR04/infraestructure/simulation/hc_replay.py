@@ -0,0 +1,74 @@
+# HCSR04/infraestructure/simulation/hc_replay.py
+import asyncio
+from typing import Dict, Optional
+
+from core.simulation import SimulationConfig
+from core.stream_log import Record, ReplayClock, StreamLog
+from HCSR04.infraestructure.simulation.hc_simulator import HCBLESimulator, SimulatedNode
+
+CHANNEL_PREFIX = "hcsr04/"
+
+
+class _Cursor:
+    def __init__(self, log: StreamLog, channel: str, speed: float):
+        self.log = log
+        self.channel = channel
+        self.records = log.records([channel])
+        self.clock = ReplayClock(speed)
+        self.pending: Optional[Record] = None
+
+
+class HCBLEReplay(HCBLESimulator):
+    """
+    Radio BLE que anuncia un nodo por cada canal "hcsr04/<device_id>" del log y,
+    al conectarse, entrega los payloads grabados con su espaciado original
+    (dividido por `speed`). Si el enlace se corta, la reproducción sigue donde
+    quedó al reconectar. device_id con "@dirección" conserva esa dirección,
+    así el gestor asigna los mismos ids que en la captura.
+    """
+
+    def __init__(self, log: StreamLog, speed: float = 1.0, loop: bool = False,
+                 service_uuid: str = "4fafc201-1fb5-459e-8fcc-c5c9c331914b"):
+        super().__init__(SimulationConfig(0.0, 0.0, 1.0, None), service_uuid=service_uuid)
+        self.log = log
+        self.speed = speed
+        self.loop = loop
+        self.nodes = {}
+        self._cursors: Dict[str, _Cursor] = {}
+        channels = [name for name in log.channels if name.startswith(CHANNEL_PREFIX)]
+        for i, channel in enumerate(channels):
+            name, _, address = channel[len(CHANNEL_PREFIX):].partition("@")
+            address = address or f"AA:BB:CC:FF:00:{i + 1:02X}"
+            self.nodes[address] = SimulatedNode(name, address, 0.0)
+            self._cursors[address] = _Cursor(log, channel, speed)
+        self.stats["finished"] = 0
+
+    def _next_record(self, cursor: _Cursor) -> Optional[Record]:
+        record = next(cursor.records, None)
+        if record is None and self.loop:
+            cursor.records = self.log.records([cursor.channel])
+            cursor.clock.restart()
+            record = next(cursor.records, None)
+        return record
+
+    async def notifications(self, node: SimulatedNode):
+        cursor = self._cursors[node.device.address]
+        cursor.clock.restart()  # Tras una reconexión no se intenta recuperar el tiempo perdido
+        while node.connected:
+            if cursor.pending is None:
+                cursor.pending = self._next_record(cursor)
+                if cursor.pending is None:
+                    if self.log.closed:
+                        return  # Apagado
+                    self.stats["finished"] += 1
+                    print(f"⏹️ HC-SR04 BLE: fin de la reproducción de {node.device.name}")
+                    return
+            # Con speed=0 igual se cede el event loop entre notificaciones
+            await asyncio.sleep(cursor.clock.delay(cursor.pending.timestamp))
+            payload = bytearray(cursor.pending.payload)  # Como bleak: un bytearray propio por notificación
+            cursor.pending = None
+            yield payload
+
+    def announce(self):
+        names = ", ".join(node.device.name for node in self.nodes.values())
+        print(f"⏯️ HC-SR04 BLE reproduciendo {self.log.path}: {names} (x{self.speed:g})")
@@ -0,0 +1,196 @@
+# HCSR04/infraestructure/simulation/hc_simulator.py
+import asyncio
+import random
+import struct
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from bleak.exc import BleakError
+
+from core.simulation import SimulationConfig, sim_value
+
+BINARY_MAGIC = 0xA5
+NO_ECHO = 0xFFFF
+_HEADER = struct.Struct("<BBHH")
+
+
+def encode_packet(seq: int, interval_ms: int, distances_mm: List[int]) -> bytearray:
+    """Notificación binaria del ESP32 (inversa de HCBLEReader._ingest_binary)."""
+    return bytearray(
+        _HEADER.pack(BINARY_MAGIC, len(distances_mm), seq & 0xFFFF, interval_ms)
+        + struct.pack(f"<{len(distances_mm)}H", *distances_mm)
+    )
+
+
+class FakeDevice(NamedTuple):
+    name: str
+    address: str
+
+
+class FakeAdvertisement(NamedTuple):
+    local_name: str
+    service_uuids: List[str]
+    rssi: int
+
+
+class SimulatedNode:
+    """Un ESP32 con HC-SR04: distancia base con oscilación lenta y ruido."""
+
+    def __init__(self, name: str, address: str, distance_cm: float):
+        self.device = FakeDevice(name, address)
+        self.distance_cm = distance_cm
+        self.seq = 0
+        self.connected = False
+
+
+class HCBLESimulator:
+    """
+    Radio BLE simulada con uno o varios nodos ESP32_SensorBLE.
+    Reemplaza a BleakScanner (scanner) y BleakClient (client) en HCBLEReader y
+    HCBLEManager; las notificaciones usan el formato binario real del firmware.
+
+    Parámetros extra: SIM_HCSR04_NODES (1), SIM_HCSR04_DISTANCE_CM (80, +20 por
+    nodo), SIM_HCSR04_BATCH (muestras por notificación, 5). SIM_HCSR04_HZ es la
+    tasa de muestras. Fallas (SIM_FAULT_RATE, por notificación): notificación
+    perdida (hueco en seq), muestra sin eco y, con 1/10 de esa probabilidad,
+    desconexión; las conexiones también fallan con esa probabilidad.
+    """
+
+    def __init__(self, config: SimulationConfig, name: str = "ESP32_SensorBLE",
+                 service_uuid: str = "4fafc201-1fb5-459e-8fcc-c5c9c331914b"):
+        self.config = config
+        self.service_uuid = service_uuid
+        self.batch = max(1, min(255, int(sim_value("hcsr04", "BATCH", 5))))
+        self._rng = random.Random(config.seed)
+        count = max(1, int(sim_value("hcsr04", "NODES", 1)))
+        base = sim_value("hcsr04", "DISTANCE_CM", 80.0)
+        self.nodes: Dict[str, SimulatedNode] = {}
+        for i in range(count):
+            node_name = name if i == 0 else f"{name}_{i}"
+            address = f"AA:BB:CC:00:00:{i + 1:02X}"
+            self.nodes[address] = SimulatedNode(node_name, address, base + 20.0 * i)
+        self.stats = {"notifications": 0, "dropped": 0, "disconnects": 0, "failed_connects": 0}
+        self.scanner = _FakeScanner(self)
+
+    def _fault(self, scale: float = 1.0) -> bool:
+        return bool(self.config.fault_rate) and self._rng.random() < self.config.fault_rate * scale
+
+    def _advertised(self):
+        return {
+            node.device.address: (node.device, FakeAdvertisement(node.device.name, [self.service_uuid], -60))
+            for node in self.nodes.values()
+        }
+
+    def client(self, address: str, disconnected_callback: Optional[Callable] = None, timeout: float = 10.0):
+        """Reemplazo de BleakClient(address, disconnected_callback=..., timeout=...)."""
+        return FakeBleakClient(self, address, disconnected_callback)
+
+    async def notifications(self, node: SimulatedNode):
+        """Payloads de `node` a su ritmo; None = desconexión."""
+        rng, rate = self._rng, self.config.rate_hz
+        interval = self.batch / rate
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        while node.connected:
+            await asyncio.sleep(interval)
+            node.seq = (node.seq + 1) & 0xFFFF
+            if self._fault(0.1):
+                yield None
+                return
+            if self._fault():
+                self.stats["dropped"] += 1  # El ESP32 la envió; el hueco en seq la delata
+                continue
+            now = loop.time() - t0
+            distances = []
+            for i in range(self.batch):
+                t = now - (self.batch - 1 - i) / rate
+                value = node.distance_cm + 10.0 * ((t / 20.0) % 2 - 1) + rng.gauss(0, 0.3 * self.config.noise)
+                distances.append(int(round(max(2.0, value) * 10)))
+            if self._fault():
+                distances[rng.randrange(len(distances))] = NO_ECHO
+            yield encode_packet(node.seq, int(round(1000 / rate)), distances)
+
+    def announce(self):
+        names = ", ".join(node.device.name for node in self.nodes.values())
+        print(f"🧪 HC-SR04 BLE simulado: {names} ({self.config.rate_hz:g} Hz, lotes de {self.batch}, "
+              f"fallas {self.config.fault_rate:.1%})")
+
+
+class _FakeScanner:
+    """Mismas llamadas que BleakScanner usadas por el lector y el gestor."""
+
+    def __init__(self, radio: HCBLESimulator):
+        self._radio = radio
+
+    async def discover(self, timeout: float = 5.0, return_adv: bool = False):
+        await asyncio.sleep(min(timeout, 0.2))
+        found = self._radio._advertised()
+        return found if return_adv else [device for device, _ in found.values()]
+
+    async def find_device_by_filter(self, filterfunc, timeout: float = 10.0):
+        await asyncio.sleep(min(timeout, 0.1))
+        for device, adv in self._radio._advertised().values():
+            if filterfunc(device, adv):
+                return device
+        return None
+
+
+class FakeBleakClient:
+    def __init__(self, radio: HCBLESimulator, address: str, disconnected_callback: Optional[Callable]):
+        self._radio = radio
+        self.address = address
+        self._callback = disconnected_callback
+        self._node: Optional[SimulatedNode] = None
+        self._notifier: Optional[asyncio.Task] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._node is not None and self._node.connected
+
+    async def connect(self):
+        await asyncio.sleep(0.05)
+        node = self._radio.nodes.get(self.address)
+        if node is None:
+            raise BleakError(f"Device with address {self.address} was not found.")
+        if node.connected:
+            raise BleakError(f"{self.address} ya tiene una conexión activa")
+        if self._radio._fault():
+            self._radio.stats["failed_connects"] += 1
+            raise BleakError(f"Connection to {self.address} failed (simulado)")
+        node.connected = True
+        self._node = node
+        return True
+
+    async def start_notify(self, char_uuid: str, callback: Callable):
+        if not self.is_connected:
+            raise BleakError("Not connected")
+        self._notifier = asyncio.create_task(self._notify_loop(char_uuid, callback))
+
+    async def stop_notify(self, char_uuid: str):
+        if self._notifier is not None:
+            self._notifier.cancel()
+            self._notifier = None
+
+    async def _notify_loop(self, char_uuid: str, callback: Callable):
+        radio = self._radio
+        async for payload in radio.notifications(self._node):
+            if not self.is_connected:
+                return
+            if payload is None:  # El nodo corta el enlace
+                radio.stats["disconnects"] += 1
+                self._drop_link()
+                return
+            radio.stats["notifications"] += 1
+            callback(char_uuid, payload)
+
+    def _drop_link(self):
+        if self._node is not None:
+            self._node.connected = False
+        if self._callback is not None:
+            self._callback(self)
+
+    async def disconnect(self):
+        await self.stop_notify("")
+        if self._node is not None:
+            self._node.connected = False
+            self._node = None
+        return True
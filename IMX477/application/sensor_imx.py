@@ -4,14 +4,15 @@ from IMX477.domain.repositories.imx_repository import IMXRepository
 from IMX477.domain.ports.mqtt_publisher import MQTTPublisher
 
 class IMXUseCase:
-    def __init__(self, reader, repository: IMXRepository, publisher: MQTTPublisher, is_connected):
+    def __init__(self, reader, repository: IMXRepository, publisher: MQTTPublisher, is_connected, sampler=None):
         self.reader = reader
+        self.sampler = sampler  # core.sampler.Sampler dueño de la cámara (None = capturar en cada petición)
         self.repository = repository
         self.publisher = publisher
         self.is_connected = is_connected
 
     async def execute(self, project_id=1, resolution="640x480", event=False):
-        raw = await self.reader.read()  # ASYNC: Usa await para no bloquear
+        raw = await self._acquire(fresh=event)
         if not raw:
             return None
 
@@ -24,6 +25,13 @@ class IMXUseCase:
 
         return data
 
+    async def _acquire(self, fresh: bool):
+        """Con sampler: última captura vigente, o una inmediata pedida al dueño para event=True."""
+        if self.sampler is None:
+            return await self.reader.read()
+        sample = await (self.sampler.fresh(timeout=4.5) if fresh else self.sampler.latest_or_wait(timeout=4.5))
+        return sample.value if sample else None
+
     async def create(self, data: SensorIMX477):
         if not data.event:
             return {"msg": "No se almacenó porque event es False"}
@@ -0,0 +1,245 @@
+# IMX477/infraestructure/camera/capture_daemon.py
+"""
+Servicio de captura persistente de la IMX477.
+
+En vez de lanzar rpicam-still por lectura (~1 s de arranque de la cámara y un
+único /dev/shm/frame.jpg compartido), mantiene un rpicam-vid MJPEG de baja tasa
+corriendo y guarda en memoria el último JPEG completo. capture() devuelve ese
+frame si es reciente (milisegundos) o espera el siguiente; las capturas
+concurrentes reciben los mismos bytes sin pisarse.
+
+- El proceso arranca con la primera captura pedida y se detiene tras
+  IMX_CAPTURE_IDLE_S segundos (30) sin capturas pedidas. El muestreo periódico
+  de fondo (capture(keepalive=False)) usa el pipeline si ya corre, pero no lo
+  arranca ni lo mantiene vivo: sin pedidos vuelve a rpicam-still cada 5 s.
+- La inactividad se revisa con un temporizador, no al llegar datos: un
+  rpicam-vid colgado (sin salida durante start_timeout) también se detiene.
+- IMX_CAPTURE_FPS (5) fija la tasa del pipeline: latencia máxima de un frame nuevo.
+- El streaming usa su propio rpicam-vid: antes de arrancarlo se llama a stop()
+  (la cámara admite un solo proceso) y mientras está activo el lector toma los
+  frames del streaming.
+IMX_CAPTURE_DAEMON=0 vuelve a rpicam-still por lectura.
+"""
+import logging
+import os
+import select
+import subprocess
+import threading
+import time
+from typing import List, Optional
+
+from IMX477.infraestructure.camera.rpicam import rpicam_command
+
+logger = logging.getLogger(__name__)
+
+SOI = b"\xff\xd8"
+EOI = b"\xff\xd9"
+IDLE_CHECK_S = 1.0  # Cada cuánto revisa el lector inactividad y cuelgues sin datos
+
+
+class MJPEGSplitter:
+    """Separa un flujo MJPEG en JPEG completos; un SOI antes del EOI descarta el frame cortado."""
+
+    def __init__(self, max_buffer: int = 4 * 1024 * 1024):
+        self._buffer = bytearray()
+        self._max_buffer = max_buffer
+        self.truncated = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer += chunk
+        frames = []
+        while True:
+            start = buffer.find(SOI)
+            if start == -1:
+                del buffer[:max(0, len(buffer) - 1)]  # Conservar un posible 0xFF partido
+                break
+            if start:
+                del buffer[:start]
+            end = buffer.find(EOI, 2)
+            restart = buffer.find(SOI, 2)
+            if restart != -1 and (end == -1 or restart < end):
+                self.truncated += 1
+                del buffer[:restart]
+                continue
+            if end == -1:
+                if len(buffer) > self._max_buffer:
+                    self.truncated += 1
+                    buffer.clear()
+                break
+            frames.append(bytes(buffer[:end + 2]))
+            del buffer[:end + 2]
+        return frames
+
+
+class CaptureDaemon:
+    def __init__(self, width: int = 640, height: int = 480, quality: int = 90,
+                 fps: float = 5.0, idle_timeout: float = 30.0, start_timeout: float = 5.0):
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.start_timeout = start_timeout
+        self.proc: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()           # Arranque/parada del proceso
+        self._frame_cond = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = 0
+        self._jpeg_time = 0.0                   # monotonic de llegada del último frame
+        self._last_request = time.monotonic()
+        self.stats = {"starts": 0, "idle_stops": 0, "stalls": 0, "frames": 0, "truncated": 0,
+                      "captures": 0, "cached": 0, "passive": 0, "timeouts": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def _command(self) -> List[str]:
+        return [
+            *rpicam_command("rpicam-vid"),
+            "--nopreview",
+            "-t", "0",
+            "--codec", "mjpeg",
+            "--quality", str(self.quality),
+            "--width", str(self.width),
+            "--height", str(self.height),
+            "--framerate", f"{self.fps:g}",
+            "-o", "-"
+        ]
+
+    def _ensure_running(self):
+        with self._lock:
+            if self.is_running:
+                return
+            self._jpeg = None
+            self.proc = subprocess.Popen(
+                self._command(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+            )
+            self.stats["starts"] += 1
+            self._thread = threading.Thread(
+                target=self._reader_loop, args=(self.proc,), name="imx477-capture", daemon=True
+            )
+            self._thread.start()
+            logger.info(f"📷 IMX477: pipeline de captura iniciado ({self.width}x{self.height} @ {self.fps:g} fps)")
+
+    def _reader_loop(self, proc: subprocess.Popen):
+        splitter = MJPEGSplitter()
+        stdout = proc.stdout
+        last_data = time.monotonic()
+        try:
+            while True:
+                readable, _, _ = select.select([stdout], [], [], IDLE_CHECK_S)
+                now = time.monotonic()
+                if now - self._last_request > self.idle_timeout:
+                    self.stats["idle_stops"] += 1
+                    logger.info("💤 IMX477: pipeline de captura detenido por inactividad")
+                    self._terminate(proc)
+                    break
+                if not readable:
+                    if now - last_data > self.start_timeout:
+                        self.stats["stalls"] += 1
+                        logger.warning(f"⚠️ IMX477: pipeline de captura sin datos por {self.start_timeout:g}s, deteniéndolo")
+                        self._terminate(proc)
+                        break
+                    continue
+                chunk = stdout.read(65536)
+                if not chunk:
+                    break
+                last_data = now
+                frames = splitter.feed(chunk)
+                if frames:
+                    with self._frame_cond:
+                        self._jpeg = frames[-1]
+                        self._jpeg_seq += 1
+                        self._jpeg_time = time.monotonic()
+                        self.stats["frames"] += len(frames)
+                        self._frame_cond.notify_all()
+        except Exception as e:
+            logger.error(f"Error leyendo el pipeline de captura IMX477: {e}")
+        finally:
+            self.stats["truncated"] += splitter.truncated
+            with self._frame_cond:
+                self._frame_cond.notify_all()  # Despierta a quien espera: el proceso terminó
+
+    def capture(self, max_age: float = 0.5, timeout: Optional[float] = None,
+                keepalive: bool = True) -> Optional[bytes]:
+        """
+        JPEG del pipeline (bloqueante, para el executor): el último si llegó hace
+        menos de max_age s, si no el próximo. None si no llega a tiempo.
+        keepalive=False (muestreo de fondo): no cuenta como actividad y, con el
+        pipeline detenido, devuelve None en vez de arrancarlo.
+        """
+        if keepalive:
+            self._last_request = time.monotonic()
+        elif not self.is_running:
+            self.stats["passive"] += 1
+            return None
+        self.stats["captures"] += 1
+        with self._frame_cond:
+            if self._jpeg is not None and self.is_running and time.monotonic() - self._jpeg_time <= max_age:
+                self.stats["cached"] += 1
+                return self._jpeg
+        if keepalive:
+            self._ensure_running()
+        proc = self.proc
+        if proc is None or proc.poll() is not None:  # stop() concurrente o detenido por inactividad
+            return None
+        deadline = time.monotonic() + (timeout if timeout is not None else self.start_timeout)
+        with self._frame_cond:
+            seq = self._jpeg_seq
+            while self._jpeg_seq == seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or proc.poll() is not None:
+                    self.stats["timeouts"] += 1
+                    return None
+                self._frame_cond.wait(min(remaining, 0.5))
+            return self._jpeg
+
+    def _terminate(self, proc: subprocess.Popen):
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def stop(self):
+        """Libera la cámara (antes del streaming y al cerrar la aplicación)."""
+        with self._lock:
+            proc, self.proc = self.proc, None
+            if proc is not None:
+                self._terminate(proc)
+                logger.info("🛑 IMX477: pipeline de captura detenido")
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self.is_running,
+            "fps": self.fps,
+            "last_frame_age_s": round(time.monotonic() - self._jpeg_time, 3) if self._jpeg is not None else None,
+            **self.stats,
+        }
+
+
+# Instancia global: la comparten el lector (capturas) y el streamer (para liberar la cámara)
+_daemon_instance: Optional[CaptureDaemon] = None
+
+
+def capture_daemon_enabled() -> bool:
+    return os.getenv("IMX_CAPTURE_DAEMON", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_capture_daemon() -> Optional[CaptureDaemon]:
+    """El servicio de captura (None con IMX_CAPTURE_DAEMON=0)."""
+    global _daemon_instance
+    if _daemon_instance is None and capture_daemon_enabled():
+        _daemon_instance = CaptureDaemon(
+            fps=float(os.getenv("IMX_CAPTURE_FPS", "5")),
+            idle_timeout=float(os.getenv("IMX_CAPTURE_IDLE_S", "30")),
+        )
+    return _daemon_instance
@@ -8,6 +8,9 @@ import asyncio
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import time
+from IMX477.infraestructure.camera.rpicam import rpicam_command
+from IMX477.infraestructure.camera.capture_daemon import get_capture_daemon
+from core.stream_log import get_replay_log, is_replayed, replay_loop, stream_writer
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +22,11 @@ class IMXReader:
         self._last_frame: Optional[np.ndarray] = None
         self._last_frame_time: float = 0
         self._frame_cache_duration: float = 0.5  # segundos
+        self._record = stream_writer("imx477/still")  # JPEG crudos de cada captura (RECORD_STREAMS)
+        # REPLAY_STREAMS: las capturas salen en orden del log en vez de rpicam-still
+        self._replay = self._replay_stills() if is_replayed("imx477/still") else None
+        # Pipeline rpicam-vid persistente: frames desde memoria en vez de rpicam-still por lectura
+        self._daemon = get_capture_daemon() if self._replay is None else None
         logger.info("IMX477Reader inicializado con ThreadPoolExecutor (2 workers)")
     
     def _get_streamer(self):
@@ -30,11 +38,45 @@ class IMXReader:
             logger.error(f"Error obteniendo streamer: {e}")
             return None
 
-    def _capturar_frame_sync(self) -> Optional[np.ndarray]:
-        """Método síncrono para captura (ejecutado en thread separado)"""
+    def _replay_stills(self):
+        log = get_replay_log()
+        while True:
+            yielded = False
+            for record in log.records(["imx477/still"]):
+                yielded = True
+                yield record.payload
+            if not yielded or not replay_loop():
+                return
+
+    def _capturar_frame_sync(self, keepalive: bool = True) -> Optional[np.ndarray]:
+        """
+        Método síncrono para captura (ejecutado en thread separado).
+        keepalive=False (muestreo periódico): usa el pipeline solo si ya corre, sin
+        contarlo como actividad; si está detenido, rpicam-still.
+        """
+        if self._replay is not None:
+            payload = next(self._replay, None)
+            if payload is None:
+                logger.warning("Reproducción de capturas IMX477 terminada")
+                return None
+            return cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+        if self._daemon is not None:
+            jpeg = self._daemon.capture(max_age=self._frame_cache_duration, keepalive=keepalive)
+            if jpeg is not None:
+                if self._record is not None:
+                    self._record(jpeg)
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                if frame is not None:
+                    return frame
+            if keepalive or self._daemon.is_running:
+                logger.warning("Pipeline de captura IMX477 sin frames, usando rpicam-still")
+        return self._capturar_still_sync()
+
+    def _capturar_still_sync(self) -> Optional[np.ndarray]:
+        """Captura puntual con rpicam-still (sin pipeline persistente o si este falla)."""
         try:
             result = subprocess.run([
-                "rpicam-still", 
+                *rpicam_command("rpicam-still"),
                 "-n",
                 "--output", "/dev/shm/frame.jpg", 
                 "-t", "100",
@@ -52,7 +94,13 @@ class IMXReader:
                 logger.error(f"rpicam-still falló con código: {result.returncode}")
                 return None
                 
-            frame = cv2.imread("/dev/shm/frame.jpg")
+            if self._record is not None:
+                with open("/dev/shm/frame.jpg", "rb") as f:
+                    jpeg = f.read()
+                self._record(jpeg)
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            else:
+                frame = cv2.imread("/dev/shm/frame.jpg")
             if frame is None:
                 logger.error("No se pudo leer el frame capturado")
                 
@@ -65,8 +113,8 @@ class IMXReader:
             logger.error(f"Error al capturar frame: {e}")
             return None
     
-    async def obtener_frame(self) -> Optional[np.ndarray]:
-        """Captura frame - usa streaming si está activo, sino rpicam-still"""
+    async def obtener_frame(self, keepalive: bool = True) -> Optional[np.ndarray]:
+        """Captura frame - usa streaming si está activo, sino el pipeline de captura"""
         # Primero intentar obtener frame del streaming si está activo
         streamer = self._get_streamer()
         if streamer and streamer.is_streaming:
@@ -89,9 +137,9 @@ class IMXReader:
             logger.debug("Usando frame desde cache")
             return self._last_frame
         
-        # Capturar nuevo frame con rpicam-still en thread separado
+        # Capturar nuevo frame (pipeline persistente o rpicam-still) en thread separado
         loop = asyncio.get_event_loop()
-        frame = await loop.run_in_executor(self._executor, self._capturar_frame_sync)
+        frame = await loop.run_in_executor(self._executor, self._capturar_frame_sync, keepalive)
         
         # Actualizar cache
         if frame is not None:
@@ -100,6 +148,18 @@ class IMXReader:
         
         return frame
     
+    def stop(self):
+        """Libera la cámara y el executor (al cerrar la aplicación)."""
+        if self._daemon is not None:
+            self._daemon.stop()
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": "pipeline" if self._daemon is not None else ("replay" if self._replay is not None else "rpicam-still"),
+            "capture": self._daemon.get_stats() if self._daemon is not None else None,
+        }
+
     def obtener_frame_sync(self):
         """DEPRECATED: Usar obtener_frame() async"""
         logger.warning("obtener_frame_sync() es deprecated, usar obtener_frame() async")
@@ -266,15 +326,18 @@ class IMXReader:
             logger.error(f"Error calculando probabilidad de confiabilidad: {e}")
             return 0.0
 
-    async def read(self):
-        """Lectura async (no bloqueante) - VERSIÓN MEJORADA CON THREADING"""
+    async def read(self, keepalive: bool = True):
+        """
+        Lectura async (no bloqueante) - VERSIÓN MEJORADA CON THREADING.
+        keepalive=False: lectura de fondo que no mantiene vivo el pipeline de captura.
+        """
         if platform.system() == "Windows":
             logger.warning("📵 IMX477 no disponible en Windows.")
             return None
 
         try:
             # Capturar frame en thread separado (no bloqueante)
-            frame = await self.obtener_frame()
+            frame = await self.obtener_frame(keepalive)
             if frame is None:
                 logger.error("No se pudo obtener frame de la cámara")
                 return None
@@ -0,0 +1,21 @@
+# IMX477/infraestructure/camera/rpicam.py
+import os
+import sys
+from typing import List
+
+from core.simulation import is_simulated
+from core.stream_log import is_replayed
+
+FAKE_RPICAM = os.path.join(os.path.dirname(os.path.dirname(__file__)), "simulation", "fake_rpicam.py")
+
+
+def rpicam_command(tool: str) -> List[str]:
+    """
+    Comando base de rpicam-still / rpicam-vid. Con la cámara simulada
+    (SIMULATE_SENSORS) o un log con frames del streaming (REPLAY_STREAMS) se
+    ejecuta fake_rpicam.py con el mismo nombre de herramienta en argv, así
+    kill_zombie_rpicam() también lo reconoce.
+    """
+    if is_simulated("imx477") or (tool == "rpicam-vid" and is_replayed("imx477/mjpeg")):
+        return [sys.executable, FAKE_RPICAM, tool]
+    return [tool]
@@ -5,6 +5,9 @@ from IMX477.infraestructure.mqtt.publisher import RabbitMQPublisher
 from IMX477.application.sensor_imx import IMXUseCase
 from IMX477.infraestructure.controllers.controller_imx import IMXController
 from IMX477.infraestructure.repositories.imx_repo_dual import DualIMXRepository
+from core.sampler import Sampler, register_sampler, sampler_rate
+from core.simulation import is_simulated
+from core.stream_log import is_replayed
 
 def init_imx_dependencies(
     app: FastAPI,
@@ -13,6 +16,10 @@ def init_imx_dependencies(
     rabbitmq_config: dict,
     is_connected_fn
 ):
+    if is_replayed("imx477"):
+        print("⏯️ IMX477: capturas y/o streaming reproducidos desde el log")
+    elif is_simulated("imx477"):
+        print("🧪 IMX477 simulado: rpicam-still/rpicam-vid reemplazados por fake_rpicam.py")
     reader = IMXReader()
     repository = DualIMXRepository(session_local_factory, session_remote_factory)
     publisher = RabbitMQPublisher(
@@ -22,6 +29,15 @@ def init_imx_dependencies(
         routing_key=rabbitmq_config["routing_key_imx"]
     )
     
-    usecase = IMXUseCase(reader, repository, publisher, is_connected_fn)
+    # Captura + análisis cada 5 s por defecto (la cámara la usa un solo dueño).
+    # Solo las capturas pedidas (fresh) mantienen vivo el pipeline de captura;
+    # las periódicas lo aprovechan si está corriendo y si no usan rpicam-still
+    async def acquire():
+        return await reader.read(keepalive=sampler.on_demand)
+
+    sampler = register_sampler(Sampler("imx477", acquire, rate_hz=sampler_rate("imx477", 0.2), timeout=8.0))
+
+    usecase = IMXUseCase(reader, repository, publisher, is_connected_fn, sampler=sampler)
     controller = IMXController(usecase)
-    app.state.imx_controller = controller
\ No newline at end of file
+    app.state.imx_controller = controller
+    app.state.imx_reader = reader
\ No newline at end of file
@@ -2,13 +2,15 @@
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.responses import JSONResponse
 from IMX477.domain.entities.sensor_imx import SensorIMX477
-from IMX477.infraestructure.ws.ws_manager import WebSocketManager_IMX
+from IMX477.infraestructure.ws.ws_manager import ws_manager_imx  # Instancia compartida con el hub
 from core.concurrency import RATE_LIMITERS
+from core.serialization import success_response
+from core.sse import sse_response
+from typing import Optional
 import asyncio
 
 router = APIRouter()
 router_ws_imx = APIRouter()
-ws_manager_imx = WebSocketManager_IMX()
 
 @router.get("/imx477/sensor")
 async def get_sensor(request: Request, event: bool = False):
@@ -23,7 +25,7 @@ async def get_sensor(request: Request, event: bool = False):
             timeout=5.0
         )
         if data:
-            return {"success": True, "data": data.dict()}
+            return success_response(data)
         return JSONResponse(
             status_code=503,
             content={"success": False, "error": "La cámara IMX477 no está disponible o no hay datos"}
@@ -33,6 +35,20 @@ async def get_sensor(request: Request, event: bool = False):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al leer cámara IMX477: {str(e)}")
 
+@router.get("/imx477/sensor/stream")
+async def imx_stream(
+    request: Request,
+    project_id: Optional[int] = None,
+    max_rate: Optional[float] = None,
+    aggregate: Optional[str] = None,
+    backfill: int = 0
+):
+    """
+    Stream SSE de lecturas IMX477 (mismo origen que los WebSocket).
+    Reanuda desde el historial en memoria con la cabecera Last-Event-ID.
+    """
+    return sse_response(request, "imx477", project_id, max_rate, aggregate, backfill)
+
 @router.post("/imx477/sensor")
 async def post_sensor(request: Request, payload: SensorIMX477):
     """Guarda una nueva medición de la cámara IMX477."""
@@ -0,0 +1,173 @@
+# IMX477/infraestructure/simulation/fake_rpicam.py
+"""
+Sustituto de rpicam-still / rpicam-vid para correr sin cámara.
+
+    python fake_rpicam.py rpicam-still -n --output /dev/shm/frame.jpg -t 100 --width 640 --height 480
+    python fake_rpicam.py rpicam-vid --nopreview -t 0 --codec mjpeg --framerate 25 -o -
+
+Se lanza como proceso aparte (igual que la herramienta real), así que no importa
+nada del proyecto: lee los mismos SIM_* del entorno heredado. La excepción es
+rpicam-vid con REPLAY_STREAMS: emite los frames del canal imx477/mjpeg del log
+(core.stream_log) con sus tiempos originales en lugar de la escena sintética.
+Escena: fondo con gradiente y textura (nitidez realista), ruido de sensor y el
+punto del láser rojo que se desplaza lentamente.
+Parámetros extra: SIM_IMX477_LASER (1 = láser visible), SIM_IMX477_BRIGHTNESS (0-255, 130).
+Fallas (SIM_FAULT_RATE): still termina con código 1 sin escribir; vid emite JPEG cortados.
+"""
+import os
+import random
+import sys
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+def _env(key: str, default: float) -> float:
+    for name in (f"SIM_IMX477_{key}", f"SIM_{key}"):
+        try:
+            return float(os.environ[name])
+        except (KeyError, ValueError):
+            continue
+    return default
+
+
+def _args(argv):
+    """Opciones de rpicam usadas por el backend: --opcion valor y banderas sueltas."""
+    options, i = {}, 0
+    while i < len(argv):
+        key = argv[i].lstrip("-")
+        value = argv[i + 1] if i + 1 < len(argv) else None
+        if value is not None and (value == "-" or not value.startswith("-")):  # "-o -" = stdout
+            options[key] = argv[i + 1]
+            i += 2
+        else:
+            options[key] = True
+            i += 1
+    return options
+
+
+class Scene:
+    def __init__(self, width: int, height: int, rng: random.Random):
+        self.width, self.height = width, height
+        self.rng = rng
+        self.noise = max(0.0, _env("NOISE", 1.0))
+        self.laser = _env("LASER", 1.0) > 0
+        brightness = _env("BRIGHTNESS", 130.0)
+        ramp = np.linspace(brightness - 40, brightness + 40, width, dtype=np.float32)
+        base = np.tile(ramp, (height, 1))
+        # Textura de "pared": líneas finas para que el Laplaciano no sea trivial
+        texture = np.zeros((height, width), np.float32)
+        for _ in range(150):
+            x, y = rng.randrange(width), rng.randrange(height)
+            cv2.line(texture, (x, y), (x + rng.randrange(-80, 80), y + rng.randrange(-80, 80)),
+                     rng.uniform(-50, 50), 1)
+        gray = np.clip(base + texture, 0, 255)
+        self.background = cv2.merge([gray, gray, gray * 0.95]).astype(np.uint8)
+        self.np_rng = np.random.default_rng(rng.randrange(2 ** 32))
+
+    def render(self, t: float) -> np.ndarray:
+        frame = self.background.copy()
+        if self.noise:
+            noise = self.np_rng.normal(0, 3.0 * self.noise, frame.shape).astype(np.int16)
+            frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        if self.laser:
+            cx = int(self.width / 2 + self.width / 6 * np.sin(t / 5.0))
+            cy = int(self.height / 2 + self.height / 8 * np.cos(t / 7.0))
+            cv2.circle(frame, (cx, cy), 9, (40, 40, 255), -1)
+            cv2.circle(frame, (cx, cy), 4, (200, 200, 255), -1)
+        return frame
+
+    def jpeg(self, t: float, quality: int) -> bytes:
+        ok, encoded = cv2.imencode(".jpg", self.render(t), [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return encoded.tobytes() if ok else b""
+
+
+def still(options, scene: Scene, fault_rate: float) -> int:
+    time.sleep(int(options.get("t", 100)) / 1000.0 + 0.05)  # Exposición + arranque del pipeline
+    if scene.rng.random() < fault_rate:
+        print("ERROR: *** failed to acquire camera (simulado) ***", file=sys.stderr)
+        return 1
+    output = options.get("output") or options.get("o")
+    data = scene.jpeg(time.time(), int(options.get("quality", 90)))
+    if output in (None, "-"):
+        sys.stdout.buffer.write(data)
+    else:
+        with open(output, "wb") as f:
+            f.write(data)
+    return 0
+
+
+def vid(options, scene: Scene, fault_rate: float) -> int:
+    fps = float(options.get("framerate", 30))
+    quality = int(options.get("quality", 75))
+    duration = int(options.get("t", 0)) / 1000.0
+    out = sys.stdout.buffer
+    start = time.monotonic()
+    frame_index = 0
+    try:
+        while not duration or time.monotonic() - start < duration:
+            data = scene.jpeg(time.time(), quality)
+            if scene.rng.random() < fault_rate:
+                data = data[:scene.rng.randrange(2, len(data))]  # Frame cortado: sin EOI
+            out.write(data)
+            out.flush()
+            frame_index += 1
+            delay = start + frame_index / fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    return 0
+
+
+def replay_vid(path: str) -> Optional[int]:
+    """Frames MJPEG grabados, al ritmo de REPLAY_SPEED (REPLAY_LOOP=1 repite); None si el log no los tiene."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+    from core.stream_log import ReplayClock, StreamLog, replay_loop, replay_speed
+
+    log = StreamLog(path)
+    if not log.has_channel("imx477/mjpeg"):
+        log.close()
+        return None
+    clock = ReplayClock(replay_speed())
+    out = sys.stdout.buffer
+    try:
+        while True:
+            for record in log.records(["imx477/mjpeg"]):
+                delay = clock.delay(record.timestamp)
+                if delay:
+                    time.sleep(delay)
+                out.write(record.payload)
+                out.flush()
+            if not replay_loop():
+                return 0
+            clock.restart()
+    except (BrokenPipeError, KeyboardInterrupt):
+        return 0
+
+
+def main(argv) -> int:
+    if not argv:
+        print("uso: fake_rpicam.py rpicam-still|rpicam-vid [opciones]", file=sys.stderr)
+        return 2
+    tool, options = argv[0], _args(argv[1:])
+    if tool.endswith("vid") and os.environ.get("REPLAY_STREAMS"):
+        result = replay_vid(os.environ["REPLAY_STREAMS"])
+        if result is not None:
+            return result
+    seed = os.environ.get("SIM_SEED")
+    rng = random.Random(int(seed) if seed and seed.isdigit() else None)
+    scene = Scene(int(options.get("width", 640)), int(options.get("height", 480)), rng)
+    fault_rate = min(1.0, max(0.0, _env("FAULT_RATE", 0.0)))
+    if tool.endswith("still"):
+        return still(options, scene, fault_rate)
+    if tool.endswith("vid"):
+        return vid(options, scene, fault_rate)
+    print(f"herramienta desconocida: {tool}", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
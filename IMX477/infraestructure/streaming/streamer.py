@@ -7,6 +7,9 @@ import logging
 import threading
 import numpy as np
 import cv2
+from IMX477.infraestructure.camera.rpicam import rpicam_command
+from IMX477.infraestructure.camera.capture_daemon import get_capture_daemon
+from core.stream_log import stream_writer
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +34,7 @@ class Streamer:
         # Contador para actualizar frame compartido solo cada N frames
         self._frame_counter = 0
         self._update_every_n_frames = 10
+        self._record = stream_writer("imx477/mjpeg")  # Cada frame JPEG del streaming (RECORD_STREAMS)
         
     def get_current_frame(self) -> Optional[np.ndarray]:
         """Obtiene una copia del frame actual del streaming para análisis."""
@@ -82,6 +86,10 @@ class Streamer:
     async def start_stream(self) -> bool:
         """Inicia el streaming de video."""
         try:
+            # La cámara admite un solo proceso: liberar el pipeline de capturas
+            daemon = get_capture_daemon()
+            if daemon is not None:
+                daemon.stop()
             self.kill_zombie_rpicam()
             
             if self.proc is not None and self.proc.poll() is None:
@@ -95,7 +103,7 @@ class Streamer:
             # Comando estable con buena fluidez
             self.proc = subprocess.Popen(
                 [
-                    "rpicam-vid", 
+                    *rpicam_command("rpicam-vid"),
                     "--nopreview", 
                     "-t", "0",
                     "--codec", "mjpeg", 
@@ -213,6 +221,8 @@ class Streamer:
                     frame = buffer[:frame_end]
                     buffer = buffer[frame_end:]
                     frame_count += 1
+                    if self._record is not None:
+                        self._record(frame)
                     
                     # Log cada 30 frames
                     if frame_count % 30 == 0:
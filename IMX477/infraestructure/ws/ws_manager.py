@@ -1,25 +1,28 @@
 # IMX477/infraestructure/ws/ws_manager.py
 from fastapi import WebSocket
 from typing import List
+from core.ws_hub import ws_hub
 
 class WebSocketManager_IMX:
-    def __init__(self):
+    """Compatibilidad con /imx477/sensor/ws: la difusión la hace el hub (core/ws_hub.py)."""
+    SENSOR = "imx477"
+
+    def __init__(self, hub=ws_hub):
+        self.hub = hub
         self.active_connections: List[WebSocket] = []
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.hub.attach(websocket, [self.SENSOR], legacy=True, backfill=True)  # Historial reciente de una vez
         print(f"Cliente WebSocket conectado (Sensor IMX477) ({len(self.active_connections)} conectado(s))")
 
     def disconnect(self, websocket: WebSocket):
+        self.hub.detach(websocket)
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             print(f"Cliente WebSocket desconectado (Sensor IMX477)")
 
-    async def send_data(self, data: dict):
-        for conn in self.active_connections:
-            try:
-                await conn.send_json(data)
-            except Exception as e:
-                print("Error enviando datos por WebSocket:", e)
-ws_manager_imx= WebSocketManager_IMX()
\ No newline at end of file
+    async def send_data(self, data):
+        await self.hub.publish(self.SENSOR, data)
+ws_manager_imx= WebSocketManager_IMX()
@@ -2,16 +2,22 @@
 from MPU6050.domain.entities.sensor_mpu import SensorMPU
 from MPU6050.domain.repositories.mpu_repository import MPURepository
 from MPU6050.domain.ports.mpu_publisher import MPUPublisher
+from MPU6050.domain.services.calibration import (
+    LEVEL, MPUCalibration, add_position, calibrate_level
+)
 
 class MPUUseCase:
-    def __init__(self, reader, repository: MPURepository, publisher: MPUPublisher, is_connected):
-        self.reader = reader
+    def __init__(self, reader, repository: MPURepository, publisher: MPUPublisher, is_connected,
+                 calibration_store=None, device_id: str = "mpu6050"):
+        self.reader = reader  # Su hilo drena la FIFO en un ArrayRing: read() es O(1)
         self.repository = repository
         self.publisher = publisher
         self.is_connected = is_connected
+        self.calibration_store = calibration_store
+        self.device_id = device_id
 
     async def execute(self, project_id=1, event=False):
-        raw = await self.reader.read()  # ASYNC: Usa await para no bloquear I2C
+        raw = await self.reader.read()
         if not raw:
             return None
 
@@ -25,6 +31,52 @@ class MPUUseCase:
 
         return data
 
+    def get_orientation(self):
+        """Roll/pitch filtrados y métrica de estabilidad del estimador (None si no hay datos)."""
+        orientation = getattr(self.reader, "orientation", None)
+        state = orientation() if orientation else None
+        return state.as_dict() if state else None
+
+    def load_calibration(self):
+        """Aplica al lector la calibración guardada para este dispositivo (al arrancar)."""
+        if not self.calibration_store:
+            return None
+        calibration = self.calibration_store.load(self.device_id)
+        if calibration and not calibration.is_identity:
+            self.reader.set_calibration(calibration)
+            print(f"🎯 MPU6050: calibración '{calibration.method}' cargada para {self.device_id}")
+        return calibration
+
+    def _current_calibration(self) -> MPUCalibration:
+        stored = self.calibration_store.load(self.device_id) if self.calibration_store else None
+        return stored or MPUCalibration(device_id=self.device_id)
+
+    async def calibrate(self, samples: int = 2000, position: str = LEVEL):
+        """
+        Captura `samples` muestras en reposo de la FIFO y estima bias (y escala en
+        seis posiciones). La nueva corrección se guarda y se aplica sin reiniciar el lector.
+        """
+        values = await self.reader.collect(samples)
+        current = self._current_calibration()
+        if position == LEVEL:
+            calibration = calibrate_level(current, values)
+        else:
+            calibration = add_position(current, position, values)
+
+        if self.calibration_store:
+            self.calibration_store.save(calibration)
+        if not calibration.is_identity:
+            self.reader.set_calibration(calibration)
+        return calibration.model_dump(mode="json")
+
+    def get_calibration(self):
+        return self._current_calibration().model_dump(mode="json")
+
+    def reset_calibration(self):
+        deleted = self.calibration_store.delete(self.device_id) if self.calibration_store else False
+        self.reader.set_calibration(None)
+        return deleted
+
     async def create(self, data: SensorMPU):
         if not data.event:
             return {"msg": "No se almacenó porque event es False"}
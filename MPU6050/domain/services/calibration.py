@@ -0,0 +1,122 @@
+# MPU6050/domain/services/calibration.py
+"""
+Calibración de bias y escala del MPU6050 a partir de muestras en reposo.
+
+Corrección aplicada a cada muestra (en g y °/s, tras la escala nominal):
+    accel = (a - accel_bias) / accel_scale
+    gyro  =  g - gyro_bias
+
+Modos:
+- level:  sensor quieto y nivelado (Z hacia arriba). Bias del giroscopio por
+          promedio; bias del acelerómetro = promedio - (0, 0, 1 g); escala 1.
+- seis posiciones: una captura por eje hacia arriba y hacia abajo
+          (x_up, x_down, y_up, y_down, z_up, z_down). Por eje:
+          bias = (up + down) / 2, escala = (up - down) / 2.
+
+Las estimaciones se hacen sobre muestras ya corregidas con la calibración
+vigente y se componen con ella (compose), así no hace falta un modo "crudo".
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+POSITIONS = ("x_up", "x_down", "y_up", "y_down", "z_up", "z_down")
+LEVEL = "level"
+
+# Umbrales de reposo: por encima, el sensor se movió durante la captura
+MAX_GYRO_STD_DPS = 1.0
+MAX_ACCEL_STD_G = 0.05
+
+
+class CalibrationError(ValueError):
+    """Captura inválida para calibrar (movimiento, posición desconocida, ...)."""
+
+
+class MPUCalibration(BaseModel):
+    device_id: str
+    accel_bias: List[float] = [0.0, 0.0, 0.0]
+    accel_scale: List[float] = [1.0, 1.0, 1.0]
+    gyro_bias: List[float] = [0.0, 0.0, 0.0]
+    method: str = "none"
+    samples: int = 0
+    created_at: Optional[datetime] = None
+    # Capturas del modo seis posiciones en curso: [ax, ay, az, gx, gy, gz, n] sin corregir
+    positions: Dict[str, List[float]] = {}
+
+    @property
+    def is_identity(self) -> bool:
+        return self.method == "none"
+
+    def gain_offset(self):
+        """(gain, offset) por columna [ax, ay, az, gx, gy, gz]: corregido = valor * gain - offset."""
+        scale = np.array(self.accel_scale, dtype=np.float64)
+        gain = np.concatenate((1.0 / scale, np.ones(3)))
+        offset = np.concatenate((np.array(self.accel_bias) / scale, np.array(self.gyro_bias)))
+        return gain, offset
+
+    def compose(self, accel_bias, accel_scale, gyro_bias) -> "MPUCalibration":
+        """Aplica una corrección estimada sobre datos ya corregidos con esta calibración."""
+        scale = np.array(self.accel_scale)
+        return self.model_copy(update={
+            "accel_bias": (np.array(self.accel_bias) + scale * np.asarray(accel_bias)).round(6).tolist(),
+            "accel_scale": (scale * np.asarray(accel_scale)).round(6).tolist(),
+            "gyro_bias": (np.array(self.gyro_bias) + np.asarray(gyro_bias)).round(6).tolist(),
+        })
+
+
+def check_stationary(values: np.ndarray) -> np.ndarray:
+    """Promedio de una captura (n, 6) en reposo. Lanza CalibrationError si hubo movimiento."""
+    if values.shape[0] < 100:
+        raise CalibrationError(f"Muestras insuficientes para calibrar ({values.shape[0]})")
+    std = values.std(axis=0)
+    if (std[3:] > MAX_GYRO_STD_DPS).any() or (std[:3] > MAX_ACCEL_STD_G).any():
+        raise CalibrationError(
+            f"El sensor se movió durante la captura (σ accel {std[:3].round(3).tolist()} g, "
+            f"σ giro {std[3:].round(3).tolist()} °/s). Repetir con el sensor quieto."
+        )
+    return values.mean(axis=0)
+
+
+def calibrate_level(current: MPUCalibration, values: np.ndarray) -> MPUCalibration:
+    mean = check_stationary(values)
+    accel_bias = mean[:3] - np.array([0.0, 0.0, 1.0])
+    return current.compose(accel_bias, np.ones(3), mean[3:]).model_copy(update={
+        "method": LEVEL, "samples": int(values.shape[0]), "created_at": datetime.utcnow(), "positions": {}
+    })
+
+
+def add_position(current: MPUCalibration, position: str, values: np.ndarray) -> MPUCalibration:
+    """
+    Registra una posición del modo seis posiciones. Al completar las seis,
+    retorna la calibración compuesta; mientras tanto, la vigente con la posición guardada.
+    """
+    if position not in POSITIONS:
+        raise CalibrationError(f"Posición no soportada: {position}. Disponibles: {LEVEL}, {', '.join(POSITIONS)}")
+    mean = check_stationary(values)
+    # Se guarda sin la corrección vigente ([ax, ay, az, gx, gy, gz, n]) para que las capturas sean comparables
+    scale, bias = np.array(current.accel_scale), np.array(current.accel_bias)
+    uncorrected = np.concatenate((mean[:3] * scale + bias, mean[3:] + np.array(current.gyro_bias)))
+    positions = {**current.positions, position: [*uncorrected.round(6).tolist(), int(values.shape[0])]}
+
+    if not all(p in positions for p in POSITIONS):
+        return current.model_copy(update={"positions": positions})
+
+    accel_bias, accel_scale = np.zeros(3), np.ones(3)
+    for axis, name in enumerate("xyz"):
+        up = positions[f"{name}_up"][axis]
+        down = positions[f"{name}_down"][axis]
+        accel_bias[axis] = (up + down) / 2
+        accel_scale[axis] = (up - down) / 2
+    if (np.abs(accel_scale - 1.0) > 0.2).any():
+        raise CalibrationError(f"Escalas fuera de rango ({accel_scale.round(3).tolist()}): revisar las posiciones capturadas")
+    return MPUCalibration(
+        device_id=current.device_id,
+        accel_bias=accel_bias.round(6).tolist(),
+        accel_scale=accel_scale.round(6).tolist(),
+        gyro_bias=np.mean([positions[p][3:6] for p in POSITIONS], axis=0).round(6).tolist(),
+        method="six_position",
+        samples=int(sum(positions[p][6] for p in POSITIONS)),
+        created_at=datetime.utcnow(),
+    )
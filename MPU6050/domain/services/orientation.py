@@ -0,0 +1,131 @@
+# MPU6050/domain/services/orientation.py
+"""
+Estimador de orientación (roll/pitch) por filtro complementario.
+
+El acelerómetro da la inclinación absoluta pero es ruidoso y sensible a la
+vibración; el giroscopio es suave pero deriva. Por cada muestra:
+    ángulo = alpha * (ángulo + giro * dt) + (1 - alpha) * ángulo_acelerómetro
+Si |a| se aleja de 1 g más que accel_tolerance (golpes, vibración fuerte), esa
+muestra solo integra el giroscopio.
+
+La estabilidad se mide con la varianza exponencial (constante de tiempo
+stability_tau) de roll y pitch filtrados y la velocidad angular media:
+stable = jitter_deg < max_jitter_deg y gyro_dps < max_gyro_dps.
+"""
+import math
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+RAD_TO_DEG = 180.0 / math.pi
+
+
+class Orientation(NamedTuple):
+    timestamp: float
+    roll: float
+    pitch: float
+    apertura: float
+    jitter_deg: float   # Desviación estándar reciente de roll/pitch filtrados
+    gyro_dps: float     # Velocidad angular media reciente (°/s)
+    stable: bool
+    samples: int
+
+    def as_dict(self) -> dict:
+        return {
+            "roll": round(self.roll, 2),
+            "pitch": round(self.pitch, 2),
+            "apertura": round(self.apertura, 2),
+            "jitter_deg": round(self.jitter_deg, 3),
+            "gyro_dps": round(self.gyro_dps, 3),
+            "stable": self.stable,
+            "samples": self.samples,
+            "age_s": round(time.time() - self.timestamp, 3),
+        }
+
+
+class ComplementaryFilter:
+    """
+    Se actualiza de forma incremental con lotes [t, ax, ay, az, gx, gy, gz]
+    desde el hilo de muestreo; `state` es una tupla inmutable que se reemplaza
+    en bloque, así los lectores la consultan en O(1) sin locks.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.98,
+        accel_tolerance: float = 0.15,
+        stability_tau: float = 1.0,
+        max_jitter_deg: float = 0.3,
+        max_gyro_dps: float = 2.0,
+        max_gap: float = 0.25
+    ):
+        self.alpha = alpha
+        self.accel_tolerance = accel_tolerance
+        self.stability_tau = stability_tau
+        self.max_jitter_deg = max_jitter_deg
+        self.max_gyro_dps = max_gyro_dps
+        self.max_gap = max_gap  # Hueco (s) tras el que se reinicia desde el acelerómetro
+        self.state: Optional[Orientation] = None
+        self._roll = self._pitch = None
+        self._mean_roll = self._mean_pitch = 0.0
+        self._var_roll = self._var_pitch = 0.0
+        self._gyro = 0.0
+        self._last_t = None
+        self._samples = 0
+
+    def update_batch(self, rows: np.ndarray) -> Optional[Orientation]:
+        alpha, tolerance, tau = self.alpha, self.accel_tolerance, self.stability_tau
+        roll, pitch, last_t = self._roll, self._pitch, self._last_t
+        mean_r, mean_p, var_r, var_p, gyro = self._mean_roll, self._mean_pitch, self._var_roll, self._var_pitch, self._gyro
+
+        # Ángulos y |a| del acelerómetro, vectorizados para todo el lote
+        ax, ay, az = rows[:, 1], rows[:, 2], rows[:, 3]
+        acc_roll = np.arctan2(ay, az) * RAD_TO_DEG
+        acc_pitch = np.arctan2(-ax, np.sqrt(ay * ay + az * az)) * RAD_TO_DEG
+        trusted = np.abs(np.sqrt(ax * ax + ay * ay + az * az) - 1.0) <= tolerance
+        gyro_norm = np.sqrt(rows[:, 4] ** 2 + rows[:, 5] ** 2 + rows[:, 6] ** 2)
+
+        # La recursión del filtro sí es secuencial (unas centenas de muestras por segundo)
+        for t, gx, gy, a_roll, a_pitch, ok, g in zip(
+            rows[:, 0].tolist(), rows[:, 4].tolist(), rows[:, 5].tolist(),
+            acc_roll.tolist(), acc_pitch.tolist(), trusted.tolist(), gyro_norm.tolist()
+        ):
+            if roll is None or t - last_t > self.max_gap:
+                # Primera muestra o FIFO reiniciada: integrar el giro sobre el hueco daría un salto
+                roll, pitch = mean_r, mean_p = a_roll, a_pitch
+                last_t = t
+                continue
+            dt = max(0.0, t - last_t)
+            last_t = t
+            roll += gx * dt
+            pitch += gy * dt
+            if ok:
+                roll = alpha * roll + (1 - alpha) * a_roll
+                pitch = alpha * pitch + (1 - alpha) * a_pitch
+            k = 1.0 - math.exp(-dt / tau) if tau > 0 else 1.0
+            d_r, d_p = roll - mean_r, pitch - mean_p
+            mean_r += k * d_r
+            mean_p += k * d_p
+            var_r = (1 - k) * (var_r + k * d_r * d_r)
+            var_p = (1 - k) * (var_p + k * d_p * d_p)
+            gyro += k * (g - gyro)
+
+        self._samples += rows.shape[0]
+        if roll is None:
+            return self.state
+        self._roll, self._pitch, self._last_t = roll, pitch, last_t
+        self._mean_roll, self._mean_pitch, self._var_roll, self._var_pitch, self._gyro = mean_r, mean_p, var_r, var_p, gyro
+
+        jitter = math.sqrt(var_r + var_p)
+        self.state = Orientation(
+            timestamp=last_t,
+            roll=roll,
+            pitch=pitch,
+            apertura=abs(roll) + abs(pitch),
+            jitter_deg=jitter,
+            gyro_dps=gyro,
+            stable=jitter < self.max_jitter_deg and gyro < self.max_gyro_dps,
+            samples=self._samples,
+        )
+        return self.state
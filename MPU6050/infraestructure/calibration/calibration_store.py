@@ -0,0 +1,63 @@
+# MPU6050/infraestructure/calibration/calibration_store.py
+import json
+import os
+import platform
+import threading
+from typing import Optional
+
+from MPU6050.domain.services.calibration import MPUCalibration
+
+
+def device_id(bus: int, address: int) -> str:
+    """Clave del dispositivo: host + bus I2C + dirección (MPU_DEVICE_ID la reemplaza)."""
+    return os.getenv("MPU_DEVICE_ID") or f"{platform.node()}:i2c-{bus}:0x{address:02x}"
+
+
+class CalibrationStore:
+    """
+    Almacén local de calibraciones en un archivo JSON {device_id: calibración}.
+    Se escribe de forma atómica (archivo temporal + os.replace) para no dejar
+    el archivo a medias si se corta la energía de la Raspberry.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("MPU_CALIBRATION_PATH", "./mpu_calibration.json")
+        self._lock = threading.Lock()
+
+    def _load_all(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ MPU6050: archivo de calibración ilegible ({self.path}): {e}")
+            return {}
+
+    def _write_all(self, data: dict) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def load(self, device: str) -> Optional[MPUCalibration]:
+        with self._lock:
+            entry = self._load_all().get(device)
+        return MPUCalibration(**entry) if entry else None
+
+    def save(self, calibration: MPUCalibration) -> None:
+        with self._lock:
+            data = self._load_all()
+            data[calibration.device_id] = calibration.model_dump(mode="json")
+            self._write_all(data)
+
+    def delete(self, device: str) -> bool:
+        with self._lock:
+            data = self._load_all()
+            if device not in data:
+                return False
+            del data[device]
+            self._write_all(data)
+            return True
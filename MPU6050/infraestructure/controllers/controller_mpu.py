@@ -9,6 +9,18 @@ class MPUController:
     async def get_mpu_data(self, event: bool = False):
         return await self.usecase.execute(event=event)
 
+    async def get_orientation(self):
+        return self.usecase.get_orientation()
+
+    async def calibrate(self, samples: int, position: str):
+        return await self.usecase.calibrate(samples=samples, position=position)
+
+    async def get_calibration(self):
+        return self.usecase.get_calibration()
+
+    async def reset_calibration(self):
+        return self.usecase.reset_calibration()
+
     async def create_sensor(self, data: SensorMPU):
         return await self.usecase.create(data)
     
@@ -5,6 +5,9 @@ from MPU6050.infraestructure.mqtt.publisher import RabbitMQMPUPublisher
 from MPU6050.application.mpu_usecase import MPUUseCase
 from MPU6050.infraestructure.controllers.controller_mpu import MPUController
 from MPU6050.infraestructure.repositories.mpu_repo_dual import DualMPURepository
+from MPU6050.infraestructure.calibration.calibration_store import CalibrationStore, device_id
+from core.simulation import is_simulated, simulation_config
+from core.stream_log import get_replay_log, is_replayed, replay_loop, replay_speed
 
 def init_mpu_dependencies(
     app: FastAPI,
@@ -13,7 +16,18 @@ def init_mpu_dependencies(
     rabbitmq_config: dict,
     is_connected_fn
 ):
-    reader = MPUSerialReader()
+    if is_replayed("mpu6050"):
+        # Ráfagas de FIFO grabadas, entregadas por un bus I2C en memoria
+        from MPU6050.infraestructure.simulation.mpu_replay import replay_bus_factory
+        print(f"⏯️ MPU6050 reproduciendo {get_replay_log().path} (x{replay_speed():g})")
+        reader = MPUSerialReader(bus_factory=replay_bus_factory(get_replay_log(), replay_speed(), replay_loop()))
+    elif is_simulated("mpu6050"):
+        # Bus I2C simulado con los registros del MPU6050 (FIFO incluida)
+        from MPU6050.infraestructure.simulation.mpu_simulator import fake_bus_factory
+        print("🧪 MPU6050 simulado (bus I2C en memoria)")
+        reader = MPUSerialReader(bus_factory=fake_bus_factory(simulation_config("mpu6050", 1000.0)))
+    else:
+        reader = MPUSerialReader()
     repository = DualMPURepository(session_local_factory, session_remote_factory)
     publisher = RabbitMQMPUPublisher(
         host=rabbitmq_config["host"],
@@ -22,6 +36,14 @@ def init_mpu_dependencies(
         routing_key=rabbitmq_config["routing_key_mpu"]
     )
 
-    usecase = MPUUseCase(reader, repository, publisher, is_connected_fn)
+    calibration_store = CalibrationStore()
+
+    usecase = MPUUseCase(
+        reader, repository, publisher, is_connected_fn,
+        calibration_store=calibration_store,
+        device_id=device_id(reader.bus_number, reader.address)
+    )  # Sin Sampler: el hilo del lector ya es el dueño de la FIFO (como TF-Luna y HC-SR04)
+    usecase.load_calibration()
     controller = MPUController(usecase)
-    app.state.mpu_controller = controller
\ No newline at end of file
+    app.state.mpu_controller = controller
+    app.state.mpu_reader = reader
\ No newline at end of file
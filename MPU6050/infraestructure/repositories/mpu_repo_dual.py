@@ -21,16 +21,18 @@ class DualMPURepository(MPURepository):
         """Retorna el semáforo apropiado según el tipo de BD."""
         return DB_SEMAPHORE_REMOTE if online else DB_SEMAPHORE_LOCAL
 
-    async def save(self, sensor_data: SensorMPU, online: bool):
-        """Guarda localmente (rápido). La sincronización remota la hace sync_service en background."""
+    def local_model(self, sensor_data: SensorMPU) -> SensorMPUModel:
+        """Fila local pendiente de sync (también la usa el snapshot multi-sensor)."""
         data_dict = sensor_data.dict()
         data_dict.pop('id', None)
-        
+        return SensorMPUModel(**data_dict, synced=False)
+
+    async def save(self, sensor_data: SensorMPU, online: bool):
+        """Guarda localmente (rápido). La sincronización remota la hace sync_service en background."""
         # Solo guardar localmente - el sync_service se encarga del remoto
         async with self.local_factory() as session_local:
             try:
-                local_model = SensorMPUModel(**data_dict, synced=False)
-                session_local.add(local_model)
+                session_local.add(self.local_model(sensor_data))
                 await session_local.commit()
                 logger.debug("MPU6050: Guardado local exitoso, pendiente de sync")
             except Exception as e:
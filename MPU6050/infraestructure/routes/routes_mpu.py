@@ -1,13 +1,17 @@
 # MPU6050/infraestructure/routes/routes_mpu.py
-from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.responses import JSONResponse
 from MPU6050.domain.entities.sensor_mpu import SensorMPU
-from MPU6050.infraestructure.ws.ws_manager import WebSocketManager_MPU
+from MPU6050.infraestructure.ws.ws_manager import ws_manager_mpu  # Instancia compartida con el hub
 from core.concurrency import RATE_LIMITERS
+from core.serialization import success_response
+from core.sse import sse_response
+from core.admin import require_admin
+from MPU6050.domain.services.calibration import LEVEL, POSITIONS, CalibrationError
+from typing import Optional
 import asyncio
 
 router_ws_mpu = APIRouter()
-ws_manager_mpu = WebSocketManager_MPU()
 router = APIRouter()
 
 @router.get("/mpu/sensor")
@@ -23,7 +27,7 @@ async def get_mpu_data(request: Request, event: bool = False):
             timeout=5.0
         )
         if data:
-            return {"success": True, "data": data.dict()}
+            return success_response(data)
         return JSONResponse(
             status_code=503,
             content={"success": False, "error": "El sensor MPU6050 no está disponible o no hay datos"}
@@ -33,6 +37,69 @@ async def get_mpu_data(request: Request, event: bool = False):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al leer sensor MPU6050: {str(e)}")
 
+@router.get("/mpu/sensor/orientation")
+async def get_mpu_orientation(request: Request):
+    """
+    Orientación filtrada (complementario acelerómetro + giroscopio) y estabilidad:
+    jitter_deg (desviación reciente de roll/pitch), gyro_dps y stable.
+    """
+    controller = request.app.state.mpu_controller
+    data = await controller.get_orientation()
+    if data:
+        return {"success": True, "data": data}
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "error": "El estimador de orientación MPU6050 no tiene datos recientes"}
+    )
+
+@router.get("/mpu/sensor/stream")
+async def mpu_stream(
+    request: Request,
+    project_id: Optional[int] = None,
+    max_rate: Optional[float] = None,
+    aggregate: Optional[str] = None,
+    backfill: int = 0
+):
+    """
+    Stream SSE de lecturas MPU6050 (mismo origen que los WebSocket).
+    Reanuda desde el historial en memoria con la cabecera Last-Event-ID.
+    """
+    return sse_response(request, "mpu6050", project_id, max_rate, aggregate, backfill)
+
+@router.post("/mpu/admin/calibration", dependencies=[Depends(require_admin)])
+async def calibrate_mpu(request: Request, samples: int = 2000, position: str = LEVEL):
+    """
+    Calibra el MPU6050 con el sensor quieto. position=level (nivelado, Z arriba) estima
+    los bias; x_up, x_down, y_up, y_down, z_up, z_down capturan las seis posiciones y
+    al completar la última se estiman además las escalas del acelerómetro.
+    """
+    if not 100 <= samples <= 4000:
+        raise HTTPException(status_code=400, detail="samples debe estar entre 100 y 4000")
+    if position != LEVEL and position not in POSITIONS:
+        raise HTTPException(status_code=400, detail=f"position debe ser {LEVEL} o una de: {', '.join(POSITIONS)}")
+
+    controller = request.app.state.mpu_controller
+    try:
+        data = await controller.calibrate(samples, position)
+        return {"success": True, "data": data}
+    except CalibrationError as e:
+        return JSONResponse(status_code=409, content={"success": False, "error": str(e)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al calibrar MPU6050: {str(e)}")
+
+@router.get("/mpu/admin/calibration", dependencies=[Depends(require_admin)])
+async def get_mpu_calibration(request: Request):
+    """Calibración vigente del MPU6050 (method=none si no hay ninguna guardada)."""
+    controller = request.app.state.mpu_controller
+    return {"success": True, "data": await controller.get_calibration()}
+
+@router.delete("/mpu/admin/calibration", dependencies=[Depends(require_admin)])
+async def delete_mpu_calibration(request: Request):
+    """Elimina la calibración guardada y vuelve a la escala nominal del sensor."""
+    controller = request.app.state.mpu_controller
+    deleted = await controller.reset_calibration()
+    return {"success": True, "msg": "Calibración eliminada" if deleted else "No había calibración guardada"}
+
 @router.post("/mpu/sensor")
 async def post_mpu_sensor(request: Request, payload: SensorMPU):
     """Guarda una nueva medición del sensor MPU6050."""
@@ -1,45 +1,122 @@
 #MPU6050/infraestructure/serial/mpu_serial_reader.py
 import time
-import math
 import platform
+import threading
 import asyncio
 from typing import Optional, Dict
 
+import numpy as np
+
+from core.sample_ring import ArrayRing
+from core.stream_log import stream_writer
+from MPU6050.domain.services.orientation import ComplementaryFilter, Orientation
+from MPU6050.domain.services.calibration import MPUCalibration
+
 IS_WINDOWS = platform.system() == "Windows"
 
 if not IS_WINDOWS:
     import smbus2 as smbus
 
+# Registros MPU6050
+REG_SMPLRT_DIV = 0x19
+REG_CONFIG = 0x1A
+REG_GYRO_CONFIG = 0x1B
+REG_ACCEL_CONFIG = 0x1C
+REG_FIFO_EN = 0x23
+REG_USER_CTRL = 0x6A
+REG_PWR_MGMT_1 = 0x6B
+REG_FIFO_COUNTH = 0x72
+REG_FIFO_R_W = 0x74
+
+FIFO_EN_ACCEL_GYRO = 0x78      # XG, YG, ZG y ACCEL (sin temperatura)
+USER_CTRL_FIFO_EN = 0x40
+USER_CTRL_FIFO_RESET = 0x04
+FIFO_SIZE = 1024
+SAMPLE_BYTES = 12              # ax ay az gx gy gz, int16 big-endian
+MAX_BATCH = FIFO_SIZE // SAMPLE_BYTES
+GYRO_OUTPUT_RATE = 1000.0      # Hz con DLPF activo (DLPF_CFG 1..6)
+
+ACCEL_SCALE = 16384.0          # ±2 g
+GYRO_SCALE = 131.0             # ±250 °/s
+
+# Columnas del ArrayRing
+COL_T, COL_AX, COL_AY, COL_AZ, COL_GX, COL_GY, COL_GZ = range(7)
+_SCALE = np.array([ACCEL_SCALE] * 3 + [GYRO_SCALE] * 3)
+
+
+def decode_fifo(raw: bytes, gain: np.ndarray, offset: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Bytes de la FIFO (múltiplo de 12) -> (n, 6) en g y °/s ya calibrados, escritos en `out`.
+    gain incluye la escala nominal: valor = crudo * gain - offset (sin arrays temporales).
+    """
+    counts = np.frombuffer(raw, dtype=">i2").reshape(-1, 6)
+    values = out[:counts.shape[0]]
+    np.multiply(counts, gain, out=values)
+    np.subtract(values, offset, out=values)
+    return values
+
+
 class MPUSerialReader:
-    def __init__(self, bus=1, address=0x68):
+    """
+    Muestreo de alta frecuencia del MPU6050 vía FIFO.
+    Configura divisor de muestreo, DLPF y FIFO (acelerómetro + giroscopio); un
+    hilo dedicado lee la FIFO por bloques (un par de transacciones I2C por lote
+    en vez de 12 por muestra), decodifica el lote con NumPy y lo guarda con
+    timestamps en un ArrayRing. El mismo hilo actualiza el filtro complementario
+    de orientación, así que read() solo consulta la última muestra y el último
+    roll/pitch filtrado.
+    """
+
+    def __init__(self, bus=1, address=0x68, sample_rate=200.0, dlpf=3, batch=10, buffer_size=4096, max_age=1.0,
+                 bus_factory=None):
         self.address = address
         self.bus_number = bus
         self.bus = None
+        self._bus_factory = bus_factory  # Reemplazo de smbus2.SMBus (p. ej. bus simulado)
         self.is_available = False
         self._last_error_time = 0
         self._error_retry_delay = 5  # Segundos entre reintentos tras error
-        
-        if not IS_WINDOWS:
+        self.dlpf = dlpf
+        self.divider = max(0, min(255, round(GYRO_OUTPUT_RATE / sample_rate) - 1))
+        self.sample_rate = GYRO_OUTPUT_RATE / (1 + self.divider)  # Tasa real tras redondear el divisor
+        self.poll_interval = batch / self.sample_rate
+        self.max_age = max_age
+        self.samples = ArrayRing(buffer_size, 7)
+        self.fusion = ComplementaryFilter()
+        # Buffers del lote reutilizados en cada lectura de la FIFO (solo el hilo de muestreo los toca)
+        self._rows = np.empty((MAX_BATCH, 7), dtype=np.float64)
+        self._ages = np.arange(MAX_BATCH - 1, -1, -1) / self.sample_rate
+        self.calibration: Optional[MPUCalibration] = None
+        self._correction = (1.0 / _SCALE, np.zeros(6))  # (gain, offset) sin calibrar
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._record = stream_writer("mpu6050")  # Grabación de las ráfagas crudas de la FIFO (RECORD_STREAMS)
+        self._use_rdwr = not IS_WINDOWS  # i2c_msg viene de smbus2, que no se importa en Windows
+        self.stats = {"batches": 0, "i2c_transactions": 0, "bytes": 0, "overflows": 0, "read_errors": 0}
+
+        if not IS_WINDOWS or bus_factory is not None:
             self._initialize_bus()
+            self.start()  # Si el bus no está listo, el hilo reintenta la conexión
         else:
             print("🧪 Ejecutando en modo simulado (Windows). No se accede al hardware.")
             self.is_available = True  # Simulación disponible
 
     def _initialize_bus(self) -> bool:
-        """Inicializa o reinicializa el bus I2C."""
+        """Inicializa o reinicializa el bus I2C y configura la FIFO."""
         try:
             if self.bus is not None:
                 try:
                     self.bus.close()
                 except:
                     pass
-            
-            self.bus = smbus.SMBus(self.bus_number)
-            # Despertar el MPU6050 (escribir 0 en registro PWR_MGMT_1)
-            self.bus.write_byte_data(self.address, 0x6B, 0)
+
+            self.bus = (self._bus_factory or smbus.SMBus)(self.bus_number)
+            # Despertar el MPU6050 con el PLL del giroscopio X como reloj (más estable que el oscilador interno)
+            self.bus.write_byte_data(self.address, REG_PWR_MGMT_1, 0x01)
             time.sleep(0.1)  # Esperar a que se estabilice
+            self._configure_fifo()
             self.is_available = True
-            print("✅ MPU6050 inicializado correctamente")
+            print(f"✅ MPU6050 inicializado correctamente (FIFO a {self.sample_rate:g} Hz, DLPF {self.dlpf})")
             return True
         except OSError as e:
             print(f"⚠️ MPU6050 no disponible (I2C error): {e}")
@@ -50,71 +127,191 @@ class MPUSerialReader:
             self.is_available = False
             return False
 
-    def _read_sync(self) -> Optional[Dict]:
-        """Lectura síncrona (ejecutada en thread separado)"""
-        if IS_WINDOWS:
-            # Datos simulados para pruebas en Windows
-            return {
-                "ax": 0.01, "ay": 0.02, "az": 0.98,
-                "gx": 0.1, "gy": 0.2, "gz": 0.3,
-                "roll": 1.5, "pitch": 0.5, "apertura": 2.0
-            }
-        
-        # Si no está disponible, intentar reinicializar después del delay
-        if not self.is_available:
-            current_time = time.time()
-            if current_time - self._last_error_time > self._error_retry_delay:
+    def _configure_fifo(self):
+        write = self.bus.write_byte_data
+        write(self.address, REG_CONFIG, self.dlpf & 0x07)
+        write(self.address, REG_SMPLRT_DIV, self.divider)
+        write(self.address, REG_GYRO_CONFIG, 0x00)
+        write(self.address, REG_ACCEL_CONFIG, 0x00)
+        write(self.address, REG_USER_CTRL, 0x00)
+        write(self.address, REG_USER_CTRL, USER_CTRL_FIFO_RESET)
+        write(self.address, REG_FIFO_EN, FIFO_EN_ACCEL_GYRO)
+        write(self.address, REG_USER_CTRL, USER_CTRL_FIFO_EN)
+
+    def _reset_fifo(self):
+        self.bus.write_byte_data(self.address, REG_USER_CTRL, USER_CTRL_FIFO_RESET)
+        self.bus.write_byte_data(self.address, REG_USER_CTRL, USER_CTRL_FIFO_EN)
+        self.stats["overflows"] += 1
+
+    def _fifo_count(self) -> int:
+        high, low = self.bus.read_i2c_block_data(self.address, REG_FIFO_COUNTH, 2)
+        self.stats["i2c_transactions"] += 1
+        return (high << 8) | low
+
+    def _read_fifo(self, length: int) -> bytes:
+        """Lee `length` bytes de FIFO_R_W: una transacción i2c_rdwr, o bloques SMBus de 24 bytes."""
+        if self._use_rdwr:
+            try:
+                write = smbus.i2c_msg.write(self.address, [REG_FIFO_R_W])
+                read = smbus.i2c_msg.read(self.address, length)
+                self.bus.i2c_rdwr(write, read)
+                self.stats["i2c_transactions"] += 1
+                return bytes(read)
+            except (AttributeError, NotImplementedError):
+                self._use_rdwr = False  # Adaptador sin I2C_RDWR: bloques SMBus
+        data = bytearray()
+        while len(data) < length:
+            chunk = min(2 * SAMPLE_BYTES, length - len(data))  # SMBus limita a 32 bytes
+            data += bytes(self.bus.read_i2c_block_data(self.address, REG_FIFO_R_W, chunk))
+            self.stats["i2c_transactions"] += 1
+        return bytes(data)
+
+    def _poll_fifo(self):
+        count = self._fifo_count()
+        if count >= FIFO_SIZE:
+            # Desbordada: la FIFO sobrescribe lo más viejo y los bytes quedan desalineados
+            self._reset_fifo()
+            return
+        length = count - count % SAMPLE_BYTES
+        if not length:
+            return
+        raw = self._read_fifo(length)
+        now = time.time()
+        if self._record is not None:
+            self._record(raw, now)
+        n = length // SAMPLE_BYTES
+        rows = self._rows[:n]
+        gain, offset = self._correction
+        decode_fifo(raw, gain, offset, rows[:, 1:])
+        # Las muestras de la FIFO están espaciadas 1/sample_rate; la última es ~ahora
+        np.subtract(now, self._ages[MAX_BATCH - n:], out=rows[:, 0])
+        self.samples.push_batch(rows)
+        self.fusion.update_batch(rows)
+        self.stats["batches"] += 1
+        self.stats["bytes"] += length
+
+    def _sampler_loop(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            if not self.is_available:
+                if self._stop_event.wait(self._error_retry_delay):
+                    break
                 print("🔄 MPU6050: Intentando reconectar...")
                 if self._initialize_bus():
                     print("✅ MPU6050: Reconexión exitosa")
-                else:
-                    self._last_error_time = current_time
-                    return None
-            else:
-                return None
-        
-        if self.bus is None:
+                continue
+            try:
+                self._poll_fifo()
+            except OSError as e:
+                print(f"Error I2C en MPU6050: {e}")
+                self.stats["read_errors"] += 1
+                self.is_available = False
+                self._last_error_time = time.time()
+                continue
+            except Exception as e:
+                print(f"Error en MPU6050 al leer la FIFO: {e}")
+                self.stats["read_errors"] += 1
+            self._stop_event.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+        print("🛑 MPU6050: hilo de muestreo finalizado")
+
+    def start(self):
+        """Inicia el hilo de muestreo."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._sampler_loop, name="mpu6050-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo de muestreo y cierra el bus."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+        self._thread = None
+        if self.bus is not None:
+            try:
+                self.bus.close()
+            except Exception:
+                pass
+
+    def latest(self) -> Optional[np.ndarray]:
+        """Última fila [t, ax, ay, az, gx, gy, gz], o None si no hay o es más vieja que max_age."""
+        row = self.samples.latest()
+        if row is None or time.time() - row[COL_T] > self.max_age:
             return None
+        return row
 
-        def read_word(reg):
-            h = self.bus.read_byte_data(self.address, reg)
-            l = self.bus.read_byte_data(self.address, reg + 1)
-            value = (h << 8) + l
-            return value - 65536 if value >= 0x8000 else value
+    def set_calibration(self, calibration: Optional[MPUCalibration]) -> None:
+        """Aplica (o quita con None) la corrección de bias/escala en el decode de la FIFO."""
+        if calibration is None:
+            correction = (1.0 / _SCALE, np.zeros(6))
+        else:
+            gain, offset = calibration.gain_offset()
+            correction = (gain / _SCALE, offset)
+        self.calibration = calibration
+        self._correction = correction  # Reemplazo atómico: el hilo toma la tupla completa en el siguiente lote
 
-        try:
-            ax = read_word(0x3B) / 16384.0
-            ay = read_word(0x3D) / 16384.0
-            az = read_word(0x3F) / 16384.0
-            gx = read_word(0x43) / 131.0
-            gy = read_word(0x45) / 131.0
-            gz = read_word(0x47) / 131.0
+    async def collect(self, count: int, timeout: Optional[float] = None) -> np.ndarray:
+        """Espera `count` muestras nuevas y las retorna como (n, 6) [ax..gz] (menos si vence el timeout)."""
+        count = min(count, self.samples.capacity)
+        timeout = timeout if timeout is not None else count / self.sample_rate + 2.0
+        start_total = self.samples.total
+        deadline = time.monotonic() + timeout
+        while self.samples.total - start_total < count and time.monotonic() < deadline and self.is_available:
+            await asyncio.sleep(0.05)
+        collected = min(self.samples.total - start_total, count)
+        return self.samples.window(collected)[:, COL_AX:]
 
-            roll = math.atan2(ay, az) * 57.3
-            pitch = math.atan2(-ax, (ay**2 + az**2)**0.5) * 57.3
-            apertura = abs(roll) + abs(pitch)
+    def orientation(self) -> Optional[Orientation]:
+        """Último estado del filtro de orientación, o None si es más viejo que max_age."""
+        state = self.fusion.state
+        if state is None or time.time() - state.timestamp > self.max_age:
+            return None
+        return state
 
+    def _read_sync(self) -> Optional[Dict]:
+        if IS_WINDOWS and self._bus_factory is None:
+            # Datos simulados para pruebas en Windows
             return {
-                "ax": round(ax, 2), "ay": round(ay, 2), "az": round(az, 2),
-                "gx": round(gx, 2), "gy": round(gy, 2), "gz": round(gz, 2),
-                "roll": round(roll, 2), "pitch": round(pitch, 2),
-                "apertura": round(apertura, 2)
+                "ax": 0.01, "ay": 0.02, "az": 0.98,
+                "gx": 0.1, "gy": 0.2, "gz": 0.3,
+                "roll": 1.5, "pitch": 0.5, "apertura": 2.0
             }
 
-        except OSError as e:
-            print(f"Error I2C en MPU6050: {e}")
-            self.is_available = False
-            self._last_error_time = time.time()
-            return None
-        except Exception as e:
-            print(f"Error en MPU6050 al leer datos: {e}")
+        return self.to_reading(self.latest(), self.orientation())
+
+    @staticmethod
+    def to_reading(row: Optional[np.ndarray], state: Optional[Orientation]) -> Optional[Dict]:
+        """Lectura de una fila del buffer con el estado de orientación dado."""
+        if row is None or state is None:
             return None
-    
+        _, ax, ay, az, gx, gy, gz = row.tolist()
+
+        # Roll/pitch filtrados (acelerómetro + giroscopio), no de una sola muestra
+        return {
+            "ax": round(ax, 2), "ay": round(ay, 2), "az": round(az, 2),
+            "gx": round(gx, 2), "gy": round(gy, 2), "gz": round(gz, 2),
+            "roll": round(state.roll, 2), "pitch": round(state.pitch, 2),
+            "apertura": round(state.apertura, 2)
+        }
+
     async def read(self) -> Optional[Dict]:
-        """Lectura async (no bloqueante)"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._read_sync)
-    
+        """Última muestra del hilo de muestreo (O(1), sin I/O en el event loop)."""
+        return self._read_sync()
+
     def read_sync(self) -> Optional[Dict]:
         """DEPRECATED: Usar read() async"""
-        return self._read_sync()
\ No newline at end of file
+        return self._read_sync()
+
+    def get_stats(self) -> dict:
+        total = self.samples.total
+        return {
+            "available": self.is_available,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "sample_rate_hz": round(self.sample_rate, 2),
+            "dlpf": self.dlpf,
+            "calibration": self.calibration.method if self.calibration else "none",
+            "samples": total,
+            **self.stats,
+            # Antes: 12 lecturas de byte por muestra
+            "transactions_per_sample": round(self.stats["i2c_transactions"] / total, 3) if total else None,
+        }
@@ -0,0 +1,64 @@
+# MPU6050/infraestructure/simulation/mpu_replay.py
+from core.simulation import SimulationConfig
+from core.stream_log import ReplayClock, StreamLog
+from MPU6050.infraestructure.simulation.mpu_simulator import (
+    FIFO_SIZE, PWR_SLEEP, REG_PWR_MGMT_1, REG_USER_CTRL, USER_CTRL_FIFO_EN, FakeMPUBus
+)
+
+CHANNEL = "mpu6050"
+
+
+class ReplayMPUBus(FakeMPUBus):
+    """
+    Bus I2C que llena la FIFO con las ráfagas grabadas en el canal "mpu6050"
+    cuando llega su momento (espaciado original / speed). El lector corre sin
+    cambios: FIFO_COUNT, lectura por bloques o i2c_rdwr, reset por desborde.
+    Con speed=0 cada ráfaga entra apenas hay lugar en la FIFO, así la corrida
+    es determinista y no se pierden muestras.
+    """
+
+    def __init__(self, bus: int, log: StreamLog, speed: float = 1.0, loop: bool = False):
+        super().__init__(bus, SimulationConfig(0.0, 0.0, 1000.0, None))
+        self.log = log
+        self.loop = loop
+        self._clock = ReplayClock(speed)
+        self._records = log.records([CHANNEL])
+        self._pending = None
+        self._has_records = any(True for _ in log.records([CHANNEL]))
+        self.stats.update({"bursts": 0, "finished": False})
+
+    def _next_record(self):
+        record = next(self._records, None)
+        if record is None and self.loop and self._has_records:
+            self._records = self.log.records([CHANNEL])
+            self._clock.restart()
+            record = next(self._records, None)
+        if record is None and not self.stats["finished"] and not self.log.closed:
+            self.stats["finished"] = True
+            print("⏹️ MPU6050: fin de la reproducción")
+        return record
+
+    def _fill(self):
+        if self.regs[REG_PWR_MGMT_1] & PWR_SLEEP or not self.regs[REG_USER_CTRL] & USER_CTRL_FIFO_EN:
+            return  # Como el chip: la FIFO solo se llena habilitada (y no antes del reset inicial)
+        while True:
+            if self._pending is None:
+                self._pending = self._next_record()
+                if self._pending is None:
+                    return
+            if self._clock.delay(self._pending.timestamp) > 0:
+                return
+            payload = self._pending.payload
+            if self._clock.speed <= 0 and len(self.fifo) + len(payload) > FIFO_SIZE:
+                return  # Sin esperas: contrapresión en vez de desbordar la FIFO
+            self.fifo += payload
+            self._pending = None
+            self.stats["bursts"] += 1
+            if len(self.fifo) > FIFO_SIZE:
+                self.stats["overflows"] += 1
+                del self.fifo[:len(self.fifo) - FIFO_SIZE]
+
+
+def replay_bus_factory(log: StreamLog, speed: float, loop: bool):
+    """Reemplazo de smbus2.SMBus para MPUSerialReader(bus_factory=...)."""
+    return lambda bus: ReplayMPUBus(bus, log, speed, loop)
@@ -0,0 +1,185 @@
+# MPU6050/infraestructure/simulation/mpu_simulator.py
+import ctypes
+import math
+import random
+import struct
+import time
+
+from core.simulation import SimulationConfig, sim_value
+
+REG_SMPLRT_DIV = 0x19
+REG_CONFIG = 0x1A
+REG_GYRO_CONFIG = 0x1B
+REG_ACCEL_CONFIG = 0x1C
+REG_FIFO_EN = 0x23
+REG_ACCEL_XOUT_H = 0x3B
+REG_USER_CTRL = 0x6A
+REG_PWR_MGMT_1 = 0x6B
+REG_FIFO_COUNTH = 0x72
+REG_FIFO_COUNTL = 0x73
+REG_FIFO_R_W = 0x74
+REG_WHO_AM_I = 0x75
+
+FIFO_SIZE = 1024
+FIFO_EN_TEMP, FIFO_EN_XG, FIFO_EN_YG, FIFO_EN_ZG, FIFO_EN_ACCEL = 0x80, 0x40, 0x20, 0x10, 0x08
+USER_CTRL_FIFO_EN, USER_CTRL_FIFO_RESET = 0x40, 0x04
+PWR_SLEEP = 0x40
+ACCEL_LSB = (16384.0, 8192.0, 4096.0, 2048.0)   # LSB/g por AFS_SEL
+GYRO_LSB = (131.0, 65.5, 32.8, 16.4)            # LSB/(°/s) por FS_SEL
+
+
+class FakeMPUBus:
+    """
+    SMBus simulado con la semántica de registros del MPU6050 que usa MPUSerialReader:
+    reloj/sleep, SMPLRT_DIV + DLPF (tasa de muestreo), rangos, FIFO_EN, USER_CTRL
+    (reset y habilitación de la FIFO), FIFO_COUNT, FIFO_R_W (bloques SMBus e i2c_rdwr),
+    ACCEL_XOUT_H..GYRO_ZOUT_L y WHO_AM_I.
+    La FIFO se llena según el tiempo transcurrido; al desbordar descarta los bytes
+    más viejos, sin respetar los límites de muestra, como el chip real.
+
+    Movimiento: inclinación fija (SIM_MPU6050_ROLL_DEG 3, SIM_MPU6050_PITCH_DEG -2)
+    más un balanceo lento de SIM_MPU6050_WOBBLE_DEG (0.5) y bias de giroscopio.
+    Fallas (SIM_FAULT_RATE, por transacción): OSError 121 "Remote I/O error".
+    """
+
+    def __init__(self, bus: int = 1, config: SimulationConfig = None, address: int = 0x68):
+        self.config = config or SimulationConfig(1.0, 0.0, 1000.0, None)
+        self.address = address
+        self._rng = random.Random(self.config.seed)
+        self.roll = math.radians(sim_value("mpu6050", "ROLL_DEG", 3.0))
+        self.pitch = math.radians(sim_value("mpu6050", "PITCH_DEG", -2.0))
+        self.wobble = math.radians(sim_value("mpu6050", "WOBBLE_DEG", 0.5))
+        self.gyro_bias = (0.8, -0.5, 0.3)
+        self.regs = bytearray(0x80)
+        self.regs[REG_PWR_MGMT_1] = PWR_SLEEP   # Valor de reset: dormido
+        self.regs[REG_WHO_AM_I] = 0x68
+        self.fifo = bytearray()
+        self._t0 = time.monotonic()
+        self._emitted = 0
+        self.stats = {"transactions": 0, "faults": 0, "overflows": 0}
+
+    # --- Modelo ---
+
+    def _sample_rate(self) -> float:
+        dlpf = self.regs[REG_CONFIG] & 0x07
+        output_rate = 8000.0 if dlpf in (0, 7) else 1000.0
+        return output_rate / (1 + self.regs[REG_SMPLRT_DIV])
+
+    def _measure(self, t: float):
+        """(ax, ay, az, temp, gx, gy, gz) en crudo para el instante t."""
+        rng, noise = self._rng, self.config.noise
+        phase = 2 * math.pi * t / 8.0
+        roll = self.roll + self.wobble * math.sin(phase)
+        pitch = self.pitch + self.wobble * math.cos(phase)
+        droll = math.degrees(self.wobble * 2 * math.pi / 8.0 * math.cos(phase))
+        dpitch = -math.degrees(self.wobble * 2 * math.pi / 8.0 * math.sin(phase))
+        accel = (
+            -math.sin(pitch),
+            math.sin(roll) * math.cos(pitch),
+            math.cos(roll) * math.cos(pitch),
+        )
+        gyro = (droll + self.gyro_bias[0], dpitch + self.gyro_bias[1], self.gyro_bias[2])
+        a_lsb = ACCEL_LSB[(self.regs[REG_ACCEL_CONFIG] >> 3) & 0x03]
+        g_lsb = GYRO_LSB[(self.regs[REG_GYRO_CONFIG] >> 3) & 0x03]
+        clamp = lambda v: max(-32768, min(32767, int(round(v))))
+        ax, ay, az = (clamp((a + rng.gauss(0, 0.004 * noise)) * a_lsb) for a in accel)
+        gx, gy, gz = (clamp((g + rng.gauss(0, 0.05 * noise)) * g_lsb) for g in gyro)
+        temp = clamp((30.0 - 36.53) * 340)
+        return ax, ay, az, temp, gx, gy, gz
+
+    def _fifo_record(self, values) -> bytes:
+        enabled = self.regs[REG_FIFO_EN]
+        ax, ay, az, temp, gx, gy, gz = values
+        parts = []
+        if enabled & FIFO_EN_ACCEL:
+            parts += [ax, ay, az]
+        if enabled & FIFO_EN_TEMP:
+            parts.append(temp)
+        parts += [v for bit, v in ((FIFO_EN_XG, gx), (FIFO_EN_YG, gy), (FIFO_EN_ZG, gz)) if enabled & bit]
+        return struct.pack(f">{len(parts)}h", *parts)
+
+    def _fill(self):
+        if self.regs[REG_PWR_MGMT_1] & PWR_SLEEP:
+            return
+        rate = self._sample_rate()
+        elapsed = time.monotonic() - self._t0
+        due = int(elapsed * rate) - self._emitted
+        if due <= 0:
+            return
+        # Tras una pausa larga solo importan las últimas muestras que caben en la FIFO
+        skipped = max(0, due - FIFO_SIZE)
+        self._emitted += skipped
+        fifo_on = self.regs[REG_USER_CTRL] & USER_CTRL_FIFO_EN and self.regs[REG_FIFO_EN]
+        for i in range(due - skipped):
+            self._emitted += 1
+            if fifo_on:
+                self.fifo += self._fifo_record(self._measure(self._emitted / rate))
+        if len(self.fifo) > FIFO_SIZE:
+            self.stats["overflows"] += 1
+            del self.fifo[:len(self.fifo) - FIFO_SIZE]
+
+    def _transaction(self):
+        self.stats["transactions"] += 1
+        if self.config.fault_rate and self._rng.random() < self.config.fault_rate:
+            self.stats["faults"] += 1
+            raise OSError(121, "Remote I/O error")
+        self._fill()
+
+    def _read_register(self, reg: int, length: int) -> bytes:
+        if reg == REG_FIFO_R_W:
+            data = bytes(self.fifo[:length])
+            del self.fifo[:length]
+            return data.ljust(length, b"\x00")
+        if reg == REG_FIFO_COUNTH:
+            count = len(self.fifo)
+            return bytes((count >> 8, count & 0xFF))[:length]
+        if REG_ACCEL_XOUT_H <= reg < REG_ACCEL_XOUT_H + 14:
+            raw = struct.pack(">7h", *self._measure(time.monotonic() - self._t0))
+            offset = reg - REG_ACCEL_XOUT_H
+            return raw[offset:offset + length].ljust(length, b"\x00")
+        return bytes(self.regs[reg:reg + length])
+
+    # --- Interfaz SMBus (smbus2) ---
+
+    def write_byte_data(self, address: int, register: int, value: int):
+        self._transaction()
+        value &= 0xFF
+        if register == REG_USER_CTRL:
+            if value & USER_CTRL_FIFO_RESET:
+                self.fifo.clear()
+            value &= ~USER_CTRL_FIFO_RESET & 0xFF  # Bit autolimpiable
+        if register == REG_PWR_MGMT_1 and self.regs[register] & PWR_SLEEP and not value & PWR_SLEEP:
+            self._t0, self._emitted = time.monotonic(), 0
+        if register in (REG_SMPLRT_DIV, REG_CONFIG):
+            self._t0, self._emitted = time.monotonic(), 0  # La nueva tasa rige desde ahora
+        self.regs[register] = value
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        self._transaction()
+        return self._read_register(register, 1)[0]
+
+    def read_i2c_block_data(self, address: int, register: int, length: int):
+        self._transaction()
+        return list(self._read_register(register, length))
+
+    def i2c_rdwr(self, *messages):
+        """Escritura del registro seguida de lectura (smbus2.i2c_msg)."""
+        self._transaction()
+        register = None
+        for msg in messages:
+            if msg.flags & 0x0001:  # I2C_M_RD
+                data = self._read_register(register, msg.len)
+                ctypes.memmove(msg.buf, data, msg.len)
+            else:
+                payload = bytes(msg)
+                register = payload[0]
+                for offset, value in enumerate(payload[1:]):
+                    self.regs[register + offset] = value
+
+    def close(self):
+        pass
+
+
+def fake_bus_factory(config: SimulationConfig):
+    """Reemplazo de smbus2.SMBus para MPUSerialReader(bus_factory=...)."""
+    return lambda bus: FakeMPUBus(bus, config)
@@ -1,11 +1,20 @@
 # MPU6050/infraestructure/ws/ws_manager.py
-from fastapi import WebSocket, WebSocketDisconnect
+from fastapi import WebSocket
 from typing import List
-import json
 import asyncio
+from core.serialization import to_text
+from core.ws_hub import ws_hub
 
 class WebSocketManager_MPU:
-    def __init__(self):
+    """
+    Compatibilidad con /mpu/sensor/ws.
+    Las lecturas se difunden desde el hub (core/ws_hub.py); aquí solo queda
+    el mensaje de bienvenida y los mensajes de estado propios del endpoint.
+    """
+    SENSOR = "mpu6050"
+
+    def __init__(self, hub=ws_hub):
+        self.hub = hub
         self.active_connections: List[WebSocket] = []
 
     async def connect(self, websocket: WebSocket):
@@ -13,62 +22,52 @@ class WebSocketManager_MPU:
         self.active_connections.append(websocket)
         print(f"🔗 Cliente WebSocket conectado (sensor MPU6050) - Total: {len(self.active_connections)} conectado(s)")
         
-        # Enviar mensaje de bienvenida
+        # Enviar mensaje de bienvenida antes de registrar en el hub
         await self.send_to_connection(websocket, {
             "sensor": "MPU6050",
             "message": "Conectado exitosamente",
             "status": "connected",
             "connections": len(self.active_connections)
         })
+        if websocket in self.active_connections:
+            self.hub.attach(websocket, [self.SENSOR], legacy=True, backfill=True)  # Historial reciente de una vez
 
     def disconnect(self, websocket: WebSocket):
+        self.hub.detach(websocket)
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             print(f"🔌 Cliente WebSocket desconectado (Sensor MPU6050) - Total: {len(self.active_connections)} conectado(s)")
 
-    async def send_to_connection(self, websocket: WebSocket, data: dict):
+    async def send_to_connection(self, websocket: WebSocket, data):
         """Envía datos a una conexión específica"""
         try:
-            await websocket.send_json(data)
+            await websocket.send_text(to_text(data))
         except Exception as e:
             print(f"❌ Error enviando datos a conexión específica: {e}")
             # Remover conexión fallida
             self.disconnect(websocket)
 
-    async def send_data(self, data: dict):
-        """Envía datos a todas las conexiones activas"""
-        if not self.active_connections:
-            return
-            
-        # Lista para conexiones que fallan
-        failed_connections = []
-        
-        for conn in self.active_connections[:]:  # Copia de la lista para evitar modificaciones durante iteración
-            try:
-                await conn.send_json(data)
-            except WebSocketDisconnect:
-                failed_connections.append(conn)
-            except Exception as e:
-                print(f"❌ Error enviando datos por WebSocket: {e}")
-                failed_connections.append(conn)
-        
-        # Remover conexiones fallidas
-        for failed_conn in failed_connections:
-            self.disconnect(failed_conn)
+    async def send_data(self, data):
+        """Publica una lectura en el hub (llega a /mpu/sensor/ws y a los suscriptores de /ws)"""
+        await self.hub.publish(self.SENSOR, data)
 
     async def broadcast_status(self, status: str, message: str = ""):
-        """Envía un mensaje de estado a todas las conexiones"""
-        await self.send_data({
+        """Envía un mensaje de estado a las conexiones de este endpoint"""
+        payload = to_text({
             "sensor": "MPU6050",
             "status": status,
             "message": message,
             "timestamp": asyncio.get_event_loop().time(),
             "connections": len(self.active_connections)
         })
+        for conn in self.active_connections[:]:
+            # Por la cola del hub, para no competir con su tarea escritora
+            if not self.hub.send_to(conn, payload):
+                await self.send_to_connection(conn, payload)
 
     def get_connection_count(self) -> int:
         """Retorna el número de conexiones activas"""
         return len(self.active_connections)
 
 # Instancia global
-ws_manager_mpu = WebSocketManager_MPU()
\ No newline at end of file
+ws_manager_mpu = WebSocketManager_MPU()
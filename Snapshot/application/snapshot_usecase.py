@@ -0,0 +1,130 @@
+# Snapshot/application/snapshot_usecase.py
+from Snapshot.domain.entities.snapshot import SensorSnapshot
+from Snapshot.domain.repositories.snapshot_repository import SnapshotRepository
+from Snapshot.domain.ports.mqtt_publisher import MQTTPublisher
+from Snapshot.domain.services.alignment import Alignment, Candidate, align
+from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+from MPU6050.domain.entities.sensor_mpu import SensorMPU
+from IMX477.domain.entities.sensor_imx import SensorIMX477
+from HCSR04.domain.entities.hc_sensor import HCSensorData
+from pydantic import ValidationError
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+import asyncio
+import time
+
+SETTLE_S = 0.5        # Espera máxima a que los canales alcancen la captura más reciente
+SETTLE_POLL_S = 0.02
+
+
+class SnapshotSource(NamedTuple):
+    name: str  # "tfluna", "mpu6050", "imx477" o "hcsr04"
+    # prepare(fresh, timeout, not_before): adquisición inmediata si fresh o si la última
+    # muestra es anterior a not_before (epoch s); si no, la muestra vigente basta
+    prepare: Callable[[bool, float, float], Awaitable[None]]
+    # window() -> {canal: [(timestamp, valor), ...]} de la más vieja a la más nueva
+    window: Callable[[], Dict[str, List[Candidate]]]
+
+
+class SnapshotUseCase:
+    def __init__(self, sources: Dict[str, SnapshotSource], repository: SnapshotRepository,
+                 publisher: MQTTPublisher, collect_timeout: float = 5.0):
+        self.sources = sources
+        self.repository = repository
+        self.publisher = publisher
+        self.collect_timeout = collect_timeout
+
+    async def execute(self, project_id=1, tolerance_ms: float = 100.0, sensors: Optional[List[str]] = None,
+                      partial: bool = False, fresh: bool = False,
+                      resolution: str = "640x480") -> Optional[SensorSnapshot]:
+        """
+        Junta en paralelo las muestras de cada sensor, las alinea a un instante
+        común y, si todos los canales pedidos caen dentro de la tolerancia (o
+        partial=True), guarda el snapshot en una sola transacción local y lo
+        publica como un único mensaje. Si falta alguno, devuelve el snapshot con
+        event=False sin guardar nada. None si ningún sensor tiene datos.
+        Cada canal debe tener una muestra a menos de tolerance_ms antes del pedido
+        o posterior: las fuentes sin una (la cámara, 0.2 Hz) adquieren en el momento.
+        fresh=True fuerza una adquisición inmediata en todos.
+        """
+        names = sensors or list(self.sources)
+        not_before = time.time() - tolerance_ms / 1000
+        results = await asyncio.gather(
+            *(self.sources[name].prepare(fresh, self.collect_timeout, not_before) for name in names),
+            return_exceptions=True
+        )
+        errors: Dict[str, str] = {
+            name: str(result) or type(result).__name__
+            for name, result in zip(names, results) if isinstance(result, BaseException)
+        }
+        ready = [name for name in names if name not in errors]
+
+        alignment = await self._align(ready, list(errors), tolerance_ms, not_before)
+        if alignment.timestamp is None:
+            return None
+
+        timestamp = datetime.utcfromtimestamp(alignment.timestamp)
+        snapshot = SensorSnapshot(
+            id_project=project_id,
+            timestamp=timestamp,
+            tolerance_ms=tolerance_ms,
+            skew_ms=alignment.skew_ms,
+            missing=alignment.missing
+        )
+        for channel, sample in alignment.samples.items():
+            try:
+                self._attach(snapshot, channel, sample.value, timestamp, resolution)
+            except ValidationError as e:
+                # p. ej. MPU6050 fuera del rango de inclinación permitido para guardar
+                errors[channel] = "; ".join(err["msg"] for err in e.errors())
+                snapshot.missing.append(channel)
+        for channel in alignment.stale:
+            errors.setdefault(channel, f"sin muestra desde {tolerance_ms:g} ms antes del pedido")
+        snapshot.errors = errors
+
+        if snapshot.missing and not partial:
+            snapshot.event = False
+            return snapshot
+        if not snapshot.readings():
+            return None
+
+        await self.repository.save(snapshot)
+        self.publisher.publish(snapshot)
+        return snapshot
+
+    async def _align(self, names: List[str], failed: List[str], tolerance_ms: float,
+                     not_before: float) -> Alignment:
+        """
+        Lee todas las ventanas juntas (después de la espera más larga) y alinea.
+        Si algún canal queda fuera de tolerancia por una muestra posterior al
+        instante común, o aún no tiene muestras posteriores al pedido, el atrasado
+        es ese u otro canal (p. ej. HC-SR04 notifica por lotes cada ~250 ms):
+        se reintenta hasta SETTLE_S a que se ponga al día.
+        """
+        deadline = time.monotonic() + SETTLE_S
+        while True:
+            channels: Dict[str, List[Candidate]] = {name: [] for name in failed}
+            for name in names:
+                channels.update(self.sources[name].window())
+            alignment = align(channels, tolerance_ms, not_before)
+            lagging = alignment.stale or any(skew > tolerance_ms for skew in alignment.skew_ms.values())
+            if not lagging or time.monotonic() >= deadline:
+                return alignment
+            await asyncio.sleep(SETTLE_POLL_S)
+
+    @staticmethod
+    def _attach(snapshot: SensorSnapshot, channel: str, value, timestamp: datetime, resolution: str):
+        """Entidad del sensor de `channel` con el instante común del snapshot."""
+        project_id = snapshot.id_project
+        if channel == "tfluna":
+            snapshot.tfluna = SensorTFLuna(id_project=project_id, **{**value, "timestamp": timestamp, "event": True})
+        elif channel == "mpu6050":
+            snapshot.mpu6050 = SensorMPU(id_project=project_id, **value, event=True, timestamp=timestamp)
+        elif channel == "imx477":
+            snapshot.imx477 = SensorIMX477(id_project=project_id, resolution=resolution, **value,
+                                           event=True, timestamp=timestamp)
+        elif channel.startswith("hcsr04/"):
+            snapshot.hcsr04.append(HCSensorData(
+                id_project=project_id, distancia_cm=value, device_id=channel.split("/", 1)[1],
+                event=True, timestamp=timestamp
+            ))
@@ -0,0 +1,34 @@
+# Snapshot/domain/entities/snapshot.py
+from datetime import datetime
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional
+from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+from MPU6050.domain.entities.sensor_mpu import SensorMPU
+from IMX477.domain.entities.sensor_imx import SensorIMX477
+from HCSR04.domain.entities.hc_sensor import HCSensorData
+
+class SensorSnapshot(BaseModel):
+    """Un punto de medición: las lecturas de todos los sensores alineadas a un mismo instante."""
+    id_project: int
+    timestamp: datetime                  # Instante común (lo comparten todas las lecturas)
+    tolerance_ms: float
+    skew_ms: Dict[str, float] = {}       # Desfase de la muestra original de cada canal
+    missing: List[str] = []              # Canales sin muestra dentro de la tolerancia
+    errors: Dict[str, str] = {}          # Motivo por canal (fallo de adquisición o lectura inválida)
+    event: bool = True
+    tfluna: Optional[SensorTFLuna] = None
+    mpu6050: Optional[SensorMPU] = None
+    imx477: Optional[SensorIMX477] = None
+    hcsr04: List[HCSensorData] = []      # Una lectura por nodo ESP32
+
+    @field_validator('id_project')
+    @classmethod
+    def validate_id_project(cls, v):
+        if v is None or v <= 0:
+            raise ValueError('El id_project debe ser un número positivo mayor a 0')
+        return v
+
+    def readings(self) -> list:
+        """Entidades de cada sensor presentes en el snapshot."""
+        single = [self.tfluna, self.mpu6050, self.imx477]
+        return [reading for reading in single if reading is not None] + list(self.hcsr04)
@@ -0,0 +1,7 @@
+#Snapshot/domain/ports/mqtt_publisher.py
+from abc import ABC, abstractmethod
+from Snapshot.domain.entities.snapshot import SensorSnapshot
+
+class MQTTPublisher(ABC):
+    @abstractmethod
+    def publish(self, snapshot: SensorSnapshot): pass
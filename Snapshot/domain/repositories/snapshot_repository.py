@@ -0,0 +1,7 @@
+# Snapshot/domain/repositories/snapshot_repository.py
+from Snapshot.domain.entities.snapshot import SensorSnapshot
+from abc import ABC, abstractmethod
+
+class SnapshotRepository(ABC):
+    @abstractmethod
+    async def save(self, snapshot: SensorSnapshot): pass
@@ -0,0 +1,72 @@
+# Snapshot/domain/services/alignment.py
+"""
+Alineación temporal de muestras de varios sensores.
+
+Cada canal (tfluna, mpu6050, imx477, hcsr04/<nodo>) aporta sus muestras
+recientes como (timestamp, valor), de la más vieja a la más nueva.
+1. Con not_before (instante del pedido menos la tolerancia) solo cuentan las
+   muestras posteriores: un canal sin ninguna queda fuera como viejo (stale).
+   Así el snapshot nunca describe un instante anterior al pedido.
+2. El instante común es el más reciente que todos los canales ya cubrieron:
+   el mínimo de sus últimas marcas de tiempo.
+3. De cada canal se toma la muestra más cercana a ese instante (bisección).
+4. Si el desfase supera la tolerancia, el canal queda fuera del snapshot.
+"""
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+Candidate = Tuple[float, Any]  # (timestamp epoch en s, valor)
+
+
+class AlignedSample(NamedTuple):
+    timestamp: float
+    value: Any
+    skew_ms: float  # Desfase respecto del instante común (negativo = antes)
+
+
+class Alignment(NamedTuple):
+    timestamp: Optional[float]            # Instante común (None si ningún canal tiene datos)
+    samples: Dict[str, AlignedSample]     # Canales dentro de la tolerancia
+    missing: List[str]                    # Canales sin datos, viejos o fuera de la tolerancia
+    skew_ms: Dict[str, float]             # Desfase de la muestra más cercana de cada canal con datos
+    stale: List[str]                      # Canales con datos, pero todos anteriores a not_before
+
+
+def nearest(candidates: Sequence[Candidate], timestamp: float) -> Candidate:
+    """Muestra más cercana a `timestamp` (candidates ordenados por tiempo, no vacío)."""
+    i = bisect_left(candidates, timestamp, key=lambda c: c[0])
+    if i == 0:
+        return candidates[0]
+    if i == len(candidates):
+        return candidates[-1]
+    before, after = candidates[i - 1], candidates[i]
+    return before if timestamp - before[0] <= after[0] - timestamp else after
+
+
+def align(channels: Dict[str, Sequence[Candidate]], tolerance_ms: float,
+          not_before: Optional[float] = None) -> Alignment:
+    stale: List[str] = []
+    if not_before is not None:
+        recent = {}
+        for name, candidates in channels.items():
+            recent[name] = candidates[bisect_left(candidates, not_before, key=lambda c: c[0]):]
+            if candidates and not recent[name]:
+                stale.append(name)
+        channels = recent
+    with_data = {name: c for name, c in channels.items() if c}
+    missing = [name for name in channels if name not in with_data]
+    if not with_data:
+        return Alignment(None, {}, missing, {}, stale)
+
+    reference = min(c[-1][0] for c in with_data.values())
+    samples: Dict[str, AlignedSample] = {}
+    skews: Dict[str, float] = {}
+    for name, candidates in with_data.items():
+        timestamp, value = nearest(candidates, reference)
+        skew = round((timestamp - reference) * 1000, 1)
+        skews[name] = skew
+        if abs(skew) <= tolerance_ms:
+            samples[name] = AlignedSample(timestamp, value, skew)
+        else:
+            missing.append(name)
+    return Alignment(reference, samples, missing, skews, stale)
@@ -0,0 +1,16 @@
+# Snapshot/infraestructure/controllers/controller_snapshot.py
+from Snapshot.application.snapshot_usecase import SnapshotUseCase
+
+class SnapshotController:
+    def __init__(self, usecase: SnapshotUseCase):
+        self.usecase = usecase
+
+    async def take_snapshot(self, project_id: int, tolerance_ms: float, sensors=None, partial: bool = False,
+                            fresh: bool = False, resolution: str = "640x480"):
+        return await self.usecase.execute(
+            project_id=project_id, tolerance_ms=tolerance_ms, sensors=sensors,
+            partial=partial, fresh=fresh, resolution=resolution
+        )
+
+    def available_sensors(self):
+        return list(self.usecase.sources)
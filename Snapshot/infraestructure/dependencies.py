@@ -0,0 +1,46 @@
+# Snapshot/infraestructure/dependencies.py
+from fastapi import FastAPI
+from Snapshot.application.snapshot_usecase import SnapshotUseCase
+from Snapshot.infraestructure.controllers.controller_snapshot import SnapshotController
+from Snapshot.infraestructure.mqtt.publisher import RabbitMQPublisher
+from Snapshot.infraestructure.repositories.snapshot_repo_local import LocalSnapshotRepository
+from Snapshot.infraestructure.sources import hc_source, mpu_source, sampler_source, tf_source
+from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+from MPU6050.domain.entities.sensor_mpu import SensorMPU
+from IMX477.domain.entities.sensor_imx import SensorIMX477
+from HCSR04.domain.entities.hc_sensor import HCSensorData
+
+def init_snapshot_dependencies(
+    app: FastAPI,
+    session_local_factory,
+    rabbitmq_config: dict
+):
+    """Se llama después de inicializar los sensores: reutiliza sus samplers, lectores y repositorios."""
+    tf = app.state.tf_controller.usecase
+    mpu = app.state.mpu_controller.usecase
+    imx = app.state.imx_controller.usecase
+    hc = app.state.hc_controller.usecase
+
+    sources = {
+        "tfluna": tf_source(app.state.tf_reader),
+        "mpu6050": mpu_source(app.state.mpu_reader),
+    }
+    if imx.sampler is not None:
+        sources["imx477"] = sampler_source(imx.sampler)
+    sources["hcsr04"] = hc_source(app.state.hc_reader)
+
+    repository = LocalSnapshotRepository(session_local_factory, {
+        SensorTFLuna: tf.repository,
+        SensorMPU: mpu.repository,
+        SensorIMX477: imx.repository,
+        HCSensorData: hc.repository,
+    })
+    publisher = RabbitMQPublisher(
+        host=rabbitmq_config["host"],
+        user=rabbitmq_config["user"],
+        password=rabbitmq_config["pass"],
+        routing_key=rabbitmq_config["routing_key_snapshot"]
+    )
+
+    usecase = SnapshotUseCase(sources, repository, publisher)
+    app.state.snapshot_controller = SnapshotController(usecase)
@@ -0,0 +1,28 @@
+# Snapshot/infraestructure/mqtt/publisher.py
+from Snapshot.domain.ports.mqtt_publisher import MQTTPublisher
+from Snapshot.domain.entities.snapshot import SensorSnapshot
+from core.rabbitmq_pool import get_rabbitmq_pool, lane_for_sensor
+from core.serialization import encode_reading
+
+
+class RabbitMQPublisher(MQTTPublisher):
+    """
+    Publica el snapshot completo (todas las lecturas) como un único mensaje,
+    usando el pool de conexiones compartido (no bloqueante).
+    """
+    def __init__(self, host: str, user: str, password: str, routing_key: str):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.routing_key = routing_key
+
+    def publish(self, snapshot: SensorSnapshot):
+        try:
+            pool = get_rabbitmq_pool(self.host, self.user, self.password)
+            pool.publish(
+                routing_key=self.routing_key,
+                body=encode_reading(snapshot),
+                lane=lane_for_sensor(snapshot)
+            )
+        except Exception as e:
+            print(f"[MQTT-Snapshot] Error al encolar mensaje: {e}")
@@ -0,0 +1,28 @@
+# Snapshot/infraestructure/repositories/snapshot_repo_local.py
+from Snapshot.domain.repositories.snapshot_repository import SnapshotRepository
+from Snapshot.domain.entities.snapshot import SensorSnapshot
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LocalSnapshotRepository(SnapshotRepository):
+    """
+    Guarda todas las lecturas del snapshot en una sola transacción local: o quedan
+    todas o ninguna. Cada fila la arma el repositorio dual de su sensor
+    (local_model) con synced=False, así los sync_service existentes la suben al remoto.
+    """
+    def __init__(self, session_local_factory, repositories: Dict[type, object]):
+        self.local_factory = session_local_factory
+        self.repositories = repositories  # Clase de entidad -> repositorio dual del sensor
+
+    async def save(self, snapshot: SensorSnapshot):
+        models = [self.repositories[type(reading)].local_model(reading) for reading in snapshot.readings()]
+        async with self.local_factory() as session_local:
+            try:
+                session_local.add_all(models)
+                await session_local.commit()
+                logger.debug(f"Snapshot: {len(models)} lecturas guardadas localmente, pendientes de sync")
+            except Exception as e:
+                await session_local.rollback()
+                raise e
@@ -0,0 +1,76 @@
+# Snapshot/infraestructure/routes/routes_snapshot.py
+from fastapi import APIRouter, Request, Query, HTTPException
+from fastapi.responses import JSONResponse
+from core.concurrency import RATE_LIMITERS
+from core.serialization import ORJSONResponse, success_response
+from typing import Optional
+import asyncio
+
+router = APIRouter()
+
+@router.post("/snapshot")
+async def take_snapshot(
+    request: Request,
+    project_id: int = Query(1),
+    tolerance_ms: float = Query(100.0, gt=0, le=5000),
+    sensors: Optional[str] = None,
+    partial: bool = False,
+    fresh: bool = False,
+    resolution: str = "640x480"
+):
+    """
+    Punto de medición en un solo viaje: muestras de todos los sensores tomadas en
+    el momento del pedido (a lo sumo tolerance_ms antes; los sensores sin una tan
+    reciente, como la cámara, capturan en el acto), leídas en paralelo y alineadas
+    a un instante común (desfase máximo tolerance_ms).
+    Se guardan como un evento en una sola transacción local y se publican como un
+    único mensaje. sensors="tfluna,mpu6050,imx477,hcsr04" limita los sensores;
+    partial=true guarda aunque falte alguno; fresh=true fuerza capturas nuevas en todos.
+    Si falta un sensor (sin datos o fuera de tolerancia) responde 409 sin guardar nada.
+    """
+    if project_id <= 0:
+        raise HTTPException(status_code=400, detail="El ID del proyecto debe ser un número positivo")
+
+    controller = request.app.state.snapshot_controller
+    available = controller.available_sensors()
+    selected = None
+    if sensors:
+        selected = list(dict.fromkeys(s.strip() for s in sensors.split(",") if s.strip()))
+        unknown = [s for s in selected if s not in available]
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Sensores desconocidos: {', '.join(unknown) or sensors}. Disponibles: {', '.join(available)}"
+            )
+
+    if not await RATE_LIMITERS["snapshot"].acquire():
+        raise HTTPException(status_code=429, detail="Demasiadas peticiones de snapshot, intente más tarde")
+
+    try:
+        snapshot = await asyncio.wait_for(
+            controller.take_snapshot(
+                project_id=project_id, tolerance_ms=tolerance_ms, sensors=selected,
+                partial=partial, fresh=fresh, resolution=resolution
+            ),
+            timeout=10.0
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timeout: los sensores tardaron demasiado en responder")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al tomar el snapshot: {str(e)}")
+
+    if snapshot is None:
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "error": "Ningún sensor tiene datos para el snapshot"}
+        )
+    if not snapshot.event:
+        return ORJSONResponse(
+            status_code=409,
+            content={
+                "success": False,
+                "error": f"Sensores sin muestra dentro de {tolerance_ms:g} ms: {', '.join(snapshot.missing)}",
+                "data": snapshot
+            }
+        )
+    return success_response(snapshot)
@@ -0,0 +1,104 @@
+# Snapshot/infraestructure/sources.py
+"""
+Fuentes del snapshot: exponen las muestras recientes (con su timestamp) que
+ya guardan los dueños de cada sensor, sin tocar el hardware.
+- TF-Luna y MPU6050: el buffer que llena el hilo de su lector, con el timestamp
+  de cada trama o lote de FIFO (el último segundo, max_age del lector).
+- IMX477: el SampleRing de su Sampler.
+- HC-SR04: el SampleRing de cada nodo ESP32 conectado (un canal por nodo).
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+from core.sampler import Sampler
+from Snapshot.application.snapshot_usecase import SnapshotSource
+from Snapshot.domain.services.alignment import Candidate
+
+
+def sampler_source(sampler: Sampler) -> SnapshotSource:
+    async def prepare(fresh: bool, timeout: float, not_before: float):
+        latest = sampler.latest()
+        if fresh or latest is None or latest.timestamp < not_before:
+            await sampler.fresh(timeout=timeout)  # Sin muestra vigente al pedir: adquirir ya
+
+    def window() -> Dict[str, List[Candidate]]:
+        if sampler.latest() is None:  # Sin datos o más viejos que max_age
+            return {sampler.name: []}
+        return {sampler.name: [(s.timestamp, s.value) for s in sampler.samples.window()]}
+
+    return SnapshotSource(sampler.name, prepare, window)
+
+
+POLL_S = 0.01
+
+
+async def _wait_newer(newest: Callable[[], Optional[float]], since: float, timeout: float):
+    """Espera (sondeando el buffer) una muestra con timestamp >= since."""
+    deadline = time.monotonic() + timeout
+    while True:
+        timestamp = newest()
+        if (timestamp is not None and timestamp >= since) or time.monotonic() >= deadline:
+            return
+        await asyncio.sleep(POLL_S)
+
+
+def tf_source(reader) -> SnapshotSource:
+    """Tramas del hilo lector de la UART; fresh espera la primera trama posterior al pedido."""
+    def newest() -> Optional[float]:
+        sample = reader.latest()
+        return sample.timestamp if sample else None
+
+    async def prepare(fresh: bool, timeout: float, not_before: float):
+        await _wait_newer(newest, time.time() if fresh else not_before, timeout)
+
+    def window() -> Dict[str, List[Candidate]]:
+        candidates = []
+        for sample in reader.window(reader.samples.capacity):
+            reading = reader.to_reading(sample)
+            if reading is not None:
+                candidates.append((sample.timestamp, reading))
+        return {"tfluna": candidates}
+
+    return SnapshotSource("tfluna", prepare, window)
+
+
+def mpu_source(reader) -> SnapshotSource:
+    """
+    Filas de la FIFO del hilo lector. El filtro de orientación solo guarda su
+    estado actual: roll/pitch/apertura son los del último lote (varían lento).
+    """
+    def newest() -> Optional[float]:
+        row = reader.latest()
+        return float(row[0]) if row is not None else None
+
+    async def prepare(fresh: bool, timeout: float, not_before: float):
+        await _wait_newer(newest, time.time() if fresh else not_before, timeout)
+
+    def window() -> Dict[str, List[Candidate]]:
+        state = reader.orientation()
+        if reader.latest() is None or state is None:
+            return {"mpu6050": []}
+        rows = reader.samples.window(int(reader.max_age * reader.sample_rate) + 1)
+        rows = rows[rows[:, 0] >= time.time() - reader.max_age]
+        return {"mpu6050": [(float(row[0]), reader.to_reading(row, state)) for row in rows]}
+
+    return SnapshotSource("mpu6050", prepare, window)
+
+
+def hc_source(manager) -> SnapshotSource:
+    """Un canal "hcsr04/<device_id>" por nodo conocido; las notificaciones BLE llegan solas (fresh no aplica)."""
+    async def prepare(fresh: bool, timeout: float, not_before: float):
+        pass
+
+    def window() -> Dict[str, List[Candidate]]:
+        if not manager.readers:
+            return {"hcsr04": []}
+        return {
+            f"hcsr04/{device_id}": (
+                [(s.timestamp, s.distancia_cm) for s in reader.window()] if reader.latest() is not None else []
+            )
+            for device_id, reader in manager.readers.items()
+        }
+
+    return SnapshotSource("hcsr04", prepare, window)
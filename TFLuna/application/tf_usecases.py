@@ -2,20 +2,38 @@
 from TFLuna.domain.entities.sensor_tf import SensorTFLuna as SensorTF
 from TFLuna.domain.repositories.tf_repository import TFLunaRepository
 from TFLuna.domain.ports.mqtt_publisher import MQTTPublisher
+from TFLuna.domain.services.tf_filter import (
+    TFFilterConfig, TFFilterResult, robust_filter, BURST_FRAMES, SMOOTH_FRAMES
+)
+from datetime import datetime
+from typing import Optional
 
 class TFUseCase:
-    def __init__(self, reader, repository: TFLunaRepository, publisher: MQTTPublisher, is_connected):
-        self.reader = reader
+    def __init__(self, reader, repository: TFLunaRepository, publisher: MQTTPublisher, is_connected,
+                 stream_filter: Optional[TFFilterConfig] = None):
+        self.reader = reader  # Su hilo drena la UART en un SampleRing: read() es O(1)
         self.repository = repository
         self.is_connected = is_connected
         self.publisher = publisher
-
-    async def execute(self, project_id=1, event=False):
-        raw = self.reader.read()
-        if not raw:
+        self.stream_filter = stream_filter  # Suavizado por defecto del streaming (None = trama cruda)
+
+    async def execute(self, project_id=1, event=False, filter_config: Optional[TFFilterConfig] = None,
+                      smooth: Optional[bool] = None):
+        """
+        event=True: ráfaga de tramas nuevas filtrada (mediana/media recortada + dispersión).
+        event=False: última trama (O(1), sin I/O en el event loop) o, con smooth,
+        el mismo filtro sobre las últimas tramas del buffer. Sin smooth explícito,
+        un filter_config implica smooth (no se ignora en silencio).
+        """
+        if event:
+            data = await self._burst(project_id, filter_config or TFFilterConfig())
+        elif smooth or (smooth is None and (filter_config is not None or self.stream_filter is not None)):
+            data = self._smoothed(project_id, filter_config or self.stream_filter or TFFilterConfig())
+        else:
+            raw = self.reader.read()
+            data = SensorTF(id_project=project_id, event=event, **raw) if raw else None
+        if data is None:
             return None
-
-        data = SensorTF(id_project=project_id, event=event, **raw)
         
         self.publisher.publish(data)
 
@@ -25,6 +43,44 @@ class TFUseCase:
 
         return data
 
+    async def _burst(self, project_id: int, config: TFFilterConfig) -> Optional[SensorTF]:
+        frames = config.frames or (None if config.window_ms else BURST_FRAMES)
+        samples = await self.reader.collect(frames=frames, window_ms=config.window_ms)
+        return self._from_samples(project_id, True, samples, config)
+
+    def _smoothed(self, project_id: int, config: TFFilterConfig) -> Optional[SensorTF]:
+        if config.window_ms:
+            samples = self.reader.recent(config.window_ms, config.frames)
+        else:
+            samples = self.reader.window(config.frames or SMOOTH_FRAMES)
+        return self._from_samples(project_id, False, samples, config)
+
+    @staticmethod
+    def _from_samples(project_id: int, event: bool, samples, config: TFFilterConfig) -> Optional[SensorTF]:
+        if not samples:
+            return None
+        result: Optional[TFFilterResult] = robust_filter(
+            [s.distancia_cm for s in samples],
+            [s.fuerza_senal for s in samples],
+            [s.temperatura for s in samples],
+            config
+        )
+        if result is None:
+            return None
+        distance = int(round(result.distancia_cm))
+        return SensorTF(
+            id_project=project_id,
+            distancia_cm=distance,
+            distancia_m=round(result.distancia_cm / 100, 2),
+            fuerza_senal=result.fuerza_senal,
+            temperatura=result.temperatura,
+            event=event,
+            timestamp=datetime.utcfromtimestamp(samples[-1].timestamp),
+            muestras=result.muestras,
+            descartadas=result.descartadas,
+            dispersion_cm=result.dispersion_cm
+        )
+
     async def create(self, data: SensorTF):
         if not data.event:
             return {"msg": "No se almacenó porque event es False"}
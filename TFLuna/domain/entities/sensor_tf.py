@@ -15,6 +15,10 @@ class SensorTFLuna(BaseModel):
     measurement_count: int = 1
     total_distance_cm: Optional[int] = None
     total_distance_m: Optional[float] = None
+    # Estadísticas de la ráfaga filtrada (None en lecturas de una sola trama)
+    muestras: Optional[int] = None
+    descartadas: Optional[int] = None
+    dispersion_cm: Optional[float] = None
 
     @field_validator('id_project')
     @classmethod
@@ -0,0 +1,133 @@
+# TFLuna/domain/services/tf_filter.py
+"""
+Filtrado robusto de ráfagas TF-Luna (vectorizado con NumPy).
+
+1. Descarta tramas con señal baja o saturada (fuerza_senal < min_strength o 65535)
+   y distancias fuera del rango útil del sensor.
+2. Descarta outliers por MAD: |d - mediana| > mad_k * 1.4826 * MAD
+   (con un piso de 1 cm, la resolución del sensor, para ráfagas casi constantes).
+3. Resume las tramas aceptadas con la mediana o la media recortada, más su dispersión.
+
+Lo usan tanto las capturas con event=True (ráfaga de N tramas o T ms) como el
+modo suavizado del streaming (ventana de las últimas tramas del buffer).
+"""
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, field_validator
+
+SATURATED_STRENGTH = 65535
+MIN_DISTANCE_CM = 20
+MAX_DISTANCE_CM = 1200
+MAD_TO_SIGMA = 1.4826
+MIN_TOLERANCE_CM = 1.0
+
+BURST_FRAMES = 50    # Ráfaga por defecto (~0.5 s a 100 Hz)
+SMOOTH_FRAMES = 25   # Ventana por defecto del suavizado en vivo
+
+ESTIMATOR_MEDIAN = "median"
+ESTIMATOR_TRIMMED_MEAN = "trimmed_mean"
+
+
+class TFFilterConfig(BaseModel):
+    frames: Optional[int] = None        # Tramas a juntar (ráfaga) o ventana del suavizado
+    window_ms: Optional[int] = None     # Alternativa a frames: duración de la ráfaga
+    min_strength: int = 100             # El fabricante considera poco fiable < 100
+    mad_k: float = 3.0
+    estimator: str = ESTIMATOR_MEDIAN
+    trim: float = 0.1                   # Fracción recortada por cada lado (trimmed_mean)
+    min_valid: int = 3                  # Tramas aceptadas mínimas para dar un resultado
+
+    @field_validator("frames")
+    @classmethod
+    def validate_frames(cls, v):
+        if v is not None and not 1 <= v <= 1000:
+            raise ValueError("frames debe estar entre 1 y 1000")
+        return v
+
+    @field_validator("window_ms")
+    @classmethod
+    def validate_window_ms(cls, v):
+        if v is not None and not 10 <= v <= 3000:
+            raise ValueError("window_ms debe estar entre 10 y 3000")
+        return v
+
+    @field_validator("mad_k")
+    @classmethod
+    def validate_mad_k(cls, v):
+        if v <= 0:
+            raise ValueError("mad_k debe ser positivo")
+        return v
+
+    @field_validator("estimator")
+    @classmethod
+    def validate_estimator(cls, v):
+        if v not in (ESTIMATOR_MEDIAN, ESTIMATOR_TRIMMED_MEAN):
+            raise ValueError(f"estimator debe ser '{ESTIMATOR_MEDIAN}' o '{ESTIMATOR_TRIMMED_MEAN}'")
+        return v
+
+    @field_validator("trim")
+    @classmethod
+    def validate_trim(cls, v):
+        if not 0 <= v < 0.5:
+            raise ValueError("trim debe estar entre 0 y 0.5")
+        return v
+
+
+class TFFilterResult(NamedTuple):
+    distancia_cm: float
+    fuerza_senal: int
+    temperatura: float
+    dispersion_cm: float   # Desviación estándar de las tramas aceptadas
+    muestras: int          # Tramas aceptadas
+    descartadas: int       # Tramas rechazadas (señal o MAD)
+
+
+def trimmed_mean(values: np.ndarray, trim: float) -> float:
+    cut = int(values.size * trim)
+    ordered = np.sort(values)
+    if cut and values.size - 2 * cut > 0:
+        ordered = ordered[cut:values.size - cut]
+    return float(ordered.mean())
+
+
+def robust_filter(
+    distances: Sequence[float],
+    strengths: Sequence[int],
+    temperatures: Sequence[float],
+    config: TFFilterConfig
+) -> Optional[TFFilterResult]:
+    """Filtra una ráfaga. None si quedan menos de min_valid tramas aceptadas."""
+    d = np.asarray(distances, dtype=np.float64)
+    s = np.asarray(strengths, dtype=np.int64)
+    t = np.asarray(temperatures, dtype=np.float64)
+    total = d.size
+    if not total:
+        return None
+    min_valid = min(config.min_valid, total)  # Ráfagas pedidas más cortas que min_valid
+
+    mask = (s >= config.min_strength) & (s != SATURATED_STRENGTH) & (d >= MIN_DISTANCE_CM) & (d <= MAX_DISTANCE_CM)
+    if np.count_nonzero(mask) >= min_valid:
+        valid = d[mask]
+        median = np.median(valid)
+        mad = np.median(np.abs(valid - median))
+        tolerance = max(config.mad_k * MAD_TO_SIGMA * mad, MIN_TOLERANCE_CM)
+        mask &= np.abs(d - median) <= tolerance
+
+    kept = d[mask]
+    if kept.size < min_valid:
+        return None
+
+    if config.estimator == ESTIMATOR_TRIMMED_MEAN:
+        value = trimmed_mean(kept, config.trim)
+    else:
+        value = float(np.median(kept))
+
+    return TFFilterResult(
+        distancia_cm=round(value, 2),
+        fuerza_senal=int(np.median(s[mask])),
+        temperatura=round(float(t[mask].mean()), 2),
+        dispersion_cm=round(float(kept.std(ddof=1)) if kept.size > 1 else 0.0, 3),
+        muestras=int(kept.size),
+        descartadas=int(total - kept.size),
+    )
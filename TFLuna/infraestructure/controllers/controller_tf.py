@@ -6,8 +6,8 @@ class TFController:
     def __init__(self, usecase: TFUseCase):
         self.usecase = usecase
 
-    async def get_tf_data(self, event: bool = False):
-        return await self.usecase.execute(event=event)
+    async def get_tf_data(self, event: bool = False, filter_config=None, smooth=None):
+        return await self.usecase.execute(event=event, filter_config=filter_config, smooth=smooth)
 
     async def create_sensor(self, data: SensorTF):
         return await self.usecase.create(data)
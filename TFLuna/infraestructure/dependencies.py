@@ -5,7 +5,11 @@ from TFLuna.infraestructure.mqtt.publisher import RabbitMQPublisher
 from TFLuna.application.tf_usecases import TFUseCase
 from TFLuna.infraestructure.controllers.controller_tf import TFController
 from TFLuna.infraestructure.repositories.tf_repo_dual import DualTFLunaRepository
+from TFLuna.domain.services.tf_filter import TFFilterConfig
 from core.connectivity import is_connected
+from core.simulation import is_simulated, simulation_config
+from core.stream_log import get_replay_log, is_replayed, replay_loop, replay_speed
+import os
 
 def init_tf_dependencies(
     app: FastAPI,
@@ -13,7 +17,19 @@ def init_tf_dependencies(
     session_remote_factory,
     rabbitmq_config: dict
 ):
-    reader = TFSerialReader()
+    # Reproducción de un log o simulación: un pseudo-terminal que el lector real abre como a la UART
+    feeder = None
+    if is_replayed("tfluna"):
+        from TFLuna.infraestructure.simulation.tf_replay import TFLunaReplay
+        feeder = TFLunaReplay(get_replay_log(), replay_speed(), replay_loop()).start()
+    elif is_simulated("tfluna"):
+        from TFLuna.infraestructure.simulation.tf_simulator import TFLunaSimulator
+        feeder = TFLunaSimulator(simulation_config("tfluna", 100.0)).start()
+    if feeder is not None:
+        app.state.tf_simulator = feeder
+        reader = TFSerialReader(port=feeder.port)
+    else:
+        reader = TFSerialReader()
     repository = DualTFLunaRepository(session_local_factory, session_remote_factory)
     publisher = RabbitMQPublisher(
         host=rabbitmq_config["host"],
@@ -22,6 +38,13 @@ def init_tf_dependencies(
         routing_key=rabbitmq_config["routing_key"]
     )
 
-    usecase = TFUseCase(reader, repository, publisher, is_connected)
+    # Suavizado del streaming: ventana de N tramas (0 = trama cruda)
+    smooth_frames = int(os.getenv("TF_STREAM_SMOOTH_FRAMES", "0"))
+    stream_filter = TFFilterConfig(frames=smooth_frames) if smooth_frames > 0 else None
+
+    # Sin Sampler: el hilo del lector ya es el único dueño de la UART y guarda
+    # cada trama con su timestamp; otro buffer solo agregaría latencia
+    usecase = TFUseCase(reader, repository, publisher, is_connected, stream_filter=stream_filter)
     controller = TFController(usecase)
-    app.state.tf_controller = controller
\ No newline at end of file
+    app.state.tf_controller = controller
+    app.state.tf_reader = reader
\ No newline at end of file
@@ -1,7 +1,8 @@
 # TFLuna/infraestructure/mqtt/publisher.py
 from TFLuna.domain.ports.mqtt_publisher import MQTTPublisher
 from TFLuna.domain.entities.sensor_tf import SensorTFLuna as SensorTF
-from core.rabbitmq_pool import get_rabbitmq_pool
+from core.rabbitmq_pool import get_rabbitmq_pool, lane_for_sensor
+from core.serialization import encode_reading
 
 
 class RabbitMQPublisher(MQTTPublisher):
@@ -17,12 +18,13 @@ class RabbitMQPublisher(MQTTPublisher):
         # El pool se inicializa en main.py al arrancar la app
 
     def publish(self, sensor: SensorTF):
-        """Publica usando el pool compartido (no bloqueante)."""
+        """Publica usando el pool compartido (no bloqueante), en el carril que corresponde a la entidad."""
         try:
             pool = get_rabbitmq_pool(self.host, self.user, self.password)
             pool.publish(
                 routing_key=self.routing_key,
-                body=sensor.dict()
+                body=encode_reading(sensor),
+                lane=lane_for_sensor(sensor)
             )
         except Exception as e:
             print(f"[MQTT-TF] Error al encolar mensaje: {e}")
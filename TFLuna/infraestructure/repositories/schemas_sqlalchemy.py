@@ -21,6 +21,9 @@ class SensorTFModel(Base):
     measurement_count = Column(Integer, default=1, nullable=False)
     total_distance_cm = Column(Integer, nullable=True)
     total_distance_m = Column(Float, nullable=True)
+    muestras = Column(Integer, nullable=True)
+    descartadas = Column(Integer, nullable=True)
+    dispersion_cm = Column(Float, nullable=True)
 
     def as_dict(self):
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
\ No newline at end of file
@@ -22,16 +22,18 @@ class DualTFLunaRepository(TFLunaRepository):
         """Retorna el semáforo apropiado según el tipo de BD."""
         return DB_SEMAPHORE_REMOTE if online else DB_SEMAPHORE_LOCAL
 
-    async def save(self, sensor_data: SensorTFLuna, online: bool):
-        """Guarda localmente (rápido). La sincronización remota la hace sync_service en background."""
+    def local_model(self, sensor_data: SensorTFLuna) -> SensorTFModel:
+        """Fila local pendiente de sync (también la usa el snapshot multi-sensor)."""
         data_dict = sensor_data.dict()
         data_dict.pop('id', None)
-        
+        return SensorTFModel(**data_dict, synced=False)
+
+    async def save(self, sensor_data: SensorTFLuna, online: bool):
+        """Guarda localmente (rápido). La sincronización remota la hace sync_service en background."""
         # Solo guardar localmente - el sync_service se encarga del remoto
         async with self.local_factory() as session_local:
             try:
-                local_model = SensorTFModel(**data_dict, synced=False)
-                session_local.add(local_model)
+                session_local.add(self.local_model(sensor_data))
                 await session_local.commit()
                 logger.debug("TFLuna: Guardado local exitoso, pendiente de sync")
             except Exception as e:
@@ -54,6 +56,9 @@ class DualTFLunaRepository(TFLunaRepository):
             'measurement_count': sensor_data.measurement_count,
             'total_distance_cm': sensor_data.total_distance_cm,
             'total_distance_m': sensor_data.total_distance_m,
+            'muestras': sensor_data.muestras,
+            'descartadas': sensor_data.descartadas,
+            'dispersion_cm': sensor_data.dispersion_cm,
             'synced': online
         }
 
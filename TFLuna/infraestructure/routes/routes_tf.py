@@ -2,28 +2,68 @@
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.responses import JSONResponse
 from TFLuna.domain.entities.sensor_tf import SensorTFLuna as SensorTF
-from TFLuna.infraestructure.ws.ws_manager import WebSocketManager
+from TFLuna.domain.services.tf_filter import TFFilterConfig
+from pydantic import ValidationError
+from TFLuna.infraestructure.ws.ws_manager import ws_manager  # Instancia compartida con el hub
 from core.concurrency import RATE_LIMITERS
+from core.serialization import success_response
+from core.sse import sse_response
+from typing import Optional
 import asyncio
 
 router_ws_tf = APIRouter()
-ws_manager = WebSocketManager()
 router = APIRouter()
 
+FILTER_PARAMS = {"frames", "window_ms", "min_strength", "mad_k", "estimator", "trim"}
+
 @router.get("/tfluna/sensor")
-async def get_sensor(request: Request, event: bool = False):
-    """Obtiene lectura actual del sensor TF-Luna."""
+async def get_sensor(
+    request: Request,
+    event: bool = False,
+    smooth: Optional[bool] = None,
+    frames: Optional[int] = None,
+    window_ms: Optional[int] = None,
+    min_strength: int = 100,
+    mad_k: float = 3.0,
+    estimator: str = "median",
+    trim: float = 0.1
+):
+    """
+    Obtiene lectura actual del sensor TF-Luna.
+    event=true: ráfaga de `frames` tramas (50 por defecto) o `window_ms` ms, filtrada
+    por fuerza de señal y MAD; guarda la mediana (o media recortada) con su dispersión.
+    smooth=true: el mismo filtro sobre las últimas `frames` tramas (25 por defecto)
+    o las de los últimos `window_ms` ms.
+    Parámetros de filtro sin event ni smooth implican smooth=true; con smooth=false, 400.
+    """
+    filter_params = FILTER_PARAMS.intersection(request.query_params)
+    if filter_params and not event and smooth is False:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Parámetros de filtro ({', '.join(sorted(filter_params))}) requieren event=true o smooth=true"
+        )
+
     if not await RATE_LIMITERS["tfluna"].acquire():
         raise HTTPException(status_code=429, detail="Demasiadas peticiones al sensor TF-Luna, intente más tarde")
-    
+
+    filter_config = None
+    if filter_params:  # Sin parámetros: configuración por defecto
+        try:
+            filter_config = TFFilterConfig(
+                frames=frames, window_ms=window_ms, min_strength=min_strength,
+                mad_k=mad_k, estimator=estimator, trim=trim
+            )
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail="; ".join(err["msg"] for err in e.errors()))
+
     controller = request.app.state.tf_controller
     try:
         data = await asyncio.wait_for(
-            controller.get_tf_data(event=event),
+            controller.get_tf_data(event=event, filter_config=filter_config, smooth=smooth),
             timeout=5.0
         )
         if data:
-            return {"success": True, "data": data.dict()}
+            return success_response(data)
         return JSONResponse(
             status_code=503,
             content={"success": False, "error": "El sensor TF-Luna no está disponible o no hay datos"}
@@ -33,6 +73,20 @@ async def get_sensor(request: Request, event: bool = False):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al leer sensor TF-Luna: {str(e)}")
 
+@router.get("/tfluna/sensor/stream")
+async def tf_luna_stream(
+    request: Request,
+    project_id: Optional[int] = None,
+    max_rate: Optional[float] = None,
+    aggregate: Optional[str] = None,
+    backfill: int = 0
+):
+    """
+    Stream SSE de lecturas TF-Luna (mismo origen que los WebSocket).
+    Reanuda desde el historial en memoria con la cabecera Last-Event-ID.
+    """
+    return sse_response(request, "tfluna", project_id, max_rate, aggregate, backfill)
+
 @router.post("/tfluna/sensor")
 async def post_sensor(request: Request, payload: SensorTF):
     """Guarda una nueva medición del sensor TF-Luna."""
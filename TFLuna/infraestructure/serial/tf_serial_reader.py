@@ -1,17 +1,102 @@
 #TFLuna/infraestructure/serial/tf_serial_reader.py
+import asyncio
 import serial
 import platform
+import threading
+import time
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from core.sample_ring import SampleRing
+from core.stream_log import stream_writer
+
+FRAME_HEADER = b"\x59\x59"
+FRAME_SIZE = 9
+MIN_DISTANCE_CM = 20
+
+
+class TFSample(NamedTuple):
+    timestamp: float   # epoch (s) en que se parseó la trama
+    monotonic: float   # reloj monotónico para calcular antigüedad
+    distancia_cm: int
+    fuerza_senal: int
+    temperatura: float
+
+
+class TFFrameParser:
+    """
+    Parser incremental de tramas TF-Luna (9 bytes):
+        0x59 0x59 | dist_L dist_H | amp_L amp_H | temp_L temp_H | checksum
+    Acumula bytes en un bytearray, se resincroniza buscando la cabecera 0x59 0x59
+    y descarta tramas cuyo checksum (suma de los 8 primeros bytes & 0xFF) no coincide.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.frames = 0
+        self.checksum_errors = 0
+        self.bytes_discarded = 0
+
+    def feed(self, chunk: bytes) -> List[tuple]:
+        """Agrega bytes y retorna las tramas válidas como (distancia, fuerza, temperatura)."""
+        buf = self._buffer
+        buf += chunk
+        frames = []
+        while True:
+            start = buf.find(FRAME_HEADER)
+            if start < 0:
+                # Conservar un 0x59 final: puede ser la mitad de una cabecera
+                keep = 1 if buf[-1:] == FRAME_HEADER[:1] else 0
+                self.bytes_discarded += len(buf) - keep
+                del buf[:len(buf) - keep]
+                break
+            if start:
+                self.bytes_discarded += start
+                del buf[:start]
+            if len(buf) < FRAME_SIZE:
+                break
+            if sum(buf[:8]) & 0xFF != buf[8]:
+                # Cabecera falsa o trama corrupta: avanzar un byte y volver a buscar
+                self.checksum_errors += 1
+                self.bytes_discarded += 1
+                del buf[:1]
+                continue
+            distance = buf[2] | buf[3] << 8
+            strength = buf[4] | buf[5] << 8
+            temperature = (buf[6] | buf[7] << 8) / 8 - 256
+            del buf[:FRAME_SIZE]
+            self.frames += 1
+            frames.append((distance, strength, round(temperature, 2)))
+        return frames
+
 
 class TFSerialReader:
-    def __init__(self, port="/dev/ttyAMA0", baudrate=115200):
+    """
+    Lector continuo del TF-Luna.
+    Un hilo dedicado drena la UART sin pausas, parsea cada trama y guarda las
+    muestras con timestamp en un SampleRing; read() solo consulta la última
+    muestra (O(1), sin I/O), así que es seguro llamarlo desde el event loop.
+    """
+
+    def __init__(self, port="/dev/ttyAMA0", baudrate=115200, buffer_size=1024, max_age=1.0):
+        self.port = port
+        self.baudrate = baudrate
+        self.max_age = max_age  # Segundos tras los que la última muestra se considera vieja
         self.ser = None
         self.is_available = False
-        
+        self.samples: SampleRing[TFSample] = SampleRing(buffer_size)
+        self.parser = TFFrameParser()
+        self.read_errors = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._record = stream_writer("tfluna")  # Grabación de los bytes crudos (RECORD_STREAMS)
+
         if platform.system() != "Windows":
             try:
-                self.ser = serial.Serial(port, baudrate, timeout=0)
+                self.ser = self._open()
                 self.is_available = True
                 print("✅ TFLuna inicializado correctamente")
+                self.start()
             except serial.SerialException as e:
                 print(f"⚠️ TFLuna no disponible (Serial error): {e}")
                 print("   El sensor TFLuna no está conectado o el puerto no existe.")
@@ -22,25 +107,117 @@ class TFSerialReader:
                 self.is_available = False
         else:
             print("🧪 TFLuna: Ejecutando en modo simulado (Windows).")
-            
+
+    def _open(self):
+        # timeout corto: read() bloquea el hilo lector (no el event loop) hasta que llegan bytes
+        return serial.Serial(self.port, self.baudrate, timeout=0.05)
+
+    def start(self):
+        """Inicia el hilo de adquisición."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._reader_loop, name="tfluna-reader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo de adquisición y cierra el puerto."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+        self._thread = None
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+
+    def _reader_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.ser is None or not self.ser.is_open:
+                    self.ser = self._open()
+                    print("✅ TFLuna: puerto serial reabierto")
+                chunk = self.ser.read(max(FRAME_SIZE, self.ser.in_waiting))
+                if not chunk:
+                    continue
+                now, mono = time.time(), time.monotonic()
+                if self._record is not None:
+                    self._record(chunk, now)
+                for distance, strength, temperature in self.parser.feed(chunk):
+                    self.samples.push(TFSample(now, mono, distance, strength, temperature))
+            except (serial.SerialException, OSError) as e:
+                self.read_errors += 1
+                print(f"⚠️ TFLuna: error leyendo el puerto serial: {e}")
+                try:
+                    if self.ser is not None:
+                        self.ser.close()
+                except Exception:
+                    pass
+                self.ser = None
+                self._stop_event.wait(2.0)  # Reintentar la apertura sin girar en vacío
+        print("🛑 TFLuna: hilo de lectura finalizado")
+
+    def latest(self) -> Optional[TFSample]:
+        """Última muestra parseada, o None si no hay o es más vieja que max_age."""
+        sample = self.samples.latest()
+        if sample is None or time.monotonic() - sample.monotonic > self.max_age:
+            return None
+        return sample
+
+    def window(self, frames: int) -> List[TFSample]:
+        """Últimas `frames` muestras no viejas (para el suavizado del streaming)."""
+        now = time.monotonic()
+        return [s for s in self.samples.window(frames) if now - s.monotonic <= self.max_age]
+
+    def recent(self, window_ms: int, frames: Optional[int] = None) -> List[TFSample]:
+        """Muestras de los últimos window_ms ms (a lo sumo las últimas `frames`)."""
+        since = time.monotonic() - window_ms / 1000
+        return [s for s in self.samples.window(frames) if s.monotonic >= since]
+
+    async def collect(self, frames: Optional[int] = None, window_ms: Optional[int] = None, timeout: float = 3.0) -> List[TFSample]:
+        """
+        Ráfaga: espera tramas nuevas hasta juntar `frames` o cumplir `window_ms`
+        (lo que se pida; si vienen ambos, lo primero que ocurra). Solo consulta
+        el buffer, sin I/O: el hilo lector sigue llenándolo mientras tanto.
+        """
+        start_total = self.samples.total
+        started = time.monotonic()
+        deadline = started + (window_ms / 1000 if window_ms else timeout)
+        while True:
+            collected = self.samples.total - start_total
+            if frames and collected >= frames:
+                break
+            if time.monotonic() >= deadline or not self.is_available:
+                break
+            await asyncio.sleep(0.01)
+        collected = min(self.samples.total - start_total, self.samples.capacity)
+        return self.samples.window(min(collected, frames) if frames else collected)
+
     def read(self):
-        if self.ser is None or self.ser.in_waiting < 9:
+        return self.to_reading(self.latest())
+
+    @staticmethod
+    def to_reading(sample: Optional[TFSample]) -> Optional[dict]:
+        """Lectura de una muestra del buffer (None si no hay o está bajo el mínimo del sensor)."""
+        if sample is None or sample.distancia_cm < MIN_DISTANCE_CM:
             return None
+        return {
+            "distancia_cm": sample.distancia_cm,
+            "distancia_m": round(sample.distancia_cm / 100, 2),
+            "fuerza_senal": sample.fuerza_senal,
+            "temperatura": sample.temperatura,
+            "timestamp": datetime.utcfromtimestamp(sample.timestamp)
+        }
 
-        data = self.ser.read(9)
-        self.ser.reset_input_buffer()
-
-        if data[0] == 0x59 and data[1] == 0x59:
-            distance = data[2] + data[3] * 256
-            strength = data[4] + data[5] * 256
-            temperature = (data[6] + data[7] * 256) / 8 - 256
-
-            if distance >= 20:
-                meters = round(distance / 100, 2)
-                return {
-                    "distancia_cm": distance,
-                    "distancia_m": meters,
-                    "fuerza_senal": strength,
-                    "temperatura": round(temperature, 2)
-                }
-        return None
+    def get_stats(self) -> dict:
+        latest = self.samples.latest()
+        return {
+            "available": self.is_available,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "samples": self.samples.total,
+            "frames": self.parser.frames,
+            "checksum_errors": self.parser.checksum_errors,
+            "bytes_discarded": self.parser.bytes_discarded,
+            "read_errors": self.read_errors,
+            "last_sample_age_s": round(time.monotonic() - latest.monotonic, 3) if latest else None,
+        }
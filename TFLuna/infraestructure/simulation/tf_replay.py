@@ -0,0 +1,48 @@
+# TFLuna/infraestructure/simulation/tf_replay.py
+from core.stream_log import ReplayClock, StreamLog
+from TFLuna.infraestructure.simulation.tf_simulator import PtyFeeder
+
+CHANNEL = "tfluna"
+
+
+class TFLunaReplay(PtyFeeder):
+    """
+    Reproduce en el pseudo-terminal los bytes de UART grabados en el canal
+    "tfluna", respetando los tiempos de llegada (divididos por `speed`).
+    Con speed=0 escribe tan rápido como el lector drene el pty: espera a que
+    el pty acepte más bytes (contrapresión) y no se pierde nada. Con speed > 0
+    un lector que no drena pierde bytes, como en la UART real.
+    """
+
+    thread_name = "tfluna-replay"
+
+    def __init__(self, log: StreamLog, speed: float = 1.0, loop: bool = False):
+        super().__init__()
+        self.log = log
+        self.speed = speed
+        self.loop = loop
+        self.stats = {"chunks": 0, "bytes": 0, "passes": 0}
+
+    def _writer_loop(self):
+        clock = ReplayClock(self.speed)
+        while not self._stop_event.is_set():
+            for record in self.log.records([CHANNEL]):
+                delay = clock.delay(record.timestamp)
+                if delay and self._stop_event.wait(delay):
+                    return
+                if not self._write(record.payload, wait=not self.speed):
+                    if self._stop_event.is_set():
+                        return
+                    continue
+                self.stats["chunks"] += 1
+                self.stats["bytes"] += len(record.payload)
+            self.stats["passes"] += 1
+            if self.log.closed:
+                return
+            if not self.loop:
+                print("⏹️ TF-Luna: fin de la reproducción")
+                return
+            clock.restart()
+
+    def describe(self) -> str:
+        return f"reproduciendo {self.log.path} en {self.port} (x{self.speed:g})"
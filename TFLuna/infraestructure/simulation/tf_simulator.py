@@ -0,0 +1,153 @@
+# TFLuna/infraestructure/simulation/tf_simulator.py
+import os
+import pty
+import random
+import select
+import threading
+import time
+import tty
+from typing import Optional
+
+from core.simulation import SimulationConfig, sim_value
+
+FRAME_HEADER = b"\x59\x59"
+
+
+def encode_frame(distance_cm: int, strength: int, temperature_c: float) -> bytes:
+    """Trama TF-Luna de 9 bytes con checksum (inversa de TFFrameParser)."""
+    temp_raw = int(round((temperature_c + 256) * 8)) & 0xFFFF
+    body = FRAME_HEADER + bytes((
+        distance_cm & 0xFF, (distance_cm >> 8) & 0xFF,
+        strength & 0xFF, (strength >> 8) & 0xFF,
+        temp_raw & 0xFF, temp_raw >> 8,
+    ))
+    return body + bytes((sum(body) & 0xFF,))
+
+
+class PtyFeeder:
+    """
+    Puerto serie falso: un hilo escribe en el extremo maestro de un pseudo-terminal
+    y TFSerialReader abre el esclavo (`port`) como si fuera /dev/ttyAMA0.
+    El maestro es no bloqueante: si nadie lee y el buffer del pty se llena, el
+    hilo no se cuelga (stop() siempre puede terminarlo). Las subclases
+    implementan _writer_loop().
+    """
+
+    thread_name = "tfluna-pty"
+
+    def __init__(self):
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)  # Sin eco ni traducción de CR/LF: bytes tal cual
+        self.port = os.ttyname(self._slave)
+        os.set_blocking(self._master, False)
+        self.dropped_bytes = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _write(self, chunk, wait: bool = False) -> bool:
+        """
+        Escribe `chunk` en el maestro. Con el buffer lleno, lo que falta se
+        pierde, como en la UART; con wait=True se espera a que el lector drene
+        (contrapresión) hasta que se pida stop().
+        """
+        view = memoryview(chunk)
+        try:
+            while view:
+                try:
+                    view = view[os.write(self._master, view):]  # El pty acepta escrituras parciales
+                except BlockingIOError:
+                    if not wait or not self._wait_writable():
+                        break
+        except OSError:
+            pass  # Pty cerrado (stop)
+        if view:
+            self.dropped_bytes += len(view)
+            return False
+        return True
+
+    def _wait_writable(self) -> bool:
+        """Espera a que el pty acepte bytes. False si se pidió stop()."""
+        while not self._stop_event.is_set():
+            if select.select((), (self._master,), (), 0.1)[1]:
+                return True
+        return False
+
+    def _writer_loop(self):
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return f"en {self.port}"
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._writer_loop, name=self.thread_name, daemon=True)
+            self._thread.start()
+        print(f"🧪 TF-Luna {self.describe()}")
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class TFLunaSimulator(PtyFeeder):
+    """
+    TF-Luna simulado sobre un pseudo-terminal: escribe tramas reales de 9 bytes.
+
+    Parámetros extra: SIM_TFLUNA_DISTANCE_CM (150), SIM_TFLUNA_DRIFT_CM (amplitud
+    de una deriva lenta, 5). Fallas (SIM_FAULT_RATE, por trama): checksum corrupto,
+    bytes perdidos, basura entre tramas y lecturas con señal baja fuera de rango.
+    """
+
+    thread_name = "tfluna-sim"
+
+    def __init__(self, config: SimulationConfig):
+        super().__init__()
+        self.config = config
+        self.distance_cm = sim_value("tfluna", "DISTANCE_CM", 150.0)
+        self.drift_cm = sim_value("tfluna", "DRIFT_CM", 5.0)
+        self._rng = random.Random(config.seed)
+        self.stats = {"frames": 0, "faults": 0}
+
+    def _frame(self, t: float) -> bytes:
+        rng, cfg = self._rng, self.config
+        distance = self.distance_cm + self.drift_cm * ((t / 30.0) % 2 - 1) + rng.gauss(0, 1.0 * cfg.noise)
+        strength = max(0, int(rng.gauss(1500, 80 * cfg.noise)))
+        temperature = 42.0 + rng.gauss(0, 0.2 * cfg.noise)
+        if cfg.fault_rate and rng.random() < cfg.fault_rate:
+            self.stats["faults"] += 1
+            fault = rng.randrange(4)
+            frame = encode_frame(int(max(0, distance)), strength, temperature)
+            if fault == 0:
+                return frame[:8] + bytes(((frame[8] + 1) & 0xFF,))      # Checksum corrupto
+            if fault == 1:
+                return frame[:rng.randrange(1, 9)]                      # Trama cortada
+            if fault == 2:
+                return bytes(rng.randrange(256) for _ in range(rng.randrange(1, 6))) + frame  # Ruido en la línea
+            return encode_frame(rng.randrange(0, 1200), rng.randrange(0, 90), temperature)  # Señal baja
+        return encode_frame(int(round(max(0, distance))), strength, temperature)
+
+    def _writer_loop(self):
+        period = 1.0 / self.config.rate_hz
+        start = time.monotonic()
+        sent = 0
+        while not self._stop_event.is_set():
+            elapsed = time.monotonic() - start
+            due = int(elapsed / period) - sent
+            if due > 0:
+                chunk = b"".join(self._frame(elapsed) for _ in range(due))
+                self._write(chunk)
+                sent += due
+                self.stats["frames"] += due
+            self._stop_event.wait(min(period, 0.01))
+
+    def describe(self) -> str:
+        return (f"simulado en {self.port} ({self.config.rate_hz:g} Hz, ruido x{self.config.noise:g}, "
+                f"fallas {self.config.fault_rate:.1%})")
@@ -1,15 +1,25 @@
 # TFLuna/infraestructure/ws/ws_manager.py
-from fastapi import WebSocket, WebSocketDisconnect
-from typing import List, Optional
-from core.connectivity import is_connected
-import asyncio
+from fastapi import WebSocket
+from typing import List
+from core.connectivity import connectivity_monitor, is_connected
+from core.ws_hub import ws_hub
 import json
 
 class WebSocketManager:
-    def __init__(self):
+    """
+    Compatibilidad con /tfluna/sensor/ws (solo disponible sin internet).
+    Las lecturas se difunden desde el hub (core/ws_hub.py); aquí queda el
+    rechazo cuando hay internet y el cierre de conexiones al recuperarlo.
+    La conectividad llega por eventos del monitor central: ni la difusión ni
+    este manager sondean la red.
+    """
+    SENSOR = "tfluna"
+
+    def __init__(self, hub=ws_hub, monitor=connectivity_monitor):
+        self.hub = hub
+        self.monitor = monitor
         self.active_connections: List[WebSocket] = []
-        self._connection_check_task: Optional[asyncio.Task] = None
-        self._check_interval = 5
+        self.monitor.subscribe(self._on_connectivity_change)
 
     async def connect(self, websocket: WebSocket):
         try:
@@ -32,11 +42,11 @@ class WebSocketManager:
                 "status": "connected",
                 "message": "Conexión WebSocket establecida correctamente"
             })
-            
-            self._start_connection_monitoring()
+            self.hub.attach(websocket, [self.SENSOR], legacy=True, backfill=True)  # Historial reciente de una vez
             
         except Exception as e:
             print(f"❌ Error durante la conexión WebSocket: {str(e)}")
+            self.hub.detach(websocket)
             if websocket in self.active_connections:
                 self.active_connections.remove(websocket)
             try:
@@ -64,60 +74,30 @@ class WebSocketManager:
                 self.active_connections.remove(websocket)
 
     def disconnect(self, websocket: WebSocket):
+        self.hub.detach(websocket)
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             print(f"🔌 Cliente WebSocket desconectado - Restantes: {len(self.active_connections)}")
-            if not self.active_connections and self._connection_check_task:
-                self._connection_check_task.cancel()
-                self._connection_check_task = None
 
-    async def send_data(self, data: dict):
-        if not self.active_connections:
-            return
+    async def send_data(self, data):
+        """Publica una lectura en el hub (llega a /tfluna/sensor/ws y a los suscriptores de /ws)."""
+        await self.hub.publish(self.SENSOR, data)
 
-        internet_available = await self._check_internet()
-        if internet_available:
+    async def _on_connectivity_change(self, online: bool):
+        """Transición del monitor: al volver internet se cierran los sockets offline."""
+        if online and self.active_connections:
             print("🌐 Internet detectado - Cerrando conexiones WebSocket")
             await self._close_all_connections(
                 reason="Conexión a internet restablecida",
                 code=1000
             )
-            return
-
-        disconnected = []
-        for conn in self.active_connections:
-            try:
-                await conn.send_json(data)
-            except (WebSocketDisconnect, RuntimeError) as e:
-                print(f"⚠️ Error enviando datos: {str(e)}")
-                disconnected.append(conn)
-            except Exception as e:
-                print(f"❌ Error inesperado: {str(e)}")
-                disconnected.append(conn)
-
-        for conn in disconnected:
-            self.disconnect(conn)
 
     async def _check_internet(self):
-        return await is_connected()
-
-    def _start_connection_monitoring(self):
-        if not self._connection_check_task or self._connection_check_task.done():
-            self._connection_check_task = asyncio.create_task(self._monitor_connections())
-
-    async def _monitor_connections(self):
-        while self.active_connections:
-            try:
-                if await self._check_internet():
-                    await self._close_all_connections(
-                        reason="Conexión a internet detectada",
-                        code=1000
-                    )
-                    break
-                await asyncio.sleep(self._check_interval)
-            except Exception as e:
-                print(f"❌ Error en monitoreo de conexión: {str(e)}")
-                break
+        # Estado cacheado del monitor; solo se sondea si aún no hay estado
+        state = self.monitor.state
+        if state is None:
+            return await is_connected()
+        return state
 
     async def _close_all_connections(self, reason: str, code: int = 1000):
         if not self.active_connections:
@@ -133,6 +113,7 @@ class WebSocketManager:
         })
 
         for conn in self.active_connections[:]:
+            self.hub.detach(conn)  # Detener su tarea escritora antes de escribir directo
             try:
                 await conn.send_text(close_message)
                 await conn.close(code=code, reason=reason)
@@ -0,0 +1,84 @@
+"""
+Benchmark del handler de notificaciones BLE del HC-SR04.
+
+Compara el costo por notificación (en el event loop) de:
+  - legacy:  decode UTF-8 + json.loads + dos print por notificación, un solo latest_data
+  - json:    handler nuevo con el formato JSON anterior (fallback)
+  - binario: handler nuevo con el formato compacto, N muestras por notificación
+Los print del camino legacy se redirigen a /dev/null: se mide el formateo y la
+escritura sin depender de la terminal (en la Raspberry con journald cuesta más).
+
+Ejecutar:
+    python benchmark_ble.py
+    python benchmark_ble.py --iterations 50000 --batch 8
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import struct
+import time
+from datetime import datetime
+
+from HCSR04.infraestructure.ble.hc_ble_reader import HCBLEReader, BINARY_MAGIC
+
+
+def legacy_handler(state: dict):
+    """Copia del handler anterior (sin los except, que no se ejercitan)."""
+    def handler(sender, data):
+        raw_data = data.decode('utf-8')
+        print(f"📩 Notificación recibida: {raw_data}")
+        json_data = json.loads(raw_data)
+        distance = json_data.get('distance')
+        if distance is not None and distance > 0:
+            state["latest_data"] = {"distancia_cm": float(distance), "timestamp": time.time()}
+            print(f"📩 HC-SR04 BLE: {distance} cm")
+    return handler
+
+
+def binary_payload(seq: int, batch: int, interval_ms: int = 20) -> bytes:
+    distances_mm = [1000 + (seq * batch + i) % 500 for i in range(batch)]
+    return struct.pack(f"<BBHH{batch}H", BINARY_MAGIC, batch, seq & 0xFFFF, interval_ms, *distances_mm)
+
+
+def bench(handler, payloads) -> float:
+    """µs por notificación."""
+    start = time.perf_counter()
+    for data in payloads:
+        handler(None, data)
+    return (time.perf_counter() - start) / len(payloads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del handler BLE HC-SR04")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=7, help="Muestras por notificación binaria (7 caben en el MTU por defecto)")
+    args = parser.parse_args()
+
+    json_payloads = [json.dumps({"distance": 100 + i % 50}).encode() for i in range(args.iterations)]
+    binary_payloads = [binary_payload(i, args.batch) for i in range(args.iterations)]
+
+    print("\n" + "=" * 60)
+    print("📡 BENCHMARK HANDLER BLE HC-SR04")
+    print("=" * 60)
+    print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"  Notificaciones: {args.iterations} | Muestras por notificación binaria: {args.batch}\n")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        legacy = bench(legacy_handler({}), json_payloads)
+    json_reader = HCBLEReader()
+    new_json = bench(json_reader._notification_handler, json_payloads)
+    binary_reader = HCBLEReader()
+    new_binary = bench(binary_reader._notification_handler, binary_payloads)
+
+    print(f"  {'camino':<10}{'µs/notif':>10}{'µs/muestra':>12}{'muestras':>10}")
+    print(f"  {'legacy':<10}{legacy:>10.2f}{legacy:>12.2f}{1:>10}")
+    print(f"  {'json':<10}{new_json:>10.2f}{new_json:>12.2f}{json_reader.samples.total:>10}")
+    print(f"  {'binario':<10}{new_binary:>10.2f}{new_binary / args.batch:>12.2f}{binary_reader.samples.total:>10}")
+    print(f"\n  Mejora por muestra (legacy vs binario): {legacy / (new_binary / args.batch):.1f}x")
+    print(f"  Stats binario: {binary_reader.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Benchmark de publicación RabbitMQ sin red.
+Usa el broker simulado en memoria (core/broker_transport.py) y los cuatro
+adaptadores RabbitMQPublisher reales para empujar lecturas sintéticas de
+TF-Luna, MPU6050, HC-SR04 e IMX477 a tasas fijas.
+
+Reporta throughput, tasa de descarte y latencia de cola (encolado -> ack)
+por carril y por routing key.
+
+Ejemplos:
+    python benchmark_publisher.py
+    python benchmark_publisher.py --duration 20 --latency-ms 2 --jitter-ms 3
+    python benchmark_publisher.py --consumer-rate 150 --consumer-capacity 200
+    python benchmark_publisher.py --disconnect-prob 0.001 --json
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime
+
+from core.broker_transport import InMemoryBrokerTransport
+from core.rabbitmq_pool import init_rabbitmq_pool, reset_rabbitmq_pool
+
+from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+from TFLuna.infraestructure.mqtt.publisher import RabbitMQPublisher as TFPublisher
+from MPU6050.domain.entities.sensor_mpu import SensorMPU
+from MPU6050.infraestructure.mqtt.publisher import RabbitMQMPUPublisher
+from HCSR04.domain.entities.hc_sensor import HCSensorData
+from HCSR04.infraestructure.mqtt.publisher import RabbitMQPublisher as HCPublisher
+from IMX477.domain.entities.sensor_imx import SensorIMX477
+from IMX477.infraestructure.mqtt.publisher import RabbitMQPublisher as IMXPublisher
+
+
+def make_tf(rng: random.Random, event: bool) -> SensorTFLuna:
+    cm = rng.randint(20, 1200)
+    return SensorTFLuna(
+        id_project=1, distancia_cm=cm, distancia_m=round(cm / 100, 2),
+        fuerza_senal=rng.randint(100, 60000), temperatura=round(rng.uniform(20, 45), 2),
+        event=event
+    )
+
+
+def make_mpu(rng: random.Random, event: bool) -> SensorMPU:
+    roll, pitch = round(rng.uniform(-5, 5), 2), round(rng.uniform(-5, 5), 2)
+    return SensorMPU(
+        id_project=1,
+        ax=round(rng.uniform(-0.1, 0.1), 2), ay=round(rng.uniform(-0.1, 0.1), 2), az=round(rng.uniform(0.9, 1.1), 2),
+        gx=round(rng.uniform(-2, 2), 2), gy=round(rng.uniform(-2, 2), 2), gz=round(rng.uniform(-2, 2), 2),
+        roll=roll, pitch=pitch, apertura=round(abs(roll) + abs(pitch), 2),
+        event=event
+    )
+
+
+def make_hc(rng: random.Random, event: bool) -> HCSensorData:
+    return HCSensorData(id_project=1, distancia_cm=round(rng.uniform(2, 400), 1), event=event)
+
+
+def make_imx(rng: random.Random, event: bool) -> SensorIMX477:
+    return SensorIMX477(
+        id_project=1, resolution="640x480",
+        luminosidad_promedio=round(rng.uniform(0, 255), 2), nitidez_score=round(rng.uniform(0, 1500), 2),
+        laser_detectado=rng.random() < 0.5, calidad_frame=round(rng.uniform(0, 1), 2),
+        probabilidad_confiabilidad=round(rng.uniform(0, 100), 2), event=event
+    )
+
+
+SENSORS = {
+    "tfluna": (TFPublisher, make_tf, "bench.tfluna"),
+    "mpu6050": (RabbitMQMPUPublisher, make_mpu, "bench.mpu6050"),
+    "hcsr04": (HCPublisher, make_hc, "bench.hcsr04"),
+    "imx477": (IMXPublisher, make_imx, "bench.imx477"),
+}
+
+
+def producer(name, rate, duration, event_ratio, control_ratio, seed, produced):
+    """Genera lecturas a `rate` msg/s durante `duration` segundos."""
+    publisher_cls, factory, routing_key = SENSORS[name]
+    publisher = publisher_cls(host="bench", user="bench", password="bench", routing_key=routing_key)
+    rng = random.Random(seed)
+    interval = 1.0 / rate
+    next_tick = time.perf_counter()
+    deadline = next_tick + duration
+    count = 0
+
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        roll = rng.random()
+        sensor = factory(rng, event=roll < event_ratio + control_ratio)
+        if roll < control_ratio:
+            sensor.__dict__["_action"] = "delete"
+        publisher.publish(sensor)
+        count += 1
+
+        next_tick += interval
+        sleep_for = next_tick - time.perf_counter()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        elif sleep_for < -1.0:
+            next_tick = time.perf_counter()  # El productor no alcanza la tasa pedida
+
+    produced[name] = count
+
+
+def fmt_ms(value):
+    return f"{value:8.2f}" if value is not None else "     n/a"
+
+
+def run(args) -> dict:
+    transport = InMemoryBrokerTransport(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        disconnect_probability=args.disconnect_prob,
+        consumer_rate=args.consumer_rate,
+        consumer_capacity=args.consumer_capacity,
+        blocked_timeout=args.blocked_timeout,
+        seed=args.seed
+    )
+    reset_rabbitmq_pool()
+    pool = init_rabbitmq_pool("bench", "bench", "bench", transport=transport, reconnect_delay=args.reconnect_delay)
+
+    rates = {"tfluna": args.tf_rate, "mpu6050": args.mpu_rate, "hcsr04": args.hc_rate, "imx477": args.imx_rate}
+    produced = {}
+    threads = [
+        threading.Thread(
+            target=producer,
+            args=(name, rate, args.duration, args.event_ratio, args.control_ratio, args.seed + i, produced),
+            name=f"bench-{name}",
+            daemon=True
+        )
+        for i, (name, rate) in enumerate(rates.items()) if rate > 0
+    ]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    produce_elapsed = time.perf_counter() - start
+
+    # Esperar a que se drene la cola interna
+    drain_deadline = time.perf_counter() + args.drain_timeout
+    while pool.queue_size > 0 and time.perf_counter() < drain_deadline:
+        time.sleep(0.05)
+    total_elapsed = time.perf_counter() - start
+
+    metrics = pool.get_metrics()
+    reset_rabbitmq_pool()
+    transport.shutdown()
+
+    total_produced = sum(produced.values())
+    totals = metrics["totals"]
+    return {
+        "config": vars(args),
+        "produced": produced,
+        "produced_total": total_produced,
+        "produce_seconds": round(produce_elapsed, 3),
+        "total_seconds": round(total_elapsed, 3),
+        "throughput_msg_s": round(totals["published"] / total_elapsed, 1) if total_elapsed else 0,
+        "drop_rate": round(totals["dropped"] / total_produced, 4) if total_produced else 0,
+        "left_in_queue": metrics["queue_size"],
+        "publisher": metrics,
+        "broker": transport.get_stats(),
+    }
+
+
+def print_report(result: dict):
+    pub = result["publisher"]
+    totals = pub["totals"]
+    print("\n" + "=" * 60)
+    print("📊 BENCHMARK DE PUBLICACIÓN RABBITMQ (broker simulado)")
+    print("=" * 60)
+    print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"  📤 Producidos:    {result['produced_total']} {result['produced']}")
+    print(f"  📥 Encolados:     {totals['enqueued']}")
+    print(f"  ✅ Publicados:    {totals['published']}")
+    print(f"  ❌ Descartados:   {totals['dropped']} ({result['drop_rate'] * 100:.2f}%)")
+    print(f"  🔁 Reconexiones:  {totals['reconnects']}")
+    print(f"  📦 En cola:       {result['left_in_queue']}")
+    print(f"  📈 Throughput:    {result['throughput_msg_s']} msg/s en {result['total_seconds']}s")
+
+    print("\n⏱️  Latencia encolado -> ack (ms)          p50      p95      p99      max")
+    overall = pub["latency_ms"]
+    print(f"  {'total':<36}{fmt_ms(overall['p50_ms'])} {fmt_ms(overall['p95_ms'])} {fmt_ms(overall['p99_ms'])} {fmt_ms(overall['max_ms'])}")
+    for lane, hist in sorted(pub["lanes"]["latency_ms"].items()):
+        print(f"  carril {lane:<29}{fmt_ms(hist['p50_ms'])} {fmt_ms(hist['p95_ms'])} {fmt_ms(hist['p99_ms'])} {fmt_ms(hist['max_ms'])}")
+    for key, data in sorted(pub["routing_keys"].items()):
+        hist = data["latency_ms"]
+        if hist:
+            print(f"  {key:<36}{fmt_ms(hist['p50_ms'])} {fmt_ms(hist['p95_ms'])} {fmt_ms(hist['p99_ms'])} {fmt_ms(hist['max_ms'])}")
+
+    print("\n🗑️  Descartes por routing key:")
+    for key, data in sorted(pub["routing_keys"].items()):
+        if data["dropped"]:
+            print(f"  • {key}: {data['dropped']}")
+    print(f"\n🐰 Broker: {result['broker']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del publisher RabbitMQ con broker simulado")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos generando lecturas")
+    parser.add_argument("--tf-rate", type=float, default=50.0, help="Lecturas/s de TF-Luna")
+    parser.add_argument("--mpu-rate", type=float, default=100.0, help="Lecturas/s de MPU6050")
+    parser.add_argument("--hc-rate", type=float, default=20.0, help="Lecturas/s de HC-SR04")
+    parser.add_argument("--imx-rate", type=float, default=5.0, help="Lecturas/s de IMX477")
+    parser.add_argument("--event-ratio", type=float, default=0.05, help="Fracción de lecturas con event=True")
+    parser.add_argument("--control-ratio", type=float, default=0.005, help="Fracción de eventos de control (delete)")
+    parser.add_argument("--latency-ms", type=float, default=0.5, help="Latencia base del ack")
+    parser.add_argument("--jitter-ms", type=float, default=0.5, help="Jitter del ack")
+    parser.add_argument("--disconnect-prob", type=float, default=0.0, help="Probabilidad de desconexión por mensaje")
+    parser.add_argument("--reconnect-delay", type=float, default=0.5, help="Segundos entre reconexiones")
+    parser.add_argument("--consumer-rate", type=float, default=None, help="Consumidor lento (msg/s)")
+    parser.add_argument("--consumer-capacity", type=int, default=10000, help="Cola del broker antes de bloquear")
+    parser.add_argument("--blocked-timeout", type=float, default=30.0, help="Timeout de conexión bloqueada")
+    parser.add_argument("--drain-timeout", type=float, default=10.0, help="Espera máxima para drenar la cola")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Imprimir resultado en JSON")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark determinista sobre capturas reales (core.stream_log).
+
+Reproduce un log grabado con RECORD_STREAMS por los caminos de procesamiento,
+sin hardware y sin esperas, y mide cada etapa por separado:
+  - tfluna:  parseo de la UART (TFFrameParser + SampleRing), filtro robusto por
+             ráfagas y armado/serialización de la entidad
+  - mpu6050: decodificación de la FIFO (decode_fifo + ArrayRing) y filtro complementario
+  - hcsr04:  handler de notificaciones BLE (decodificación + SampleRing)
+  - imx477:  decodificación JPEG y análisis (luminosidad, nitidez, láser)
+La entrada es siempre la misma (bytes del log), así que las diferencias entre
+corridas son del código; se informa la mejor de --repeat pasadas.
+
+Capturar (en la Raspberry, o en local con SIMULATE_SENSORS=all):
+    RECORD_STREAMS=captura.glog RECORD_STREAMS_MAX_MB=200 python main.py
+
+Ejecutar:
+    python benchmark_replay.py captura.glog --info
+    python benchmark_replay.py captura.glog
+    python benchmark_replay.py captura.glog --only tfluna,mpu6050 --repeat 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.sample_ring import ArrayRing, SampleRing
+from core.serialization import encode_reading
+from core.stream_log import StreamLog
+
+
+def best_of(repeat: int, run) -> float:
+    """Mejor tiempo (s) de `repeat` corridas de run()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, seconds: float, count: int, unit: str):
+    rate = count / seconds if seconds else float("inf")
+    per = seconds / count * 1e6 if count else 0.0
+    print(f"  {name:<28} {seconds * 1000:9.2f} ms  {count:>8} {unit:<8} {per:9.2f} µs/{unit}  {rate:>12,.0f} {unit}/s")
+
+
+def bench_tfluna(log: StreamLog, repeat: int, burst: int):
+    from TFLuna.infraestructure.serial.tf_serial_reader import TFFrameParser, TFSample
+    from TFLuna.domain.services.tf_filter import TFFilterConfig, robust_filter
+    from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+
+    chunks = [bytes(r.payload) for r in log.records(["tfluna"])]
+    if not chunks:
+        return
+    frames = []
+
+    def parse():
+        parser = TFFrameParser()
+        ring = SampleRing(1024)
+        frames.clear()
+        for chunk in chunks:
+            for distance, strength, temperature in parser.feed(chunk):
+                ring.push(TFSample(0.0, 0.0, distance, strength, temperature))
+                frames.append((distance, strength, temperature))
+
+    print(f"tfluna ({len(chunks)} lecturas de UART, {sum(map(len, chunks))} bytes)")
+    report("parseo + ring", best_of(repeat, parse), len(frames), "trama")
+
+    config = TFFilterConfig(frames=burst)
+    bursts = [frames[i:i + burst] for i in range(0, len(frames) - burst + 1, burst)]
+    results = []
+
+    def filter_bursts():
+        results.clear()
+        for group in bursts:
+            d, s, t = zip(*group)
+            results.append(robust_filter(d, s, t, config))
+
+    if bursts:
+        report(f"filtro robusto ({burst} tramas)", best_of(repeat, filter_bursts), len(bursts), "ráfaga")
+
+    valid = [r for r in results if r is not None]
+
+    def encode():
+        for r in valid:
+            encode_reading(SensorTFLuna(
+                id_project=1, distancia_cm=int(r.distancia_cm), distancia_m=round(r.distancia_cm / 100, 2),
+                fuerza_senal=r.fuerza_senal, temperatura=r.temperatura,
+                muestras=r.muestras, descartadas=r.descartadas, dispersion_cm=r.dispersion_cm,
+            ))
+
+    if valid:
+        report("entidad + serialización", best_of(repeat, encode), len(valid), "lectura")
+
+
+def bench_mpu(log: StreamLog, repeat: int):
+    from MPU6050.infraestructure.serial.mpu_serial_reader import MAX_BATCH, SAMPLE_BYTES, _SCALE, decode_fifo
+    from MPU6050.domain.services.orientation import ComplementaryFilter
+
+    bursts = [bytes(r.payload) for r in log.records(["mpu6050"])]
+    bursts = [b[:len(b) - len(b) % SAMPLE_BYTES] for b in bursts if len(b) >= SAMPLE_BYTES]
+    if not bursts:
+        return
+    samples = sum(len(b) // SAMPLE_BYTES for b in bursts)
+    gain, offset = 1.0 / _SCALE, np.zeros(6)
+    rows_buffer = np.empty((MAX_BATCH, 7))
+    decoded = []
+
+    def decode():
+        ring = ArrayRing(4096, 7)
+        decoded.clear()
+        t = 0.0
+        for raw in bursts:
+            n = len(raw) // SAMPLE_BYTES
+            rows = rows_buffer[:n]
+            decode_fifo(raw, gain, offset, rows[:, 1:])
+            rows[:, 0] = t + np.arange(n) / 200.0  # Espaciado nominal: el log no guarda la tasa
+            t += n / 200.0
+            ring.push_batch(rows)
+            decoded.append(rows.copy())
+
+    print(f"mpu6050 ({len(bursts)} ráfagas de FIFO, {samples} muestras)")
+    report("decode_fifo + ring", best_of(repeat, decode), samples, "muestra")
+
+    def fuse():
+        fusion = ComplementaryFilter()
+        for rows in decoded:
+            fusion.update_batch(rows)
+
+    report("filtro complementario", best_of(repeat, fuse), samples, "muestra")
+
+
+def bench_hc(log: StreamLog, repeat: int):
+    from HCSR04.infraestructure.ble.hc_ble_reader import HCBLEReader
+
+    channels = [c for c in log.channels if c.startswith("hcsr04/")]
+    payloads = [bytearray(r.payload) for r in log.records(channels)]
+    if not payloads:
+        return
+    samples = []
+
+    def handle():
+        reader = HCBLEReader(device_id="benchmark")
+        reader._record = None  # No volver a grabar lo que se reproduce
+        handler = reader._notification_handler
+        for data in payloads:
+            handler(None, data)
+        samples.append(reader.samples.total)
+
+    print(f"hcsr04 ({len(payloads)} notificaciones de {len(channels)} nodo(s))")
+    report("handler BLE + ring", best_of(repeat, handle), len(payloads), "notif")
+    print(f"  {'':<28} {samples[-1]} muestras válidas por pasada")
+
+
+def bench_imx(log: StreamLog, repeat: int, max_frames: int):
+    import cv2
+    from IMX477.infraestructure.camera.imx_reader import IMXReader
+
+    jpegs = [bytes(r.payload) for r in log.records(["imx477/still", "imx477/mjpeg"])][:max_frames]
+    if not jpegs:
+        return
+    reader = IMXReader()
+    frames = []
+
+    def decode():
+        frames.clear()
+        for data in jpegs:
+            frames.append(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+
+    print(f"imx477 ({len(jpegs)} frames JPEG)")
+    report("decodificación JPEG", best_of(repeat, decode), len(jpegs), "frame")
+    valid = [f for f in frames if f is not None]
+
+    def analyze():
+        for frame in valid:
+            reader._calcular_luminosidad_sync(frame)
+            reader._calcular_nitidez_sync(frame)
+            reader._detectar_laser_sync(frame)
+
+    if valid:
+        report("análisis", best_of(repeat, analyze), len(valid), "frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark determinista sobre un log de flujos crudos")
+    parser.add_argument("log", help="Archivo grabado con RECORD_STREAMS")
+    parser.add_argument("--info", action="store_true", help="Solo mostrar el contenido del log")
+    parser.add_argument("--only", default="tfluna,mpu6050,hcsr04,imx477", help="Sensores a medir")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--burst", type=int, default=20, help="Tramas por ráfaga del filtro TF-Luna")
+    parser.add_argument("--max-frames", type=int, default=200, help="Frames JPEG a analizar como máximo")
+    args = parser.parse_args()
+
+    log = StreamLog(args.log)
+    summary = log.summary()
+    print(f"📼 {summary['path']}: {summary['records']} registros, {summary['duration_s']} s"
+          + (" (último registro incompleto)" if summary["truncated"] else ""))
+    for name, info in summary["channels"].items():
+        print(f"  {name:<28} {info['records']:>8} registros {info['bytes'] / 1024:>10.1f} KiB")
+    if args.info:
+        return
+
+    only = {s.strip() for s in args.only.split(",")}
+    print()
+    if "tfluna" in only:
+        bench_tfluna(log, args.repeat, args.burst)
+    if "mpu6050" in only:
+        bench_mpu(log, args.repeat)
+    if "hcsr04" in only:
+        bench_hc(log, args.repeat)
+    if "imx477" in only:
+        bench_imx(log, args.repeat, args.max_frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark de serialización: encoders actuales vs core/serialization (orjson).
+
+Compara, por lectura, el costo de los tres caminos por los que sale un dato:
+  - HTTP:      data.dict() + jsonable_encoder + JSONResponse (json.dumps)
+  - WebSocket: data.dict() + send_json por cliente (json.dumps por conexión)
+  - Broker:    data.dict() + json.dumps(default=str)
+contra codificar una sola vez con encode_reading() y reutilizar los bytes.
+
+Ejecutar:
+    python benchmark_serialization.py
+    python benchmark_serialization.py --iterations 20000 --ws-clients 10
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from core.serialization import ORJSONResponse, encode_reading, encode_reading_text, success_response
+from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+from MPU6050.domain.entities.sensor_mpu import SensorMPU
+from IMX477.domain.entities.sensor_imx import SensorIMX477
+
+
+def sample_payloads():
+    return {
+        "tfluna": lambda: SensorTFLuna(
+            id_project=1, distancia_cm=345, distancia_m=3.45,
+            fuerza_senal=1200, temperatura=38.5, event=False
+        ),
+        "mpu6050": lambda: SensorMPU(
+            id_project=1, ax=0.01, ay=0.02, az=0.98, gx=0.1, gy=0.2, gz=0.3,
+            roll=1.5, pitch=0.5, apertura=2.0, event=False
+        ),
+        "imx477": lambda: SensorIMX477(
+            id_project=1, resolution="640x480", luminosidad_promedio=120.5,
+            nitidez_score=450.2, laser_detectado=True, calidad_frame=0.82,
+            probabilidad_confiabilidad=76.4, event=False
+        ),
+    }
+
+
+def current_pipeline(reading, ws_clients: int) -> int:
+    """Camino actual: cada consumidor serializa por su cuenta."""
+    size = 0
+    # HTTP (FastAPI serializa el dict devuelto por la ruta)
+    content = jsonable_encoder({"success": True, "data": reading.model_dump()})
+    size += len(JSONResponse(content).body)
+    # WebSocket: send_json hace json.dumps por cada conexión
+    ws_data = reading.model_dump()
+    for _ in range(ws_clients):
+        size += len(json.dumps(ws_data, separators=(",", ":"), ensure_ascii=False, default=str))
+    # Broker
+    size += len(json.dumps(reading.model_dump(), default=str))
+    return size
+
+
+def shared_pipeline(reading, ws_clients: int) -> int:
+    """Camino nuevo: una codificación reutilizada por todos los consumidores."""
+    size = len(encode_reading(reading))                   # Broker
+    text = encode_reading_text(reading)                   # WebSocket (una vez)
+    for _ in range(ws_clients):
+        size += len(text)
+    size += len(success_response(reading).body)           # HTTP
+    return size
+
+
+def bench(fn, factory, iterations: int, ws_clients: int) -> float:
+    """Retorna µs por lectura (incluye crear la entidad, igual en ambos caminos)."""
+    readings = [factory() for _ in range(iterations)]
+    start = time.perf_counter()
+    for r in readings:
+        fn(r, ws_clients)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bench_single_encode(factory, iterations: int):
+    reading = factory()
+    data = reading.model_dump()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        json.dumps(data, default=str)
+    stdlib = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        ORJSONResponse.render(None, data)
+    fast = (time.perf_counter() - start) / iterations * 1e6
+    return stdlib, fast
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización compartida")
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--ws-clients", type=int, default=5, help="Clientes WebSocket simulados por lectura")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("📦 BENCHMARK DE SERIALIZACIÓN")
+    print("=" * 60)
+    print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"  Iteraciones: {args.iterations} | Clientes WS: {args.ws_clients}\n")
+
+    print(f"  {'sensor':<10}{'json.dumps':>12}{'orjson':>10}{'actual/lectura':>17}{'compartido':>13}{'mejora':>9}")
+    for name, factory in sample_payloads().items():
+        stdlib, fast = bench_single_encode(factory, args.iterations)
+        before = bench(current_pipeline, factory, args.iterations, args.ws_clients)
+        after = bench(shared_pipeline, factory, args.iterations, args.ws_clients)
+        print(
+            f"  {name:<10}{stdlib:>10.2f}µs{fast:>8.2f}µs"
+            f"{before:>15.2f}µs{after:>11.2f}µs{before / after:>8.2f}x"
+        )
+    print("\n  (actual/compartido = costo total por lectura en HTTP + WS + broker)")
+
+
+if __name__ == "__main__":
+    main()
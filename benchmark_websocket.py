@@ -0,0 +1,547 @@
+"""
+Benchmark de fan-out WebSocket: cientos de clientes simulados contra el hub.
+
+Levanta un servidor de prueba en un subproceso (los cuatro sockets legacy
+/tfluna|/mpu|/hc|/imx477/sensor/ws y el hub multiplexado /ws) con un sensor
+simulado que publica en ws_hub a una tasa fija, y abre N clientes:
+  - normales:  leen todo lo que llega
+  - lentos:    duermen --slow-delay s por mensaje (el hub debe descartar o expulsarlos)
+  - churn:     se desconectan y reconectan cada pocos segundos
+
+Reporta latencia publicación -> recepción (p50/p95/p99/max), frames perdidos
+(huecos en el id secuencial de las lecturas), frames en vuelo al cerrar (aún
+en la cola del hub o en la red cuando se agotó --drain), expulsiones del hub,
+y CPU y memoria del servidor por cliente.
+
+Los clientes corren en este proceso: si su CPU se acerca al 100% la latencia
+medida incluye la del propio generador de carga (ver "CPU clientes").
+
+Ejemplos:
+    python benchmark_websocket.py
+    python benchmark_websocket.py --clients 400 --rate 20 --duration 20
+    python benchmark_websocket.py --slow-ratio 0.1 --churn-ratio 0.1 --json
+    python benchmark_websocket.py --endpoints hub --clients 200
+    python benchmark_websocket.py --serve --port 8765        # solo el servidor de prueba
+    python benchmark_websocket.py --server 127.0.0.1:8765    # usar un servidor ya levantado
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import orjson
+
+SENSORS = ("tfluna", "mpu6050", "hcsr04", "imx477")
+LEGACY_PATHS = {
+    "tfluna": "/tfluna/sensor/ws",
+    "mpu6050": "/mpu/sensor/ws",
+    "hcsr04": "/hc/sensor/ws",
+    "imx477": "/imx477/sensor/ws",
+}
+EPOCH = datetime(1970, 1, 1)
+
+
+# ---------------------------------------------------------------------------
+# Servidor de prueba (subproceso)
+# ---------------------------------------------------------------------------
+
+def rss_kb():
+    """RSS actual del proceso en KB (None si no se puede medir en esta plataforma)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def make_reading(sensor: str, n: int, rng: random.Random):
+    """Lectura sintética con id = número de publicación y timestamp actual."""
+    from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+    from MPU6050.domain.entities.sensor_mpu import SensorMPU
+    from HCSR04.domain.entities.hc_sensor import HCSensorData
+    from IMX477.domain.entities.sensor_imx import SensorIMX477
+
+    now = datetime.utcnow()
+    if sensor == "tfluna":
+        cm = rng.randint(20, 1200)
+        return SensorTFLuna(id=n, id_project=1, distancia_cm=cm, distancia_m=round(cm / 100, 2),
+                            fuerza_senal=rng.randint(100, 60000), temperatura=round(rng.uniform(20, 45), 2),
+                            event=False, timestamp=now)
+    if sensor == "mpu6050":
+        roll, pitch = round(rng.uniform(-5, 5), 2), round(rng.uniform(-5, 5), 2)
+        return SensorMPU(id=n, id_project=1, ax=0.01, ay=0.02, az=0.98,
+                         gx=round(rng.uniform(-2, 2), 2), gy=round(rng.uniform(-2, 2), 2), gz=round(rng.uniform(-2, 2), 2),
+                         roll=roll, pitch=pitch, apertura=round(abs(roll) + abs(pitch), 2),
+                         event=False, timestamp=now)
+    if sensor == "hcsr04":
+        return HCSensorData(id=n, id_project=1, distancia_cm=round(rng.uniform(2, 400), 1), event=False, timestamp=now)
+    return SensorIMX477(id=n, id_project=1, resolution="640x480",
+                        luminosidad_promedio=round(rng.uniform(0, 255), 2), nitidez_score=round(rng.uniform(0, 1500), 2),
+                        laser_detectado=rng.random() < 0.5, calidad_frame=round(rng.uniform(0, 1), 2),
+                        probabilidad_confiabilidad=round(rng.uniform(0, 100), 2), event=False, timestamp=now)
+
+
+def build_server_app(rate: float, seed: int):
+    """App mínima: sockets legacy + hub + endpoints de control /bench/*."""
+    from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+    from core.connectivity import connectivity_monitor
+    from core.ws_hub import ws_hub
+    from core.ws_routes import router_ws_hub
+    from TFLuna.infraestructure.ws.ws_manager import ws_manager
+    from MPU6050.infraestructure.ws.ws_manager import ws_manager_mpu
+    from HCSR04.infraestructure.ws.ws_manager import ws_manager_hc
+    from IMX477.infraestructure.ws.ws_manager import ws_manager_imx
+
+    managers = {"tfluna": ws_manager, "mpu6050": ws_manager_mpu, "hcsr04": ws_manager_hc, "imx477": ws_manager_imx}
+    state = {"published": {s: 0 for s in SENSORS}, "task": None}
+
+    async def offline():
+        return False  # Los sockets legacy solo aceptan clientes sin internet
+
+    async def publisher():
+        rng = random.Random(seed)
+        interval = 1.0 / rate
+        next_tick = time.perf_counter()
+        while True:
+            for sensor in SENSORS:
+                state["published"][sensor] += 1
+                await ws_hub.publish(sensor, make_reading(sensor, state["published"][sensor], rng))
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay < -1.0:
+                next_tick = time.perf_counter()  # El publicador no alcanza la tasa pedida
+            await asyncio.sleep(max(0.0, delay))
+
+    async def lifespan(app):
+        connectivity_monitor.start(probe=offline, interval=3600)
+        yield
+        connectivity_monitor.stop()
+        if state["task"]:
+            state["task"].cancel()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router_ws_hub)
+
+    def legacy_endpoint(manager):
+        async def endpoint(websocket: WebSocket):
+            await manager.connect(websocket)
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                manager.disconnect(websocket)
+        return endpoint
+
+    for sensor, path in LEGACY_PATHS.items():
+        app.add_api_websocket_route(path, legacy_endpoint(managers[sensor]))
+
+    @app.post("/bench/start")
+    async def start():
+        if state["task"] is None:
+            state["task"] = asyncio.create_task(publisher())
+        return {"started": True}
+
+    @app.post("/bench/stop")
+    async def stop():
+        if state["task"] is not None:
+            state["task"].cancel()
+            state["task"] = None
+        return {"published": state["published"]}
+
+    @app.get("/bench/stats")
+    async def stats():
+        hub = ws_hub.get_stats()
+        per_client = hub.pop("per_client", [])
+        return {
+            "published": state["published"],
+            "queued": sum(c["queue_depth"] for c in per_client),
+            "cpu_s": time.process_time(),
+            "rss_kb": rss_kb(),
+            "hub": hub,
+        }
+
+    return app
+
+
+def serve(args):
+    import uvicorn
+    app = build_server_app(args.rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+# ---------------------------------------------------------------------------
+# Clientes
+# ---------------------------------------------------------------------------
+
+class ClientStats:
+    def __init__(self, index: int, sensor: str, endpoint: str, kind: str):
+        self.index = index
+        self.sensor = sensor
+        self.endpoint = endpoint
+        self.kind = kind
+        self.received = 0
+        self.latencies_ms = []
+        self.missed = 0
+        self.pending = 0  # Sin llegar al cerrar la ventana (en cola o en la red)
+        self.last_id = None
+        self.connected = False
+        self.evicted = 0
+        self.reconnects = 0
+        self.errors = 0
+
+    def on_reading(self, data: dict, connected_at: float):
+        reading_id = data.get("id")
+        self.received += 1
+        if isinstance(reading_id, int):
+            if self.last_id is not None and reading_id > self.last_id + 1:
+                self.missed += reading_id - self.last_id - 1
+            if self.last_id is None or reading_id > self.last_id:
+                self.last_id = reading_id
+        timestamp = data.get("timestamp")
+        if isinstance(timestamp, str):
+            sent = (datetime.fromisoformat(timestamp) - EPOCH).total_seconds()
+            if sent >= connected_at:  # El backfill inicial no cuenta como latencia
+                self.latencies_ms.append((time.time() - sent) * 1000)
+
+
+def client_url(base: str, stats: ClientStats) -> str:
+    if stats.endpoint == "legacy":
+        return f"ws://{base}{LEGACY_PATHS[stats.sensor]}"
+    return f"ws://{base}/ws?topics={stats.sensor}&backfill=0"
+
+
+def extract_reading(message, endpoint: str):
+    """Datos de la lectura en el frame, o None si es un mensaje de control."""
+    payload = orjson.loads(message)
+    if not isinstance(payload, dict):
+        return None
+    if endpoint == "hub" or "type" in payload:
+        return payload.get("data") if payload.get("type") == "reading" else None
+    return payload
+
+
+async def run_client(base: str, stats: ClientStats, args, ready: asyncio.Event, stop: asyncio.Event, rng: random.Random):
+    import websockets
+
+    first = True
+    while not stop.is_set():
+        try:
+            async with websockets.connect(client_url(base, stats), max_queue=16, open_timeout=10) as ws:
+                if not first:
+                    stats.reconnects += 1
+                    stats.last_id = None  # Los huecos mientras estuvo desconectado no son pérdidas
+                connected_at = time.time()
+                stats.connected = True
+                if first:
+                    ready.set()
+                    first = False
+                churn_at = time.perf_counter() + rng.uniform(1.0, args.churn_after) if stats.kind == "churn" else None
+                while not stop.is_set():
+                    timeout = 0.5 if churn_at is None else max(0.0, min(0.5, churn_at - time.perf_counter()))
+                    try:
+                        message = await asyncio.wait_for(ws.recv(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        if churn_at is not None and time.perf_counter() >= churn_at:
+                            break
+                        continue
+                    data = extract_reading(message, stats.endpoint)
+                    if data is not None:
+                        stats.on_reading(data, connected_at)
+                    if stats.kind == "slow":
+                        await asyncio.sleep(args.slow_delay)
+                stats.connected = False
+        except websockets.ConnectionClosed as e:
+            stats.connected = False
+            if e.rcvd is not None and e.rcvd.code == 1013:
+                stats.evicted += 1
+            if stop.is_set():
+                break
+            await asyncio.sleep(0.5)
+        except Exception:
+            stats.connected = False
+            stats.errors += 1
+            if first:
+                ready.set()
+                return
+            await asyncio.sleep(0.5)
+
+
+# ---------------------------------------------------------------------------
+# Orquestación
+# ---------------------------------------------------------------------------
+
+async def http(session, method: str, base: str, path: str) -> dict:
+    async with session.request(method, f"http://{base}{path}") as response:
+        return await response.json()
+
+
+async def wait_server(session, base: str, timeout: float = 15.0) -> dict:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await http(session, "GET", base, "/bench/stats")
+        except Exception:
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"El servidor de prueba no responde en {base}")
+            await asyncio.sleep(0.2)
+
+
+async def drain(session, base: str, clients, timeout: float, interval: float) -> tuple:
+    """
+    Tras detener el publicador, espera a que el hub vacíe sus colas y a que
+    ningún cliente reciba nada durante un intervalo de entrega (o timeout s).
+    Retorna (stats finales del servidor, si se vació a tiempo).
+    """
+    deadline = time.perf_counter() + timeout
+    previous = None
+    while True:
+        await asyncio.sleep(interval)
+        final = await http(session, "GET", base, "/bench/stats")
+        received = sum(c.received for c in clients)
+        if final["queued"] == 0 and received == previous:
+            return final, True
+        if time.perf_counter() >= deadline:
+            return final, False
+        previous = received
+
+
+def percentile(values, p: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def summarize(clients) -> dict:
+    latencies = [v for c in clients for v in c.latencies_ms]
+    received = sum(c.received for c in clients)
+    missed = sum(c.missed for c in clients)
+    return {
+        "clients": len(clients),
+        "received": received,
+        "missed": missed,
+        "missed_ratio": round(missed / (received + missed), 4) if received + missed else 0,
+        "pending": sum(c.pending for c in clients),
+        "evicted": sum(c.evicted for c in clients),
+        "reconnects": sum(c.reconnects for c in clients),
+        "errors": sum(c.errors for c in clients),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies) if latencies else None,
+    }
+
+
+def plan_clients(args):
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    rng = random.Random(args.seed)
+    n_slow = int(round(args.clients * args.slow_ratio))
+    n_churn = int(round(args.clients * args.churn_ratio))
+    kinds = ["slow"] * n_slow + ["churn"] * n_churn + ["normal"] * max(0, args.clients - n_slow - n_churn)
+    rng.shuffle(kinds)
+    return [
+        ClientStats(i, SENSORS[i % len(SENSORS)], endpoints[(i // len(SENSORS)) % len(endpoints)], kind)
+        for i, kind in enumerate(kinds[:args.clients])
+    ]
+
+
+async def run(args) -> dict:
+    import aiohttp
+
+    server = None
+    base = args.server
+    if base is None:
+        base = f"127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(args.port),
+             "--rate", str(args.rate), "--seed", str(args.seed)],
+            stdout=None if args.server_log else subprocess.DEVNULL,
+            stderr=None if args.server_log else subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            baseline = await wait_server(session, base)
+
+            clients = plan_clients(args)
+            stop = asyncio.Event()
+            tasks = []
+            connect_start = time.perf_counter()
+            for batch in range(0, len(clients), args.connect_batch):
+                events = []
+                for stats in clients[batch:batch + args.connect_batch]:
+                    ready = asyncio.Event()
+                    events.append(ready)
+                    tasks.append(asyncio.create_task(
+                        run_client(base, stats, args, ready, stop, random.Random(args.seed + stats.index))
+                    ))
+                await asyncio.gather(*(e.wait() for e in events))
+            connect_seconds = time.perf_counter() - connect_start
+            await asyncio.sleep(0.5)
+            connected = await wait_server(session, base)
+
+            await http(session, "POST", base, "/bench/start")
+            window_start = await http(session, "GET", base, "/bench/stats")
+            wall_start, client_cpu_start = time.perf_counter(), time.process_time()
+            await asyncio.sleep(args.duration)
+            window_end = await http(session, "GET", base, "/bench/stats")
+            wall = time.perf_counter() - wall_start
+            client_cpu = time.process_time() - client_cpu_start
+
+            await http(session, "POST", base, "/bench/stop")
+            # Intervalo de entrega: el más largo entre la tasa publicada y el cliente lento
+            interval = 1.5 * max(0.1, 1.0 / args.rate, args.slow_delay if args.slow_ratio else 0.0)
+            final, drained = await drain(session, base, clients, args.drain, interval)
+            published = final["published"]
+
+            # Lo que falta al final de un cliente conectado: pérdida si el hub ya vació
+            # sus colas; si no, sigue en vuelo (p. ej. clientes lentos) y se reporta aparte
+            for stats in clients:
+                if stats.connected and stats.last_id is not None:
+                    tail = max(0, published[stats.sensor] - stats.last_id)
+                    if drained:
+                        stats.missed += tail
+                    else:
+                        stats.pending += tail
+
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    n = len(clients)
+    cpu_s = window_end["cpu_s"] - window_start["cpu_s"]
+    rss_base, rss_connected, rss_end = baseline["rss_kb"], connected["rss_kb"], window_end["rss_kb"]
+    groups = {}
+    for stats in clients:
+        groups.setdefault(f"{stats.endpoint}/{stats.kind}", []).append(stats)
+    by_sensor = {s: summarize([c for c in clients if c.sensor == s]) for s in SENSORS}
+
+    return {
+        "config": vars(args),
+        "published": published,
+        "connect_seconds": round(connect_seconds, 3),
+        "window_seconds": round(wall, 3),
+        "drained": drained,
+        "overall": summarize(clients),
+        "groups": {name: summarize(members) for name, members in sorted(groups.items())},
+        "sensors": by_sensor,
+        "server": {
+            "cpu_percent": round(cpu_s / wall * 100, 1) if wall else None,
+            "cpu_ms_per_client_s": round(cpu_s * 1000 / wall / n, 3) if wall and n else None,
+            "rss_baseline_kb": rss_base,
+            "rss_connected_kb": rss_connected,
+            "rss_end_kb": rss_end,
+            "rss_per_client_kb": round((rss_connected - rss_base) / n, 1) if rss_base and rss_connected and n else None,
+            "rss_per_client_load_kb": round((rss_end - rss_base) / n, 1) if rss_base and rss_end and n else None,
+            "hub": final["hub"],
+        },
+        "client_cpu_percent": round(client_cpu / wall * 100, 1) if wall else None,
+    }
+
+
+def fmt_ms(value):
+    return f"{value:8.2f}" if value is not None else "     n/a"
+
+
+def fmt_kb(value):
+    return f"{value} KB" if value is not None else "n/a"
+
+
+def print_row(name: str, s: dict):
+    print(
+        f"  {name:<18}{s['clients']:>6}{s['received']:>10}{s['missed']:>8}{s['pending']:>7}{s['evicted']:>7}"
+        f"{fmt_ms(s['p50_ms'])} {fmt_ms(s['p95_ms'])} {fmt_ms(s['p99_ms'])} {fmt_ms(s['max_ms'])}"
+    )
+
+
+def print_report(result: dict):
+    server = result["server"]
+    hub = server["hub"]
+    print("\n" + "=" * 60)
+    print("📡 BENCHMARK DE FAN-OUT WEBSOCKET")
+    print("=" * 60)
+    print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    cfg = result["config"]
+    print(f"  👥 Clientes:      {cfg['clients']} (lentos {cfg['slow_ratio']:.0%}, churn {cfg['churn_ratio']:.0%}) "
+          f"en {cfg['endpoints']}")
+    print(f"  📤 Publicadas:    {result['published']} ({cfg['rate']:g} lecturas/s por sensor)")
+    print(f"  🔌 Conexión:      {result['connect_seconds']}s para abrir todos los clientes")
+    print(f"  ⏱️  Ventana:       {result['window_seconds']}s")
+    if not result["drained"]:
+        print(f"  ⚠️  Las colas no se vaciaron en --drain {cfg['drain']:g}s: lo pendiente va en 'vuelo', no en 'perdid'")
+
+    print(f"\n  {'grupo':<18}{'cli':>6}{'recibidos':>10}{'perdid':>8}{'vuelo':>7}{'expul':>7}"
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    print_row("total", result["overall"])
+    for name, summary in result["groups"].items():
+        print_row(name, summary)
+    for name, summary in result["sensors"].items():
+        print_row(name, summary)
+
+    print("\n🖥️  Servidor")
+    print(f"  CPU:              {server['cpu_percent']}% ({server['cpu_ms_per_client_s']} ms CPU/s por cliente)")
+    print(f"  RSS base:         {fmt_kb(server['rss_baseline_kb'])}")
+    print(f"  RSS conectados:   {fmt_kb(server['rss_connected_kb'])} "
+          f"({server['rss_per_client_kb']} KB/cliente en reposo)")
+    print(f"  RSS bajo carga:   {fmt_kb(server['rss_end_kb'])} "
+          f"({server['rss_per_client_load_kb']} KB/cliente)")
+    print(f"  Hub:              entregados {hub['delivered']}, descartados {hub['dropped']}, "
+          f"expulsados {hub['evicted']}")
+    print(f"\n💻 CPU clientes:    {result['client_cpu_percent']}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de fan-out WebSocket con clientes simulados")
+    parser.add_argument("--clients", type=int, default=200, help="Clientes WebSocket simulados")
+    parser.add_argument("--rate", type=float, default=10.0, help="Lecturas/s publicadas por cada sensor")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de la ventana de medición")
+    parser.add_argument("--endpoints", default="legacy,hub",
+                        help="Sockets a usar, separados por coma: legacy (/<sensor>/sensor/ws) y/o hub (/ws)")
+    parser.add_argument("--slow-ratio", type=float, default=0.05, help="Fracción de clientes lentos")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="Segundos que duerme un cliente lento por mensaje")
+    parser.add_argument("--churn-ratio", type=float, default=0.05, help="Fracción de clientes que se reconectan")
+    parser.add_argument("--churn-after", type=float, default=3.0, help="Segundos máximos conectado antes de reconectar")
+    parser.add_argument("--connect-batch", type=int, default=50, help="Clientes que se conectan a la vez")
+    parser.add_argument("--drain", type=float, default=5.0,
+                        help="Espera máxima a que se vacíen las colas tras detener el publicador (s)")
+    parser.add_argument("--server", default=None, help="host:puerto de un servidor --serve ya levantado")
+    parser.add_argument("--server-log", action="store_true", help="Mostrar la salida del servidor de prueba")
+    parser.add_argument("--serve", action="store_true", help="Solo levantar el servidor de prueba")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Imprimir resultado en JSON")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
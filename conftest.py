@@ -0,0 +1,4 @@
+# conftest.py
+# test_concurrency.py es un script manual contra un servidor en marcha
+# (python test_concurrency.py), no una suite de pytest.
+collect_ignore = ["test_concurrency.py"]
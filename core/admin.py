@@ -0,0 +1,16 @@
+# core/admin.py
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Protege los endpoints /admin con la cabecera X-Admin-Token cuando ADMIN_TOKEN
+    está definido. Sin ADMIN_TOKEN quedan abiertos, igual que el resto de la API local.
+    """
+    expected = os.getenv("ADMIN_TOKEN")
+    if expected and not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code=401, detail="Token de administración inválido")
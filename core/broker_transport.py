@@ -0,0 +1,272 @@
+# core/broker_transport.py
+"""
+Transportes AMQP inyectables para el pool de RabbitMQ.
+Patrón: Strategy - el pool publica contra una interfaz y no contra pika directamente.
+
+- PikaTransport: conexión real (BlockingConnection + publisher confirms)
+- InMemoryBrokerTransport: broker simulado en proceso, sin red, con latencia,
+  desconexiones y consumidores lentos configurables (benchmarks y pruebas)
+"""
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from threading import Thread, Event, Condition
+from typing import Optional
+
+import pika
+from pika.exceptions import AMQPConnectionError, NackError
+
+
+class BrokerTransport(ABC):
+    """
+    Interfaz mínima que usa RabbitMQPool.
+    `publish` debe bloquear hasta el ack del broker y lanzar excepciones de pika
+    (AMQPConnectionError, AMQPChannelError, NackError) ante fallos.
+    """
+
+    @abstractmethod
+    def connect(self) -> None: pass
+
+    @abstractmethod
+    def publish(self, exchange: str, routing_key: str, body: bytes) -> None: pass
+
+    @abstractmethod
+    def close(self) -> None: pass
+
+    @property
+    @abstractmethod
+    def is_open(self) -> bool: pass
+
+
+class PikaTransport(BrokerTransport):
+    """Transporte real sobre pika.BlockingConnection."""
+
+    def __init__(self, host: str, user: str, password: str, port: int = 5672):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.port = port
+        self._connection: Optional[pika.BlockingConnection] = None
+        self._channel = None
+
+    def connect(self) -> None:
+        credentials = pika.PlainCredentials(self.user, self.password)
+        self._connection = pika.BlockingConnection(
+            pika.ConnectionParameters(
+                host=self.host,
+                port=self.port,
+                credentials=credentials,
+                heartbeat=60,
+                blocked_connection_timeout=30
+            )
+        )
+        self._channel = self._connection.channel()
+        self._channel.exchange_declare(
+            exchange="amq.topic",
+            exchange_type="topic",
+            durable=True
+        )
+        # Publisher confirms: basic_publish espera el ack del broker,
+        # lo que permite medir la latencia real encolado -> ack
+        self._channel.confirm_delivery()
+
+    def publish(self, exchange: str, routing_key: str, body: bytes) -> None:
+        self._channel.basic_publish(
+            exchange=exchange,
+            routing_key=routing_key,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=1  # No persistente (más rápido para sensores)
+            )
+        )
+
+    def close(self) -> None:
+        try:
+            if self._channel and self._channel.is_open:
+                self._channel.close()
+        except Exception:
+            pass
+        try:
+            if self._connection and self._connection.is_open:
+                self._connection.close()
+        except Exception:
+            pass
+        self._channel = None
+        self._connection = None
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._connection and self._connection.is_open)
+
+
+class InMemoryBrokerTransport(BrokerTransport):
+    """
+    Broker AMQP simulado en memoria.
+
+    Args:
+        latency_ms: Latencia base del ack por mensaje
+        jitter_ms: Variación aleatoria (uniforme) sumada a la latencia
+        disconnect_probability: Probabilidad de perder la conexión en cada publish
+        connect_failures: Número de intentos de conexión que fallarán al inicio
+        consumer_rate: Mensajes/segundo que consume el cliente final (None = instantáneo)
+        consumer_capacity: Mensajes que caben en la cola del broker antes de
+            bloquear al publisher (flow control, como connection.blocked)
+        blocked_timeout: Segundos bloqueado antes de cortar la conexión
+        nack_probability: Probabilidad de que el broker responda con nack
+        seed: Semilla para reproducibilidad
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        disconnect_probability: float = 0.0,
+        connect_failures: int = 0,
+        consumer_rate: Optional[float] = None,
+        consumer_capacity: int = 10000,
+        blocked_timeout: float = 30.0,
+        nack_probability: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.disconnect_probability = disconnect_probability
+        self.consumer_rate = consumer_rate
+        self.consumer_capacity = consumer_capacity
+        self.blocked_timeout = blocked_timeout
+        self.nack_probability = nack_probability
+        self._connect_failures_left = connect_failures
+        self._random = random.Random(seed)
+        self._open = False
+        self._broker_queue: deque = deque()
+        self._cond = Condition()
+        self._consumer_thread: Optional[Thread] = None
+        self._stop = Event()
+        # Estadísticas del lado del broker
+        self.connects = 0
+        self.disconnects = 0
+        self.received = 0
+        self.consumed = 0
+        self.received_by_key: dict = {}
+
+    def connect(self) -> None:
+        if self._connect_failures_left > 0:
+            self._connect_failures_left -= 1
+            raise AMQPConnectionError("Broker simulado: conexión rechazada")
+        self._open = True
+        self.connects += 1
+        if self.consumer_rate and (self._consumer_thread is None or not self._consumer_thread.is_alive()):
+            self._stop.clear()
+            self._consumer_thread = Thread(
+                target=self._consumer_loop,
+                name="fake-amqp-consumer",
+                daemon=True
+            )
+            self._consumer_thread.start()
+
+    def publish(self, exchange: str, routing_key: str, body: bytes) -> None:
+        if not self._open:
+            raise AMQPConnectionError("Broker simulado: conexión cerrada")
+
+        if self.disconnect_probability and self._random.random() < self.disconnect_probability:
+            self._open = False
+            self.disconnects += 1
+            raise AMQPConnectionError("Broker simulado: conexión perdida")
+
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        # El nack se decide antes de encolar: un mensaje rechazado nunca llega a la cola del broker
+        nacked = bool(self.nack_probability) and self._random.random() < self.nack_probability
+
+        if self.consumer_rate:
+            with self._cond:
+                # Flow control: el publisher queda bloqueado mientras la cola esté llena
+                if not self._cond.wait_for(
+                    lambda: len(self._broker_queue) < self.consumer_capacity or not self._open,
+                    timeout=self.blocked_timeout
+                ):
+                    self._open = False
+                    self.disconnects += 1
+                    raise AMQPConnectionError("Broker simulado: timeout de conexión bloqueada")
+                if not self._open:
+                    raise AMQPConnectionError("Broker simulado: conexión cerrada")
+                if not nacked:
+                    self._broker_queue.append((routing_key, len(body)))
+                    self._cond.notify_all()
+
+        if nacked:
+            raise NackError([])
+
+        self.received += 1
+        self.received_by_key[routing_key] = self.received_by_key.get(routing_key, 0) + 1
+
+    def _consumer_loop(self):
+        """Consumidor lento: drena la cola del broker a `consumer_rate` msg/s."""
+        interval = 1.0 / self.consumer_rate
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            with self._cond:
+                if not self._cond.wait_for(lambda: self._broker_queue or self._stop.is_set(), timeout=0.5):
+                    continue
+                if self._stop.is_set():
+                    break
+                self._broker_queue.popleft()
+                self.consumed += 1
+                self._cond.notify_all()
+            next_tick += interval
+            sleep_for = next_tick - time.perf_counter()
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+            else:
+                next_tick = time.perf_counter()
+
+    def close(self) -> None:
+        self._open = False
+        with self._cond:
+            self._cond.notify_all()
+
+    def shutdown(self) -> None:
+        """Detiene también el consumidor simulado."""
+        self.close()
+        self._stop.set()
+        if self._consumer_thread and self._consumer_thread.is_alive():
+            self._consumer_thread.join(timeout=2)
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    @property
+    def backlog(self) -> int:
+        """Mensajes pendientes de consumir en el broker."""
+        return len(self._broker_queue)
+
+    def get_stats(self) -> dict:
+        return {
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "received": self.received,
+            "consumed": self.consumed,
+            "backlog": self.backlog,
+            "received_by_key": dict(self.received_by_key),
+        }
+
+
+def create_transport(
+    kind: Optional[str],
+    host: str,
+    user: str,
+    password: str,
+    port: int = 5672
+) -> BrokerTransport:
+    """
+    Crea el transporte según configuración (RABBITMQ_TRANSPORT).
+    "memory" usa el broker simulado; cualquier otro valor usa pika.
+    """
+    if (kind or "").lower() == "memory":
+        print("🧪 RabbitMQ: usando broker simulado en memoria")
+        return InMemoryBrokerTransport()
+    return PikaTransport(host, user, password, port)
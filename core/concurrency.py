@@ -242,6 +242,7 @@ RATE_LIMITERS = {
     "tfluna": RateLimiter(rate=20, capacity=30),
     "mpu6050": RateLimiter(rate=20, capacity=30),
     "hcsr04": RateLimiter(rate=20, capacity=30),
+    "snapshot": RateLimiter(rate=5, capacity=10),  # Cada snapshot lee los cuatro sensores
 }
 
 
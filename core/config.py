@@ -1,6 +1,7 @@
 # core/config.py
 import os
 from dotenv import load_dotenv
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
@@ -20,13 +21,33 @@ def get_remote_engine():
     engine = create_async_engine(pg_uri, echo=False)
     return sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+def add_missing_columns(conn, metadata):
+    """
+    create_all no altera tablas existentes: agrega las columnas nullable nuevas
+    de los modelos a las BDs ya creadas (usar con conn.run_sync).
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+            print(f"🛠️ Columna agregada: {table.name}.{column.name}")
+
 def get_rabbitmq_config():
     return {
         "host": os.getenv("RABBITMQ_HOST"),
         "user": os.getenv("RABBITMQ_USER"),
         "pass": os.getenv("RABBITMQ_PASS"),
+        "transport": os.getenv("RABBITMQ_TRANSPORT", "pika"),  # "memory" = broker simulado
         "routing_key": os.getenv("ROUTING_KEY_TF"),
         "routing_key_imx": os.getenv("ROUTING_KEY_IMX477"),
         "routing_key_mpu": os.getenv("ROUTING_KEY_MPU6050"),
         "routing_key_hc": os.getenv("ROUTING_KEY_HC"),
+        "routing_key_snapshot": os.getenv("ROUTING_KEY_SNAPSHOT"),  # Snapshot multi-sensor (un mensaje)
     }
\ No newline at end of file
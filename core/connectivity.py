@@ -2,11 +2,14 @@
 """
 Módulo de conectividad con caché para evitar múltiples verificaciones.
 Patrón: Singleton con caché temporal + async
+
+ConnectivityMonitor publica las transiciones online/offline a suscriptores.
 """
 import asyncio
+import inspect
 import socket
 import time
-from typing import Optional
+from typing import Any, Awaitable, Callable, List, Optional
 from concurrent.futures import ThreadPoolExecutor
 
 class ConnectivityManager:
@@ -121,4 +124,101 @@ def is_connected_sync(host: str = "8.8.8.8", port: int = 53, timeout: float = 3)
         sock.close()
         return True
     except Exception:
-        return False
\ No newline at end of file
+        return False
+
+class ConnectivityMonitor:
+    """
+    Monitor central de conectividad basado en eventos.
+    Patrón: Observer - un único sondeo periódico notifica las transiciones
+    online/offline a los suscriptores, que ya no necesitan consultar la red.
+
+    Los callbacks reciben el nuevo estado (bool) y pueden ser síncronos o async.
+    """
+
+    def __init__(self, probe: Optional[Callable[[], Awaitable[bool]]] = None, interval: float = 10.0):
+        self._probe = probe
+        self.interval = interval
+        self._state: Optional[bool] = None  # None = aún sin sondear
+        self._subscribers: List[Callable[[bool], Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.last_change: Optional[float] = None
+        self.transitions = 0
+
+    @property
+    def state(self) -> Optional[bool]:
+        """Último estado conocido (None si todavía no se ha sondeado)."""
+        return self._state
+
+    @property
+    def is_online(self) -> bool:
+        """Estado cacheado, sin sondear (no bloqueante)."""
+        return bool(self._state)
+
+    def subscribe(self, callback: Callable[[bool], Any]) -> Callable[[], None]:
+        """Registra un callback de transición. Retorna la función para desuscribirse."""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    async def check_now(self) -> bool:
+        """Sondea una vez y notifica si hubo transición."""
+        probe = self._probe or get_connectivity_manager().force_check
+        try:
+            online = bool(await probe())
+        except Exception:
+            online = False
+        await self._set_state(online)
+        return online
+
+    async def _set_state(self, online: bool) -> None:
+        previous = self._state
+        self._state = online
+        if previous == online:
+            return
+        # El primer sondeo también se notifica para que los suscriptores partan del estado real
+        if previous is not None:
+            self.transitions += 1
+        self.last_change = time.time()
+        print(f"🌐 Conectividad: {'✅ Online' if online else '❌ Offline'}")
+        for callback in self._subscribers[:]:
+            try:
+                result = callback(online)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"❌ Error en suscriptor de conectividad: {e}")
+
+    async def _run(self):
+        while True:
+            await self.check_now()
+            await asyncio.sleep(self.interval)
+
+    def start(self, probe: Optional[Callable[[], Awaitable[bool]]] = None, interval: Optional[float] = None) -> None:
+        """Arranca el sondeo periódico en el event loop actual."""
+        if probe is not None:
+            self._probe = probe
+        if interval is not None:
+            self.interval = interval
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="connectivity-monitor")
+
+    def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def get_status(self) -> dict:
+        return {
+            "online": self._state,
+            "interval_s": self.interval,
+            "transitions": self.transitions,
+            "last_change": self.last_change,
+            "subscribers": len(self._subscribers),
+        }
+
+
+# Monitor global
+connectivity_monitor = ConnectivityMonitor()
@@ -0,0 +1,105 @@
+# core/metrics.py
+"""
+Primitivas de métricas thread-safe para instrumentar componentes internos.
+Implementa:
+- Contadores agrupados por etiqueta (ej. routing key, motivo de descarte)
+- Histograma de latencias con buckets fijos y percentiles aproximados
+
+Se usan desde threads de fondo (publisher de RabbitMQ) y se leen
+desde el endpoint /metrics, por eso todas las operaciones toman un lock.
+"""
+import bisect
+from threading import Lock
+from typing import Dict, List, Optional
+
+# Buckets en milisegundos (límite superior inclusivo). El último bucket es +Inf.
+DEFAULT_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Histograma de latencias con buckets fijos (en milisegundos)."""
+
+    def __init__(self, buckets_ms=DEFAULT_LATENCY_BUCKETS_MS):
+        self._bounds: List[float] = sorted(float(b) for b in buckets_ms)
+        self._counts: List[int] = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = Lock()
+
+    def observe(self, value_ms: float):
+        """Registra una observación en milisegundos."""
+        index = bisect.bisect_left(self._bounds, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum_ms += value_ms
+            if value_ms > self._max_ms:
+                self._max_ms = value_ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Percentil aproximado (interpolación lineal dentro del bucket).
+        Retorna None si no hay observaciones.
+        """
+        with self._lock:
+            return self._percentile_locked(q)
+
+    def _percentile_locked(self, q: float) -> Optional[float]:
+        if self._count == 0:
+            return None
+        target = q * self._count
+        cumulative = 0
+        for i, bucket_count in enumerate(self._counts):
+            if bucket_count == 0:
+                continue
+            if cumulative + bucket_count >= target:
+                lower = self._bounds[i - 1] if i > 0 else 0.0
+                upper = self._bounds[i] if i < len(self._bounds) else self._max_ms
+                fraction = (target - cumulative) / bucket_count
+                return round(min(lower + (upper - lower) * fraction, self._max_ms), 3)
+            cumulative += bucket_count
+        return round(self._max_ms, 3)
+
+    def snapshot(self) -> dict:
+        """Estado serializable del histograma."""
+        with self._lock:
+            buckets = {
+                f"le_{int(b) if b.is_integer() else b}": c
+                for b, c in zip(self._bounds, self._counts)
+            }
+            buckets["le_inf"] = self._counts[-1]
+            return {
+                "count": self._count,
+                "sum_ms": round(self._sum_ms, 3),
+                "avg_ms": round(self._sum_ms / self._count, 3) if self._count else None,
+                "max_ms": round(self._max_ms, 3),
+                "p50_ms": self._percentile_locked(0.50),
+                "p95_ms": self._percentile_locked(0.95),
+                "p99_ms": self._percentile_locked(0.99),
+                "buckets": buckets,
+            }
+
+
+class LabeledCounter:
+    """Contador agrupado por etiqueta (ej. {"queue_full": 3, "no_connection": 1})."""
+
+    def __init__(self):
+        self._values: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def inc(self, label: str, amount: int = 1):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def get(self, label: str) -> int:
+        with self._lock:
+            return self._values.get(label, 0)
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._values.values())
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
@@ -4,23 +4,229 @@ Pool de conexiones RabbitMQ con publicación no bloqueante.
 Patrón: Connection Pool + Producer/Consumer con Queue interna
 """
 import asyncio
-import json
-import pika
-from pika.exceptions import AMQPConnectionError, AMQPChannelError
+from pika.exceptions import AMQPConnectionError, AMQPChannelError, NackError
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Any, Dict
-from dataclasses import dataclass
-from queue import Queue, Empty
-from threading import Thread, Event
+from typing import Optional, Any, Dict, Tuple
+from dataclasses import dataclass, field
+from collections import deque
+from threading import Thread, Event, Lock, Condition
 import time
+from core.metrics import LatencyHistogram, LabeledCounter
+from core.broker_transport import BrokerTransport, PikaTransport
+from core.serialization import to_bytes
+
+# Carriles de prioridad (orden = prioridad de drenado)
+LANE_CONTROL = "control"      # Eventos de control (delete, delete_by_id)
+LANE_EVENT = "event"          # Mediciones disparadas por el usuario (event=True)
+LANE_TELEMETRY = "telemetry"  # Lecturas periódicas de fondo (event=False)
+
+DROP_NEWEST = "drop_newest"   # Cola llena: se rechaza el mensaje nuevo
+DROP_OLDEST = "drop_oldest"   # Cola llena: se descarta el mensaje más antiguo
 
 
 @dataclass
 class PublishMessage:
     """Mensaje para publicar en la cola."""
     routing_key: str
-    body: dict
+    body: Any  # dict o bytes JSON ya codificados (core.serialization)
     exchange: str = "amq.topic"
+    lane: str = LANE_TELEMETRY
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class LaneConfig:
+    """Configuración de un carril de publicación."""
+    capacity: int
+    weight: int
+    drop_policy: str = DROP_NEWEST
+
+
+# Control y eventos conservan lo ya encolado (orden FIFO intacto);
+# la telemetría prefiere lo más reciente y descarta lecturas viejas.
+DEFAULT_LANES: Dict[str, LaneConfig] = {
+    LANE_CONTROL: LaneConfig(capacity=200, weight=8, drop_policy=DROP_NEWEST),
+    LANE_EVENT: LaneConfig(capacity=500, weight=4, drop_policy=DROP_NEWEST),
+    LANE_TELEMETRY: LaneConfig(capacity=1000, weight=1, drop_policy=DROP_OLDEST),
+}
+
+
+def lane_for_sensor(sensor) -> str:
+    """
+    Asigna el carril según la entidad publicada:
+    - `_action` (delete, delete_by_id) -> control
+    - event=True -> event
+    - resto -> telemetry
+    """
+    if sensor.__dict__.get("_action"):
+        return LANE_CONTROL
+    if getattr(sensor, "event", False):
+        return LANE_EVENT
+    return LANE_TELEMETRY
+
+
+class PriorityLanes:
+    """
+    Cola multi-carril con drenado ponderado (weighted round-robin).
+    En cada ronda se toman hasta `weight` mensajes de cada carril, en orden
+    de prioridad, de modo que la telemetría nunca bloquea a los eventos pero
+    tampoco queda totalmente sin servicio.
+    """
+
+    def __init__(self, lanes: Dict[str, LaneConfig]):
+        self._configs = dict(lanes)
+        self._order = list(lanes.keys())
+        self._queues: Dict[str, deque] = {name: deque() for name in self._order}
+        self._credits: Dict[str, int] = {name: cfg.weight for name, cfg in lanes.items()}
+        self._cond = Condition()
+        self._size = 0
+
+    def put(self, lane: str, msg: 'PublishMessage') -> Tuple[bool, Optional['PublishMessage']]:
+        """
+        Encola un mensaje en su carril según la política de descarte.
+        Retorna (aceptado, mensaje_desalojado).
+        """
+        config = self._configs[lane]
+        queue = self._queues[lane]
+        with self._cond:
+            evicted = None
+            if len(queue) >= config.capacity:
+                if config.drop_policy == DROP_OLDEST:
+                    evicted = queue.popleft()
+                    self._size -= 1
+                else:
+                    return False, None
+            queue.append(msg)
+            self._size += 1
+            self._cond.notify()
+            return True, evicted
+
+    def get(self, timeout: float) -> Optional['PublishMessage']:
+        """Obtiene el siguiente mensaje respetando los pesos. None si hay timeout."""
+        with self._cond:
+            if self._size == 0 and not self._cond.wait_for(lambda: self._size > 0, timeout):
+                return None
+            for _ in range(2):
+                for name in self._order:
+                    if self._queues[name] and self._credits[name] > 0:
+                        self._credits[name] -= 1
+                        self._size -= 1
+                        return self._queues[name].popleft()
+                # Ronda agotada: recargar créditos
+                for name, cfg in self._configs.items():
+                    self._credits[name] = cfg.weight
+            return None
+
+    def qsize(self, lane: Optional[str] = None) -> int:
+        with self._cond:
+            if lane is None:
+                return self._size
+            return len(self._queues[lane])
+
+    @property
+    def capacity(self) -> int:
+        return sum(cfg.capacity for cfg in self._configs.values())
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                name: {
+                    "size": len(self._queues[name]),
+                    "capacity": cfg.capacity,
+                    "weight": cfg.weight,
+                    "drop_policy": cfg.drop_policy,
+                }
+                for name, cfg in self._configs.items()
+            }
+
+
+class PublisherMetrics:
+    """
+    Métricas del publisher por routing key.
+    - enqueued: mensajes aceptados en la cola interna
+    - published: mensajes confirmados por el broker (ack)
+    - dropped: mensajes descartados, agrupados por motivo
+    - latency: tiempo desde el encolado hasta el ack del broker
+    """
+
+    def __init__(self):
+        self.enqueued = LabeledCounter()
+        self.published = LabeledCounter()
+        self.lane_enqueued = LabeledCounter()
+        self.lane_dropped = LabeledCounter()
+        self.reconnects = 0
+        self.latency = LatencyHistogram()
+        self._dropped: Dict[str, LabeledCounter] = {}
+        self._latency_by_key: Dict[str, LatencyHistogram] = {}
+        self._latency_by_lane: Dict[str, LatencyHistogram] = {}
+        self._lock = Lock()
+
+    def record_enqueued(self, routing_key: str, lane: str = LANE_TELEMETRY):
+        self.enqueued.inc(str(routing_key))
+        self.lane_enqueued.inc(lane)
+
+    def record_dropped(self, routing_key: str, reason: str, lane: str = LANE_TELEMETRY):
+        key = str(routing_key)
+        self.lane_dropped.inc(lane)
+        with self._lock:
+            counter = self._dropped.get(key)
+            if counter is None:
+                counter = self._dropped[key] = LabeledCounter()
+        counter.inc(reason)
+
+    def record_published(self, msg: PublishMessage):
+        key = str(msg.routing_key)
+        latency_ms = (time.monotonic() - msg.enqueued_at) * 1000
+        with self._lock:
+            histogram = self._latency_by_key.get(key)
+            if histogram is None:
+                histogram = self._latency_by_key[key] = LatencyHistogram()
+            lane_histogram = self._latency_by_lane.get(msg.lane)
+            if lane_histogram is None:
+                lane_histogram = self._latency_by_lane[msg.lane] = LatencyHistogram()
+        self.published.inc(key)
+        histogram.observe(latency_ms)
+        lane_histogram.observe(latency_ms)
+        self.latency.observe(latency_ms)
+
+    def record_reconnect(self):
+        with self._lock:
+            self.reconnects += 1
+
+    def snapshot(self) -> dict:
+        enqueued = self.enqueued.snapshot()
+        published = self.published.snapshot()
+        with self._lock:
+            dropped = {k: c.snapshot() for k, c in self._dropped.items()}
+            latencies = dict(self._latency_by_key)
+            lane_latencies = dict(self._latency_by_lane)
+            reconnects = self.reconnects
+
+        routing_keys = {}
+        for key in set(enqueued) | set(published) | set(dropped):
+            routing_keys[key] = {
+                "enqueued": enqueued.get(key, 0),
+                "published": published.get(key, 0),
+                "dropped": dropped.get(key, {}),
+                "dropped_total": sum(dropped.get(key, {}).values()),
+                "latency_ms": latencies[key].snapshot() if key in latencies else None,
+            }
+
+        return {
+            "totals": {
+                "enqueued": sum(enqueued.values()),
+                "published": sum(published.values()),
+                "dropped": sum(sum(d.values()) for d in dropped.values()),
+                "reconnects": reconnects,
+            },
+            "latency_ms": self.latency.snapshot(),
+            "lanes": {
+                "enqueued": self.lane_enqueued.snapshot(),
+                "dropped": self.lane_dropped.snapshot(),
+                "latency_ms": {lane: h.snapshot() for lane, h in lane_latencies.items()},
+            },
+            "routing_keys": routing_keys,
+        }
 
 
 class RabbitMQPool:
@@ -29,9 +235,10 @@ class RabbitMQPool:
     
     Características:
     - Conexión persistente (no abre/cierra por cada mensaje)
-    - Cola interna para publicación no bloqueante
+    - Cola interna multi-carril (control > event > telemetry) no bloqueante
     - Reconexión automática
     - Thread dedicado para publicación
+    - Transporte inyectable (pika real o broker simulado en memoria)
     """
     _instance: Optional['RabbitMQPool'] = None
     
@@ -46,7 +253,10 @@ class RabbitMQPool:
         host: str = "localhost",
         user: str = "guest",
         password: str = "guest",
-        port: int = 5672
+        port: int = 5672,
+        lanes: Optional[Dict[str, LaneConfig]] = None,
+        transport: Optional[BrokerTransport] = None,
+        reconnect_delay: float = 5
     ):
         if self._initialized:
             return
@@ -57,36 +267,25 @@ class RabbitMQPool:
         self.password = password
         self.port = port
         
-        self._connection: Optional[pika.BlockingConnection] = None
-        self._channel: Optional[pika.channel.Channel] = None
-        self._message_queue: Queue[PublishMessage] = Queue(maxsize=1000)
+        self._transport = transport or PikaTransport(host, user, password, port)
+        self._message_queue = PriorityLanes(lanes or DEFAULT_LANES)
         self._stop_event = Event()
         self._publisher_thread: Optional[Thread] = None
         self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rabbitmq")
         self._is_connected = False
-        self._reconnect_delay = 5  # segundos entre intentos de reconexión
+        self._reconnect_delay = reconnect_delay  # segundos entre intentos de reconexión
         self._last_reconnect_attempt = 0
+        self._has_connected_before = False
+        self.metrics = PublisherMetrics()
     
     def _connect(self) -> bool:
-        """Establece conexión con RabbitMQ."""
+        """Establece conexión con RabbitMQ a través del transporte."""
         try:
-            credentials = pika.PlainCredentials(self.user, self.password)
-            self._connection = pika.BlockingConnection(
-                pika.ConnectionParameters(
-                    host=self.host,
-                    port=self.port,
-                    credentials=credentials,
-                    heartbeat=60,
-                    blocked_connection_timeout=30
-                )
-            )
-            self._channel = self._connection.channel()
-            self._channel.exchange_declare(
-                exchange="amq.topic",
-                exchange_type="topic",
-                durable=True
-            )
+            self._transport.connect()
             self._is_connected = True
+            if self._has_connected_before:
+                self.metrics.record_reconnect()
+            self._has_connected_before = True
             print("[RabbitMQ] Conexión establecida")
             return True
         except Exception as e:
@@ -107,17 +306,9 @@ class RabbitMQPool:
     def _close_connection(self):
         """Cierra la conexión de forma segura."""
         try:
-            if self._channel and self._channel.is_open:
-                self._channel.close()
-        except Exception:
-            pass
-        try:
-            if self._connection and self._connection.is_open:
-                self._connection.close()
+            self._transport.close()
         except Exception:
             pass
-        self._channel = None
-        self._connection = None
         self._is_connected = False
     
     def _publisher_loop(self):
@@ -127,35 +318,32 @@ class RabbitMQPool:
         while not self._stop_event.is_set():
             try:
                 # Obtener mensaje de la cola (timeout para poder verificar stop_event)
-                try:
-                    msg = self._message_queue.get(timeout=0.5)
-                except Empty:
+                msg = self._message_queue.get(timeout=0.5)
+                if msg is None:
                     continue
                 
                 # Verificar/establecer conexión
                 if not self._is_connected:
                     if not self._reconnect():
                         # No pudimos conectar, descartar mensaje o re-encolar
-                        # Por ahora lo descartamos con log
-                        print(f"[RabbitMQ] Mensaje descartado (sin conexión): {msg.routing_key}")
+                        # Por ahora lo descartamos (queda registrado en métricas)
+                        self.metrics.record_dropped(msg.routing_key, "no_connection", msg.lane)
                         continue
                 
                 # Publicar mensaje
                 try:
-                    body = json.dumps(msg.body, default=str)
-                    self._channel.basic_publish(
-                        exchange=msg.exchange,
-                        routing_key=msg.routing_key,
-                        body=body,
-                        properties=pika.BasicProperties(
-                            delivery_mode=1  # No persistente (más rápido para sensores)
-                        )
-                    )
+                    body = to_bytes(msg.body)
+                    self._transport.publish(msg.exchange, msg.routing_key, body)
+                    self.metrics.record_published(msg)
+                except NackError:
+                    self.metrics.record_dropped(msg.routing_key, "nack", msg.lane)
                 except (AMQPConnectionError, AMQPChannelError) as e:
                     print(f"[RabbitMQ] Error de conexión al publicar: {e}")
+                    self.metrics.record_dropped(msg.routing_key, "connection_error", msg.lane)
                     self._is_connected = False
                 except Exception as e:
                     print(f"[RabbitMQ] Error al publicar: {e}")
+                    self.metrics.record_dropped(msg.routing_key, "publish_error", msg.lane)
                     
             except Exception as e:
                 print(f"[RabbitMQ] Error en publisher loop: {e}")
@@ -180,24 +368,43 @@ class RabbitMQPool:
         if self._publisher_thread and self._publisher_thread.is_alive():
             self._publisher_thread.join(timeout=5)
     
-    def publish(self, routing_key: str, body: dict, exchange: str = "amq.topic"):
+    def publish(
+        self,
+        routing_key: str,
+        body: Any,
+        exchange: str = "amq.topic",
+        lane: str = LANE_TELEMETRY
+    ):
         """
-        Encola un mensaje para publicación (no bloqueante).
+        Encola un mensaje para publicación (no bloqueante) en el carril indicado.
         """
         try:
-            msg = PublishMessage(routing_key=routing_key, body=body, exchange=exchange)
-            self._message_queue.put_nowait(msg)
+            msg = PublishMessage(routing_key=routing_key, body=body, exchange=exchange, lane=lane)
+            accepted, evicted = self._message_queue.put(lane, msg)
+            if not accepted:
+                self.metrics.record_dropped(routing_key, "queue_full", lane)
+                return
+            self.metrics.record_enqueued(routing_key, lane)
+            if evicted is not None:
+                self.metrics.record_dropped(evicted.routing_key, "evicted_oldest", lane)
         except Exception as e:
-            print(f"[RabbitMQ] Cola llena, mensaje descartado: {e}")
+            print(f"[RabbitMQ] Error al encolar mensaje: {e}")
+            self.metrics.record_dropped(routing_key, "enqueue_error", lane)
     
-    async def publish_async(self, routing_key: str, body: dict, exchange: str = "amq.topic"):
+    async def publish_async(
+        self,
+        routing_key: str,
+        body: Any,
+        exchange: str = "amq.topic",
+        lane: str = LANE_TELEMETRY
+    ):
         """
         Versión async de publish (usa run_in_executor para no bloquear).
         """
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(
             self._executor,
-            lambda: self.publish(routing_key, body, exchange)
+            lambda: self.publish(routing_key, body, exchange, lane)
         )
     
     @property
@@ -210,6 +417,16 @@ class RabbitMQPool:
         """Tamaño actual de la cola de mensajes."""
         return self._message_queue.qsize()
 
+    def get_metrics(self) -> dict:
+        """Métricas del publisher para el endpoint /metrics."""
+        return {
+            "connected": self._is_connected,
+            "queue_size": self._message_queue.qsize(),
+            "queue_capacity": self._message_queue.capacity,
+            "lane_queues": self._message_queue.snapshot(),
+            **self.metrics.snapshot(),
+        }
+
 
 # Singleton global
 _pool: Optional[RabbitMQPool] = None
@@ -218,17 +435,18 @@ def get_rabbitmq_pool(
     host: str = "localhost",
     user: str = "guest", 
     password: str = "guest",
-    port: int = 5672
+    port: int = 5672,
+    **kwargs
 ) -> RabbitMQPool:
-    """Obtiene o crea el pool de conexiones RabbitMQ."""
+    """Obtiene o crea el pool de conexiones RabbitMQ (kwargs: lanes, transport, reconnect_delay)."""
     global _pool
     if _pool is None:
-        _pool = RabbitMQPool(host, user, password, port)
+        _pool = RabbitMQPool(host, user, password, port, **kwargs)
     return _pool
 
-def init_rabbitmq_pool(host: str, user: str, password: str, port: int = 5672):
+def init_rabbitmq_pool(host: str, user: str, password: str, port: int = 5672, **kwargs):
     """Inicializa y arranca el pool de RabbitMQ."""
-    pool = get_rabbitmq_pool(host, user, password, port)
+    pool = get_rabbitmq_pool(host, user, password, port, **kwargs)
     pool.start()
     return pool
 
@@ -237,3 +455,10 @@ def stop_rabbitmq_pool():
     global _pool
     if _pool:
         _pool.stop()
+
+def reset_rabbitmq_pool():
+    """Detiene y descarta el singleton (benchmarks y pruebas con otro transporte)."""
+    global _pool
+    stop_rabbitmq_pool()
+    _pool = None
+    RabbitMQPool._instance = None
@@ -0,0 +1,78 @@
+# core/ring_buffer.py
+"""
+Buffer circular de tamaño fijo con número de secuencia monotónico.
+
+Cada elemento recibe un seq creciente (1, 2, 3, ...) que no se reinicia al
+sobrescribirse el buffer, así los consumidores pueden pedir "todo después de
+seq X" (backfill de WebSocket, reanudación SSE con Last-Event-ID) y saber si
+se perdieron elementos por desbordamiento.
+Es seguro entre hilos (lectores de sensores) y el event loop.
+"""
+from collections import deque
+from threading import Lock
+from typing import Deque, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("La capacidad del buffer debe ser positiva")
+        self.capacity = capacity
+        self._items: Deque[Tuple[int, T]] = deque(maxlen=capacity)
+        self._seq = 0
+        self._lock = Lock()
+
+    def append(self, item: T) -> int:
+        """Agrega un elemento (sobrescribe el más viejo si está lleno). Retorna su seq."""
+        with self._lock:
+            self._seq += 1
+            self._items.append((self._seq, item))
+            return self._seq
+
+    def latest(self, n: Optional[int] = None) -> List[Tuple[int, T]]:
+        """Los últimos n elementos (todos si n es None), del más viejo al más nuevo."""
+        with self._lock:
+            if n is None or n >= len(self._items):
+                return list(self._items)
+            if n <= 0:
+                return []
+            return list(self._items)[-n:]
+
+    def since(self, seq: int) -> Tuple[List[Tuple[int, T]], bool]:
+        """
+        Elementos con seq > `seq`.
+        Retorna (elementos, completo); completo=False si alguno ya se sobrescribió.
+        """
+        with self._lock:
+            if not self._items or seq >= self._seq:
+                return [], seq <= self._seq
+            oldest = self._items[0][0]
+            complete = seq >= oldest - 1
+            start = max(0, seq - oldest + 1)
+            items = list(self._items)[start:]
+            return items, complete
+
+    def last(self) -> Optional[Tuple[int, T]]:
+        with self._lock:
+            return self._items[-1] if self._items else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    @property
+    def oldest_seq(self) -> int:
+        with self._lock:
+            return self._items[0][0] if self._items else self._seq + 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def snapshot(self) -> dict:
+        return {"size": len(self._items), "capacity": self.capacity, "last_seq": self._seq}
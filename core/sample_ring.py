@@ -0,0 +1,112 @@
+# core/sample_ring.py
+"""
+Buffer circular sin locks para muestras de sensores (un escritor, N lectores).
+
+Pensado para hilos de adquisición que escriben a alta frecuencia mientras el
+event loop solo consulta la última muestra:
+- El escritor (un único hilo) guarda la muestra en su slot y luego publica el
+  contador; en CPython ambas asignaciones son atómicas, así que un lector
+  nunca ve un slot a medio escribir.
+- latest() es O(1) y no bloquea.
+- window(n) puede mezclar muestras de una vuelta anterior si el escritor
+  completa una vuelta entera mientras se copia (n cercano a la capacidad).
+
+Las muestras deben ser inmutables (tuplas / NamedTuple).
+ArrayRing es la variante NumPy para lotes: filas de floats escritas en bloque
+(p. ej. lotes decodificados de la FIFO del MPU6050).
+"""
+from typing import Generic, List, Optional, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+class SampleRing(Generic[T]):
+    __slots__ = ("capacity", "_slots", "_count")
+
+    def __init__(self, capacity: int = 1024):
+        if capacity <= 0:
+            raise ValueError("La capacidad del buffer debe ser positiva")
+        self.capacity = capacity
+        self._slots: List[Optional[T]] = [None] * capacity
+        self._count = 0
+
+    def push(self, sample: T) -> None:
+        """Solo desde el hilo escritor."""
+        count = self._count
+        self._slots[count % self.capacity] = sample
+        self._count = count + 1  # Publicar después de escribir el slot
+
+    def latest(self) -> Optional[T]:
+        count = self._count
+        return self._slots[(count - 1) % self.capacity] if count else None
+
+    def window(self, n: Optional[int] = None) -> List[T]:
+        """Las últimas n muestras (todas las disponibles si n es None), de la más vieja a la más nueva."""
+        count = self._count
+        available = min(count, self.capacity)
+        n = available if n is None else max(0, min(n, available))
+        return [self._slots[i % self.capacity] for i in range(count - n, count)]
+
+    @property
+    def total(self) -> int:
+        """Muestras escritas desde el inicio (no se reinicia al dar la vuelta)."""
+        return self._count
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+
+class ArrayRing:
+    """
+    Buffer circular NumPy de filas float64 (un escritor, N lectores).
+    push_batch escribe un lote completo y publica el contador al final;
+    latest() y window() devuelven copias, nunca vistas del buffer interno.
+    """
+    __slots__ = ("capacity", "columns", "_data", "_count")
+
+    def __init__(self, capacity: int, columns: int):
+        if capacity <= 0:
+            raise ValueError("La capacidad del buffer debe ser positiva")
+        self.capacity = capacity
+        self.columns = columns
+        self._data = np.zeros((capacity, columns), dtype=np.float64)
+        self._count = 0
+
+    def push_batch(self, rows: np.ndarray) -> None:
+        """Solo desde el hilo escritor. rows: (n, columns)."""
+        n = rows.shape[0]
+        if not n:
+            return
+        if n > self.capacity:
+            rows = rows[-self.capacity:]
+            skipped, n = n - self.capacity, self.capacity
+        else:
+            skipped = 0
+        count = self._count + skipped
+        start = count % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = rows[:first]
+        if first < n:
+            self._data[:n - first] = rows[first:]
+        self._count = count + n  # Publicar después de escribir las filas
+
+    def latest(self) -> Optional[np.ndarray]:
+        count = self._count
+        return self._data[(count - 1) % self.capacity].copy() if count else None
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        """Las últimas n filas (todas las disponibles si n es None), de la más vieja a la más nueva."""
+        count = self._count
+        available = min(count, self.capacity)
+        n = available if n is None else max(0, min(n, available))
+        idx = np.arange(count - n, count) % self.capacity
+        return self._data[idx]  # Indexado con array: ya es una copia
+
+    @property
+    def total(self) -> int:
+        return self._count
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
@@ -0,0 +1,205 @@
+# core/sampler.py
+"""
+Muestreo en segundo plano con un único dueño por sensor.
+
+Cada Sampler tiene una tarea que llama a `acquire()` a la tasa configurada y
+guarda cada resultado en un SampleRing como Sample(seq, timestamp, monotonic, value).
+HTTP, WebSocket, MQTT y BD leen de ese buffer:
+- latest() es O(1) y nunca toca el hardware.
+- wait_next() espera la siguiente muestra (p. ej. al arrancar, sin datos aún).
+- fresh() despierta al dueño para adquirir ya (capturas con event=True) y espera el resultado.
+Así las peticiones concurrentes no compiten por el dispositivo.
+Los lectores que ya tienen hilo propio con buffer y timestamps (TF-Luna,
+MPU6050, HC-SR04) no se envuelven: un Sampler solo sumaría otra copia y latencia.
+
+La tasa se configura por sensor con SAMPLER_<NOMBRE>_HZ (p. ej. SAMPLER_IMX477_HZ=0.5).
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from core.sample_ring import SampleRing
+
+
+class Sample(NamedTuple):
+    seq: int           # Correlativo desde 1, sin huecos por muestra guardada
+    timestamp: float   # epoch (s) al terminar la adquisición
+    monotonic: float
+    value: Any
+
+
+def sampler_rate(name: str, default: float) -> float:
+    """Tasa en Hz desde SAMPLER_<NOMBRE>_HZ, o `default`."""
+    try:
+        rate = float(os.getenv(f"SAMPLER_{name.upper()}_HZ", default))
+    except ValueError:
+        return default
+    return rate if rate > 0 else default
+
+
+class Sampler:
+    def __init__(
+        self,
+        name: str,
+        acquire: Callable[[], Awaitable[Optional[Any]]],
+        rate_hz: float = 1.0,
+        buffer_size: int = 256,
+        max_age: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        self.name = name
+        self._acquire = acquire
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        # Una muestra sigue vigente hasta perder ~3 adquisiciones seguidas
+        self.max_age = max_age if max_age is not None else max(3 * self.period, 1.0)
+        self.timeout = timeout if timeout is not None else max(self.period, 5.0)
+        self.samples: SampleRing[Sample] = SampleRing(buffer_size)
+        self._task: Optional[asyncio.Task] = None
+        self._arrived: Optional[asyncio.Event] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._cycle = 0          # Adquisiciones iniciadas
+        self._pushed_cycle = 0   # Adquisición que produjo la última muestra
+        self.on_demand = False   # La adquisición en curso la pidió fresh() (no es la periódica)
+        self.stats = {"acquisitions": 0, "empty": 0, "errors": 0, "overruns": 0, "last_acquire_ms": None}
+        self.last_error: Optional[str] = None
+
+    # --- Dueño ---
+
+    def start(self):
+        """Lanza la tarea de muestreo (desde el event loop)."""
+        if self._task is None or self._task.done():
+            self._arrived = asyncio.Event()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name=f"sampler-{self.name}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def _push(self, value: Any) -> Sample:
+        sample = Sample(self.samples.total + 1, time.time(), time.monotonic(), value)
+        self.samples.push(sample)
+        self._pushed_cycle = self._cycle
+        arrived, self._arrived = self._arrived, asyncio.Event()
+        arrived.set()  # Despierta a todos los que esperaban esta muestra
+        return sample
+
+    async def _run(self):
+        next_at = time.monotonic()
+        while True:
+            self.on_demand = self._wake.is_set()
+            self._wake.clear()
+            self._cycle += 1
+            started = time.monotonic()
+            try:
+                value = await asyncio.wait_for(self._acquire(), timeout=self.timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.last_error is None:
+                    print(f"⚠️ Sampler {self.name}: error de adquisición - {e}")
+                self.last_error = str(e) or type(e).__name__
+                self.stats["errors"] += 1
+                value = None
+            self.stats["acquisitions"] += 1
+            self.stats["last_acquire_ms"] = round((time.monotonic() - started) * 1000, 2)
+            if value is None:
+                self.stats["empty"] += 1
+            else:
+                self.last_error = None
+                self._push(value)
+
+            next_at += self.period
+            delay = next_at - time.monotonic()
+            if delay < 0:
+                # La adquisición tardó más que el período: no intentar recuperar el atraso
+                self.stats["overruns"] += 1
+                next_at = time.monotonic()
+                delay = 0
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                next_at = time.monotonic()  # fresh(): adquirir ya y reiniciar la cadencia
+            except asyncio.TimeoutError:
+                pass
+
+    # --- Consumidores ---
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[Sample]:
+        """Última muestra vigente (O(1)), o None si no hay o es más vieja que max_age."""
+        sample = self.samples.latest()
+        limit = self.max_age if max_age is None else max_age
+        if sample is None or time.monotonic() - sample.monotonic > limit:
+            return None
+        return sample
+
+    async def wait_next(self, timeout: Optional[float] = None) -> Optional[Sample]:
+        """Espera la próxima muestra (None si vence el timeout o el sampler no está corriendo)."""
+        if self._arrived is None:
+            return None
+        arrived = self._arrived
+        try:
+            await asyncio.wait_for(arrived.wait(), timeout=timeout if timeout is not None else self.timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.samples.latest()
+
+    async def fresh(self, timeout: Optional[float] = None) -> Optional[Sample]:
+        """
+        Pide al dueño una adquisición inmediata y espera su resultado. Si había una
+        en curso, se descarta: empezó antes del pedido.
+        """
+        if self._wake is None:
+            return None
+        wanted = self._cycle + 1
+        self._wake.set()
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout + self.period)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            sample = await self.wait_next(remaining)
+            if sample is None or self._pushed_cycle >= wanted:
+                return sample
+
+    async def latest_or_wait(self, timeout: Optional[float] = None) -> Optional[Sample]:
+        return self.latest() or await self.wait_next(timeout)
+
+    def get_stats(self) -> dict:
+        sample = self.samples.latest()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "rate_hz": self.rate_hz,
+            "seq": sample.seq if sample else 0,
+            "age_s": round(time.monotonic() - sample.monotonic, 3) if sample else None,
+            **self.stats,
+            "last_error": self.last_error,
+        }
+
+
+# Registro global: lo llenan las dependencias de cada sensor y lo arranca/detiene el lifespan
+SAMPLERS: Dict[str, Sampler] = {}
+
+
+def register_sampler(sampler: Sampler) -> Sampler:
+    SAMPLERS[sampler.name] = sampler
+    return sampler
+
+
+def start_samplers():
+    for sampler in SAMPLERS.values():
+        sampler.start()
+
+
+async def stop_samplers():
+    await asyncio.gather(*(sampler.stop() for sampler in SAMPLERS.values()), return_exceptions=True)
+
+
+def samplers_stats() -> Dict[str, dict]:
+    return {name: sampler.get_stats() for name, sampler in SAMPLERS.items()}
@@ -0,0 +1,139 @@
+# core/serialization.py
+"""
+Capa de serialización compartida (orjson) para HTTP, WebSocket y RabbitMQ.
+
+Una misma lectura se publica al broker, se envía por WebSocket y se devuelve
+por HTTP. En lugar de serializarla una vez por camino (dict() + json.dumps,
+send_json por cliente, json.dumps(default=str)), se codifica una sola vez y
+los bytes se reutilizan en todos los consumidores.
+
+- dumps(): orjson con soporte de datetime, numpy y modelos pydantic
+- encode_reading(): JSON de una entidad, memorizado por instancia fuera del modelo
+- ORJSONResponse: response class por defecto de la app
+- success_response(): respuesta {"success": true, "data": ...} reutilizando los bytes
+"""
+import weakref
+from typing import Any, Callable, Dict
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+_ENCODED_JSON = "json"
+_ENCODED_TEXT = "text"
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any):
+    """Tipos que orjson no serializa de forma nativa."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "item"):  # Escalares numpy no nativos
+        return obj.item()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializa a JSON (bytes) con orjson."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data)
+
+
+class _CacheEntry:
+    __slots__ = ("ref", "fingerprint", "values")
+
+    def __init__(self, ref: weakref.ref, fingerprint: tuple):
+        self.ref = ref
+        self.fingerprint = fingerprint
+        self.values: Dict[str, Any] = {}
+
+
+class EncodingCache:
+    """
+    Codificaciones memorizadas por instancia, guardadas fuera del modelo: la
+    entidad no cambia (__eq__, model_dump y copias no ven el caché).
+    Los modelos pydantic no son hashables, así que la clave es id(instancia)
+    y un weakref libera la entrada cuando la instancia se recolecta.
+    Cada entrada guarda los valores de la instancia al codificarse: si luego
+    se reasigna un campo (p. ej. el id tras guardar), se vuelve a codificar.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, _CacheEntry] = {}
+
+    def get(self, reading: BaseModel, kind: str, compute: Callable[[], Any]) -> Any:
+        key = id(reading)
+        fingerprint = tuple(reading.__dict__.values())
+        entry = self._entries.get(key)
+        if entry is None or entry.ref() is not reading:
+            entry = _CacheEntry(weakref.ref(reading, lambda _, key=key: self._entries.pop(key, None)), fingerprint)
+            self._entries[key] = entry
+        elif entry.fingerprint != fingerprint:
+            entry.fingerprint = fingerprint  # Instancia modificada: lo memorizado quedó viejo
+            entry.values = {}
+        value = entry.values.get(kind)
+        if value is None:
+            value = entry.values[kind] = compute()
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+encoding_cache = EncodingCache()
+
+
+def encode_reading(reading: BaseModel) -> bytes:
+    """Codifica una entidad una sola vez; se vuelve a codificar solo si la entidad cambió."""
+    return encoding_cache.get(reading, _ENCODED_JSON, lambda: dumps(reading.model_dump()))
+
+
+def encode_reading_text(reading: BaseModel) -> str:
+    """Versión str de encode_reading (frames de texto WebSocket), también memorizada."""
+    return encoding_cache.get(reading, _ENCODED_TEXT, lambda: encode_reading(reading).decode())
+
+
+def to_text(payload: Any) -> str:
+    """Convierte un payload (entidad, dict, bytes o str) a texto JSON."""
+    if isinstance(payload, str):
+        return payload
+    if isinstance(payload, BaseModel):
+        return encode_reading_text(payload)
+    if isinstance(payload, (bytes, bytearray)):
+        return bytes(payload).decode()
+    return dumps(payload).decode()
+
+
+def to_bytes(payload: Any) -> bytes:
+    """Convierte un payload (entidad, dict, bytes o str) a bytes JSON."""
+    if isinstance(payload, (bytes, bytearray)):
+        return bytes(payload)
+    if isinstance(payload, BaseModel):
+        return encode_reading(payload)
+    if isinstance(payload, str):
+        return payload.encode()
+    return dumps(payload)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse renderizada con orjson (datetime ISO 8601 nativo)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def success_response(reading: BaseModel, status_code: int = 200) -> ORJSONResponse:
+    """
+    {"success": true, "data": <lectura>} incrustando los bytes ya codificados
+    de la lectura (sin volver a serializarla).
+    """
+    return ORJSONResponse(
+        content={"success": True, "data": orjson.Fragment(encode_reading(reading))},
+        status_code=status_code
+    )
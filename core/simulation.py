@@ -0,0 +1,57 @@
+# core/simulation.py
+"""
+Selección y parámetros de los backends simulados de sensores.
+
+    SIMULATE_SENSORS=all                 todos los sensores simulados
+    SIMULATE_SENSORS=tfluna,hcsr04       solo algunos (tfluna, mpu6050, hcsr04, imx477)
+
+Parámetros globales (SIM_*) o por sensor (SIM_<SENSOR>_*, tienen prioridad):
+    SIM_NOISE        escala del ruido: 1.0 = ruido típico del sensor, 0 = señal limpia
+    SIM_FAULT_RATE   probabilidad de falla por trama / transacción / notificación / captura
+    SIM_<SENSOR>_HZ  tasa de emisión del sensor simulado
+    SIM_SEED         semilla del generador aleatorio (corridas reproducibles)
+
+Cada simulador documenta sus parámetros extra (p. ej. SIM_TFLUNA_DISTANCE_CM).
+"""
+import os
+from typing import List, NamedTuple, Optional
+
+SIMULATED_SENSORS = ("tfluna", "mpu6050", "hcsr04", "imx477")
+
+
+class SimulationConfig(NamedTuple):
+    noise: float
+    fault_rate: float
+    rate_hz: float
+    seed: Optional[int]
+
+
+def is_simulated(sensor: str) -> bool:
+    selected = {s.strip().lower() for s in os.getenv("SIMULATE_SENSORS", "").split(",") if s.strip()}
+    return "all" in selected or sensor in selected
+
+
+def simulated_sensors() -> List[str]:
+    return [sensor for sensor in SIMULATED_SENSORS if is_simulated(sensor)]
+
+
+def sim_value(sensor: str, key: str, default: float) -> float:
+    """SIM_<SENSOR>_<KEY>, luego SIM_<KEY>, luego default."""
+    for name in (f"SIM_{sensor.upper()}_{key}", f"SIM_{key}"):
+        raw = os.getenv(name)
+        if raw:
+            try:
+                return float(raw)
+            except ValueError:
+                print(f"⚠️ Simulación: valor inválido en {name}={raw!r}, se usa {default}")
+    return default
+
+
+def simulation_config(sensor: str, default_rate: float) -> SimulationConfig:
+    seed = os.getenv("SIM_SEED")
+    return SimulationConfig(
+        noise=max(0.0, sim_value(sensor, "NOISE", 1.0)),
+        fault_rate=min(1.0, max(0.0, sim_value(sensor, "FAULT_RATE", 0.0))),
+        rate_hz=max(0.01, float(os.getenv(f"SIM_{sensor.upper()}_HZ") or default_rate)),
+        seed=int(seed) if seed and seed.isdigit() else None,
+    )
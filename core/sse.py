@@ -0,0 +1,111 @@
+# core/sse.py
+"""
+Server-Sent Events para dashboards de solo lectura (GET /{sensor}/sensor/stream).
+
+Cada conexión SSE es un cliente más del hub WebSocket (core/ws_hub.py): recibe
+las mismas publicaciones, con la misma cola acotada por conexión, pero sin
+tarea escritora; el generador de la respuesta HTTP consume la cola.
+
+- id de evento = seq del historial del tópico -> reanudación con Last-Event-ID
+  (cabecera que envía EventSource al reconectar, o ?last_event_id=)
+- comentarios keep-alive cuando no hay lecturas, para proxies con timeout
+- evento "gap" si el historial ya no contiene todo lo pedido al reanudar
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from core.serialization import dumps, to_text
+from core.ws_hub import TopicError, parse_topic, sse_frame, topic_name, ws_hub
+from core.ws_subscription import SubscriptionError, validate_options
+
+SSE_KEEPALIVE_S = 15.0
+SSE_RETRY_MS = 3000
+
+
+class SSEStream:
+    """Identidad de una conexión SSE dentro del hub (ocupa el lugar del WebSocket)."""
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        # El hub la desregistra; el generador termina al ver el cliente cerrado
+        pass
+
+
+def _parse_last_event_id(request: Request) -> Optional[int]:
+    raw = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    if raw is None:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+
+def sse_response(
+    request: Request,
+    sensor: str,
+    project_id: Optional[int] = None,
+    max_rate: Optional[float] = None,
+    aggregate: Optional[str] = None,
+    backfill: int = 0,
+    keepalive: float = SSE_KEEPALIVE_S
+) -> StreamingResponse:
+    """Abre un stream SSE del tópico `sensor[:project_id]`."""
+    try:
+        topic = topic_name(*parse_topic(topic_name(sensor, project_id)))
+        validate_options(max_rate, aggregate)
+    except (TopicError, SubscriptionError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    last_event_id = _parse_last_event_id(request)
+
+    async def event_stream():
+        # Registro dentro del generador: si el cliente se va antes de que empiece
+        # el cuerpo, nunca queda un cliente huérfano en el hub
+        stream = SSEStream()
+        client = ws_hub.attach(stream, [topic], sse=True, max_rate=max_rate, aggregate=aggregate)
+
+        # Reanudación / historial inicial desde el buffer circular del tópico
+        ring = ws_hub.history(topic)
+        if last_event_id is not None:
+            items, complete = ring.since(last_event_id)
+            if not complete:
+                client.enqueue(sse_frame("gap", dumps({
+                    "last_event_id": last_event_id,
+                    "oldest_available": ring.oldest_seq,
+                }).decode()), control=True)
+        else:
+            items = ring.latest(backfill) if backfill > 0 else []
+        for seq, data in items:
+            client.enqueue(sse_frame("reading", to_text(data), seq), control=True)
+
+        print(f"📡 Cliente SSE conectado ({topic}) - Total hub: {ws_hub.client_count}")
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(client.next_frame(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if frame is None:  # Expulsado por el hub (cliente atascado)
+                    break
+                yield frame
+                client.mark_sent(frame)
+        finally:
+            ws_hub.detach(stream)
+            print(f"📡 Cliente SSE desconectado ({topic})")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Evitar buffering en nginx
+        }
+    )
@@ -0,0 +1,351 @@
+# core/stream_log.py
+"""
+Grabación y reproducción de los flujos crudos de adquisición.
+
+Formato (append-only, little-endian):
+    cabecera   b"GEOVLOG" + versión (u8)
+    registro   t (f64, epoch s) | canal (u16) | largo (u32) | payload
+El canal 0xFFFF declara un canal nuevo: payload = id (u16) + nombre UTF-8.
+Se declara la primera vez que se graba en él, así cada sesión anexada al mismo
+archivo es autocontenida y no hace falta una tabla aparte. Un último registro
+incompleto (corte de luz) se ignora al leer y se descarta al volver a grabar.
+
+Canales usados por los lectores:
+    tfluna              bytes tal cual salen de la UART
+    mpu6050             ráfagas leídas de FIFO_R_W (muestras de 12 bytes)
+    hcsr04/<device_id>  payload de cada notificación BLE
+    imx477/still        JPEG de rpicam-still
+    imx477/mjpeg        cada frame JPEG del streaming
+
+Grabar: RECORD_STREAMS=/ruta/captura.glog (opcional RECORD_STREAMS_CHANNELS=tfluna,hcsr04
+filtra por prefijo y RECORD_STREAMS_MAX_MB corta la grabación al llegar al tamaño).
+Reproducir: REPLAY_STREAMS=/ruta/captura.glog y REPLAY_SPEED (1 = tiempo real,
+10 = diez veces más rápido, 0 = sin esperas); REPLAY_LOOP=1 repite el log.
+Los sensores con canales en el log usan el backend de reproducción en lugar
+del hardware o del simulador.
+La lectura usa mmap, así que capturas de varios GB no se cargan en memoria.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from functools import partial
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+MAGIC = b"GEOVLOG"
+VERSION = 1
+FILE_HEADER = MAGIC + bytes((VERSION,))
+_RECORD = struct.Struct("<dHI")
+_CHANNEL_ID = struct.Struct("<H")
+DEFINE_CHANNEL = 0xFFFF
+FLUSH_INTERVAL = 1.0  # Segundos máximos de datos en el buffer del archivo
+
+
+class StreamRecorder:
+    """
+    Grabador thread-safe: lo llaman el hilo de la UART, el del MPU, el event
+    loop (BLE) y el del streaming. Cada registro es un único write() al buffer
+    del archivo; el costo por llamada es un pack de 14 bytes y un lock.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, channel_filter: Sequence[str] = ()):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.channel_filter = tuple(channel_filter)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            existing = StreamLog(path)  # Valida la cabecera y encuentra el último registro completo
+            valid_end, truncated = existing.end, existing.truncated
+            existing.close()
+            if truncated:
+                os.truncate(path, valid_end)
+        self._file = open(path, "ab", buffering=1 << 20)
+        if new_file:
+            self._file.write(FILE_HEADER)
+        self._channels: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.bytes_written = os.path.getsize(path) if not new_file else len(FILE_HEADER)
+        self.records = 0
+        self.dropped = 0
+        self.active = True
+
+    def wants(self, channel: str) -> bool:
+        return not self.channel_filter or channel.startswith(self.channel_filter)
+
+    def _channel_id(self, name: str) -> int:
+        channel_id = self._channels.get(name)
+        if channel_id is None:
+            channel_id = len(self._channels)
+            payload = _CHANNEL_ID.pack(channel_id) + name.encode()
+            self._file.write(_RECORD.pack(time.time(), DEFINE_CHANNEL, len(payload)) + payload)
+            self.bytes_written += _RECORD.size + len(payload)
+            self._channels[name] = channel_id
+        return channel_id
+
+    def write(self, channel: str, data, timestamp: Optional[float] = None):
+        """Agrega un registro; data es bytes/bytearray/memoryview."""
+        with self._lock:
+            if not self.active:
+                self.dropped += 1
+                return
+            size = _RECORD.size + len(data)
+            if self.max_bytes and self.bytes_written + size > self.max_bytes:
+                self.active = False
+                self.dropped += 1
+                self._file.flush()
+                print(f"⏺️ Grabación de flujos detenida: se alcanzó el límite ({self.max_bytes / (1 << 20):g} MB)")
+                return
+            channel_id = self._channel_id(channel)
+            self._file.write(_RECORD.pack(timestamp or time.time(), channel_id, len(data)))
+            self._file.write(data)
+            self.bytes_written += size
+            self.records += 1
+            now = time.monotonic()
+            if now - self._last_flush >= FLUSH_INTERVAL:
+                self._file.flush()
+                self._last_flush = now
+
+    def channel_writer(self, channel: str) -> Callable:
+        """write() con el canal fijado, para guardar en el lector y llamarlo en el camino caliente."""
+        return partial(self.write, channel)
+
+    def close(self):
+        with self._lock:
+            self.active = False
+            if not self._file.closed:
+                self._file.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "path": self.path,
+            "active": self.active,
+            "records": self.records,
+            "bytes": self.bytes_written,
+            "dropped": self.dropped,
+            "channels": sorted(self._channels),
+        }
+
+
+class Record(NamedTuple):
+    timestamp: float
+    channel: str
+    payload: memoryview   # Vista sobre el mmap: válida hasta StreamLog.close()
+
+
+class StreamLog:
+    """
+    Lectura de un log vía mmap. El índice (offset, tiempo, canal) se arma en
+    una pasada leyendo solo las cabeceras y se guarda en arrays compactos;
+    los payloads nunca se copian salvo que el consumidor lo haga.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(FILE_HEADER):
+            self._file.close()
+            raise ValueError(f"{path} está vacío o no es un log de flujos")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(FILE_HEADER)] != FILE_HEADER:
+            self.close()
+            raise ValueError(f"{path} no es un log de flujos v{VERSION}")
+        self._view = memoryview(self._mmap)
+        self.offsets = array("Q")
+        self.times = array("d")
+        self.lengths = array("I")
+        self.channel_ids = array("H")
+        self.channel_names: List[str] = []
+        self.truncated = False
+        self.closed = False
+        self._build_index(size)
+
+    def _build_index(self, size: int):
+        unpack = _RECORD.unpack_from
+        header = _RECORD.size
+        ids: Dict[int, int] = {}  # id de la sesión de grabación -> índice global de canal
+        pos = len(FILE_HEADER)
+        while pos + header <= size:
+            t, channel, length = unpack(self._mmap, pos)
+            end = pos + header + length
+            if end > size:
+                self.truncated = True
+                break
+            if channel == DEFINE_CHANNEL:
+                (channel_id,) = _CHANNEL_ID.unpack_from(self._mmap, pos + header)
+                name = bytes(self._mmap[pos + header + _CHANNEL_ID.size:end]).decode()
+                if name not in self.channel_names:
+                    self.channel_names.append(name)
+                ids[channel_id] = self.channel_names.index(name)
+            else:
+                self.offsets.append(pos)
+                self.times.append(t)
+                self.lengths.append(length)
+                self.channel_ids.append(ids[channel])
+            pos = end
+        self.end = pos  # Fin del último registro completo
+        if pos != size:
+            self.truncated = True
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def channels(self) -> List[str]:
+        return list(self.channel_names)
+
+    def has_channel(self, prefix: str) -> bool:
+        return any(name == prefix or name.startswith(prefix + "/") for name in self.channel_names)
+
+    def duration(self) -> float:
+        return self.times[-1] - self.times[0] if len(self.times) > 1 else 0.0
+
+    def records(self, channels: Optional[Sequence[str]] = None) -> Iterator[Record]:
+        """Registros en orden de grabación, opcionalmente solo de `channels` (nombres exactos)."""
+        wanted = None
+        if channels is not None:
+            wanted = {i for i, name in enumerate(self.channel_names) if name in channels}
+        header = _RECORD.size
+        view, names = self._view, self.channel_names
+        for offset, t, length, channel_id in zip(self.offsets, self.times, self.lengths, self.channel_ids):
+            if self.closed:
+                return  # Cerrado con una reproducción en curso (apagado): se corta sin error
+            if wanted is not None and channel_id not in wanted:
+                continue
+            start = offset + header
+            yield Record(t, names[channel_id], view[start:start + length])
+
+    def summary(self) -> dict:
+        counts: Dict[str, int] = {}
+        volume: Dict[str, int] = {}
+        for record in self.records():
+            counts[record.channel] = counts.get(record.channel, 0) + 1
+            volume[record.channel] = volume.get(record.channel, 0) + len(record.payload)
+        return {
+            "path": self.path,
+            "records": len(self),
+            "duration_s": round(self.duration(), 3),
+            "truncated": self.truncated,
+            "channels": {name: {"records": counts.get(name, 0), "bytes": volume.get(name, 0)}
+                         for name in self.channel_names},
+        }
+
+    def close(self):
+        self.closed = True
+        try:
+            self._view.release()
+        except (AttributeError, BufferError):
+            pass  # Quedan Records vivos: el mmap se libera con el último
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+
+class ReplayClock:
+    """
+    Reloj de reproducción: delay(t) dice cuánto falta para entregar el registro
+    grabado en `t`, con el espaciado original dividido por `speed`. Se mide desde
+    el inicio de la reproducción, así los retrasos no se acumulan; speed <= 0
+    entrega todo sin esperas.
+    """
+
+    def __init__(self, speed: float = 1.0):
+        self.speed = speed
+        self._started: Optional[float] = None
+        self._first_t = 0.0
+
+    def restart(self):
+        self._started = None
+
+    def delay(self, timestamp: float) -> float:
+        if self.speed <= 0:
+            return 0.0
+        now = time.monotonic()
+        if self._started is None:
+            self._started, self._first_t = now, timestamp
+        return max(0.0, self._started + (timestamp - self._first_t) / self.speed - now)
+
+
+def replay_speed() -> float:
+    try:
+        return max(0.0, float(os.getenv("REPLAY_SPEED", "1")))
+    except ValueError:
+        return 1.0
+
+
+def replay_loop() -> bool:
+    """REPLAY_LOOP=1 vuelve a empezar el log al terminar (corridas largas de benchmark)."""
+    return os.getenv("REPLAY_LOOP", "0").lower() in ("1", "true", "yes")
+
+
+# --- Singletons configurados por entorno ---
+
+_recorder: Optional[StreamRecorder] = None
+_recorder_checked = False
+_replay: Optional[StreamLog] = None
+_replay_checked = False
+_singleton_lock = threading.Lock()
+
+
+def get_recorder() -> Optional[StreamRecorder]:
+    """Grabador global si RECORD_STREAMS está definido (None si no se graba)."""
+    global _recorder, _recorder_checked
+    with _singleton_lock:
+        if not _recorder_checked:
+            _recorder_checked = True
+            path = os.getenv("RECORD_STREAMS")
+            if path:
+                max_mb = os.getenv("RECORD_STREAMS_MAX_MB")
+                channels = [c.strip() for c in os.getenv("RECORD_STREAMS_CHANNELS", "").split(",") if c.strip()]
+                try:
+                    _recorder = StreamRecorder(
+                        path,
+                        max_bytes=int(float(max_mb) * (1 << 20)) if max_mb else None,
+                        channel_filter=channels,
+                    )
+                    print(f"⏺️ Grabando flujos crudos en {path}" + (f" ({', '.join(channels)})" if channels else ""))
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ No se pudo abrir el log de grabación {path}: {e}")
+        return _recorder
+
+
+def stream_writer(channel: str) -> Optional[Callable]:
+    """Función de grabación para `channel`, o None si no se graba (chequeo barato en el lector)."""
+    recorder = get_recorder()
+    if recorder is None or not recorder.wants(channel):
+        return None
+    return recorder.channel_writer(channel)
+
+
+def get_replay_log() -> Optional[StreamLog]:
+    """Log de reproducción si REPLAY_STREAMS está definido."""
+    global _replay, _replay_checked
+    with _singleton_lock:
+        if not _replay_checked:
+            _replay_checked = True
+            path = os.getenv("REPLAY_STREAMS")
+            if path:
+                try:
+                    _replay = StreamLog(path)
+                    print(f"⏯️ Reproduciendo flujos de {path}: {len(_replay)} registros, "
+                          f"{_replay.duration():.1f} s, x{replay_speed():g}")
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ No se pudo abrir el log de reproducción {path}: {e}")
+        return _replay
+
+
+def is_replayed(channel_prefix: str) -> bool:
+    log = get_replay_log()
+    return log is not None and log.has_channel(channel_prefix)
+
+
+def close_stream_logs():
+    if _recorder is not None:
+        _recorder.close()
+    if _replay is not None:
+        _replay.close()
@@ -0,0 +1,178 @@
+# core/ws_codec.py
+"""
+Codificaciones negociables para los frames de lecturas del hub WebSocket.
+
+- json:   sobre completo {"type": "reading", ...} (por defecto)
+- delta:  solo los campos que cambiaron respecto al último frame enviado
+- binary: frames struct empaquetados (little-endian) descritos por un esquema
+          que se envía una sola vez al negociar
+
+Frame binario = cabecera + payload del sensor:
+    cabecera "<BBHId": versión, código de sensor, flags, id_project, timestamp (epoch s)
+    flags: bit0 = event, bit1 = laser_detectado (imx477)
+
+Los frames binarios solo llevan los campos de la lectura en vivo; los campos
+de registro (id, resolution, totales de medición doble, ...) siguen en JSON.
+"""
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from core.serialization import dumps, encoding_cache
+
+ENCODING_JSON = "json"
+ENCODING_DELTA = "delta"
+ENCODING_BINARY = "binary"
+ENCODINGS = (ENCODING_JSON, ENCODING_DELTA, ENCODING_BINARY)
+
+BINARY_VERSION = 1
+FLAG_EVENT = 0x01
+FLAG_LASER = 0x02
+
+HEADER = struct.Struct("<BBHId")
+
+
+class SensorSchema:
+    """Layout binario de un sensor: orden de campos y formato struct."""
+
+    def __init__(self, sensor: str, code: int, fields: Tuple[Tuple[str, str], ...]):
+        self.sensor = sensor
+        self.code = code
+        self.fields = fields
+        self.names = tuple(name for name, _ in fields)
+        # Los enteros pueden llegar como float (p. ej. promedios agregados)
+        self.casts = tuple(float if fmt in "fd" else (lambda v: int(round(v))) for _, fmt in fields)
+        self.payload = struct.Struct("<" + "".join(fmt for _, fmt in fields))
+        self.size = HEADER.size + self.payload.size
+
+    def describe(self) -> dict:
+        return {
+            "code": self.code,
+            "header": HEADER.format,
+            "header_fields": ["version", "sensor", "flags", "id_project", "timestamp"],
+            "payload": self.payload.format,
+            "fields": list(self.names),
+            "size": self.size,
+        }
+
+
+SCHEMAS: Dict[str, SensorSchema] = {
+    schema.sensor: schema for schema in (
+        SensorSchema("tfluna", 1, (
+            ("distancia_cm", "H"), ("distancia_m", "f"), ("fuerza_senal", "H"), ("temperatura", "f"),
+        )),
+        SensorSchema("mpu6050", 2, (
+            ("ax", "f"), ("ay", "f"), ("az", "f"),
+            ("gx", "f"), ("gy", "f"), ("gz", "f"),
+            ("roll", "f"), ("pitch", "f"), ("apertura", "f"),
+        )),
+        SensorSchema("hcsr04", 3, (
+            ("distancia_cm", "f"),
+        )),
+        SensorSchema("imx477", 4, (
+            ("luminosidad_promedio", "f"), ("nitidez_score", "f"),
+            ("calidad_frame", "f"), ("probabilidad_confiabilidad", "f"),
+        )),
+    )
+}
+
+
+def schema_message(encoding: str) -> dict:
+    """Mensaje que se envía una vez al negociar la codificación."""
+    message = {"type": "schema", "encoding": encoding}
+    if encoding == ENCODING_BINARY:
+        message["version"] = BINARY_VERSION
+        message["flags"] = {"event": FLAG_EVENT, "laser_detectado": FLAG_LASER}
+        message["sensors"] = {name: schema.describe() for name, schema in SCHEMAS.items()}
+    elif encoding == ENCODING_DELTA:
+        message["rules"] = (
+            "Los frames 'reading' con key=true traen la lectura completa; los 'delta' "
+            "solo los campos cambiados y se aplican si base coincide con el último seq recibido. "
+            "Si no coincide, esperar el siguiente frame key."
+        )
+    return message
+
+
+def reading_values(data: Any) -> dict:
+    """Campos de una lectura como dict, calculado una vez por instancia (no modificar el resultado)."""
+    if isinstance(data, BaseModel):
+        return encoding_cache.get(data, "values", data.model_dump)
+    return data if isinstance(data, dict) else {}
+
+
+def _epoch(value: Any) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)  # Las entidades usan utcnow()
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return 0.0
+
+
+def encode_binary(sensor: str, project_id: Optional[int], data: Any) -> Optional[bytes]:
+    """Empaqueta una lectura según su esquema. None si el sensor no tiene esquema."""
+    schema = SCHEMAS.get(sensor)
+    if schema is None:
+        return None
+    values = reading_values(data)
+    flags = (FLAG_EVENT if values.get("event") else 0) | (FLAG_LASER if values.get("laser_detectado") else 0)
+    header = HEADER.pack(BINARY_VERSION, schema.code, flags, project_id or 0, _epoch(values.get("timestamp")))
+    payload = schema.payload.pack(*(cast(values.get(name) or 0) for name, cast in zip(schema.names, schema.casts)))
+    return header + payload
+
+
+def decode_binary(frame: bytes) -> dict:
+    """Operación inversa (útil para clientes Python y benchmarks)."""
+    version, code, flags, project_id, timestamp = HEADER.unpack_from(frame)
+    schema = next(s for s in SCHEMAS.values() if s.code == code)
+    values = dict(zip(schema.names, schema.payload.unpack_from(frame, HEADER.size)))
+    values.update({
+        "sensor": schema.sensor,
+        "id_project": project_id,
+        "timestamp": timestamp,
+        "event": bool(flags & FLAG_EVENT),
+    })
+    if schema.sensor == "imx477":
+        values["laser_detectado"] = bool(flags & FLAG_LASER)
+    return values
+
+
+class DeltaEncoder:
+    """
+    Estado delta de un cliente: último frame encolado por (sensor, proyecto).
+    Cada `keyframe_every` frames (o tras un reset) se envía la lectura completa.
+    """
+
+    def __init__(self, keyframe_every: int = 50):
+        self.keyframe_every = keyframe_every
+        self._last: Dict[Tuple[str, Optional[int]], dict] = {}
+        self._seq: Dict[Tuple[str, Optional[int]], int] = {}
+        self._since_key: Dict[Tuple[str, Optional[int]], int] = {}
+
+    def reset(self) -> None:
+        """Forzar frames completos (p. ej. tras descartar frames en la cola)."""
+        self._last.clear()
+        self._since_key.clear()
+
+    def encode(self, sensor: str, project_id: Optional[int], data: Any) -> str:
+        key = (sensor, project_id)
+        values = reading_values(data)
+        seq = self._seq.get(key, 0) + 1
+        self._seq[key] = seq
+        previous = self._last.get(key)
+        since_key = self._since_key.get(key, 0)
+
+        if previous is None or since_key >= self.keyframe_every:
+            frame = {"type": "reading", "topic": sensor, "project_id": project_id,
+                     "seq": seq, "key": True, "data": values}
+            self._since_key[key] = 1
+        else:
+            changed = {k: v for k, v in values.items() if previous.get(k) != v}
+            frame = {"type": "delta", "topic": sensor, "project_id": project_id,
+                     "seq": seq, "base": seq - 1, "data": changed}
+            self._since_key[key] = since_key + 1
+        self._last[key] = values
+        return dumps(frame).decode()
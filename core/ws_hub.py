@@ -0,0 +1,687 @@
+# core/ws_hub.py
+"""
+Hub WebSocket unificado con suscripción por tópicos.
+Patrón: Publish/Subscribe - un único punto de publicación para todos los sensores.
+
+Tópicos:
+    "<sensor>"              todas las lecturas del sensor (tfluna, mpu6050, hcsr04, imx477)
+    "<sensor>:<id_project>" solo las lecturas de un proyecto
+
+Protocolo del cliente (/ws):
+    {"action": "subscribe", "topics": ["tfluna", "mpu6050:3"]}
+    {"action": "subscribe", "topics": ["mpu6050"], "max_rate": 2, "aggregate": "mean"}   (ver core/ws_subscription.py)
+    {"action": "subscribe", "topics": ["tfluna"], "backfill": 20}   (historial; por defecto todo, false = nada)
+    {"action": "unsubscribe", "topics": ["tfluna"]}
+    {"action": "list"}
+    {"action": "ping"}
+    {"action": "encoding", "encoding": "json" | "delta" | "binary"}   (ver core/ws_codec.py)
+
+Mensajes del servidor:
+    {"type": "welcome", "topics": [...], "subscriptions": [...]}
+    {"type": "reading", "topic": "tfluna", "project_id": 1, "data": {...}}
+    {"type": "backfill", "topic": "tfluna", "count": n, "last_seq": s, "readings": [...]}
+    {"type": "subscribed" | "unsubscribed" | "subscriptions" | "pong" | "schema" | "error", ...}
+
+Los endpoints por sensor (/tfluna/sensor/ws, ...) se registran como clientes
+"legacy": reciben la lectura tal cual (sin sobre) y quedan suscritos a su sensor.
+Como antes del hub, solo reciben lecturas sin internet (is_online); /ws y SSE
+las reciben siempre.
+
+Difusión: cada cliente tiene una cola de envío acotada y una tarea escritora
+propia, así un cliente lento no frena al resto ni al loop de sensores. Si se
+atrasa se descartan las lecturas más viejas; si se queda atascado, se expulsa.
+
+Historial: las últimas `history_size` lecturas por sensor y por proyecto se
+guardan en memoria al publicar; al suscribirse, el cliente recibe un único
+mensaje "backfill" con ese historial (sin consultar SQLite).
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+from core.connectivity import connectivity_monitor
+from core.serialization import dumps, loads, to_bytes, to_text
+from core.ring_buffer import RingBuffer
+from core.ws_subscription import Subscription, SubscriptionError, validate_options
+from core.ws_codec import (
+    ENCODING_BINARY, ENCODING_DELTA, ENCODING_JSON, ENCODINGS,
+    DeltaEncoder, encode_binary, schema_message
+)
+
+SENSOR_TOPICS = ("tfluna", "mpu6050", "hcsr04", "imx477")
+
+
+class TopicError(ValueError):
+    """Tópico con formato inválido o sensor desconocido."""
+
+
+def parse_topic(topic: str) -> Tuple[str, Optional[int]]:
+    """
+    Valida un tópico y lo normaliza a (sensor, id_project | None).
+
+    Raises:
+        TopicError: si el sensor no existe o el proyecto no es un entero positivo
+    """
+    sensor, _, project = str(topic).strip().lower().partition(":")
+    if sensor not in SENSOR_TOPICS:
+        raise TopicError(f"Sensor desconocido: '{sensor}'. Disponibles: {', '.join(SENSOR_TOPICS)}")
+    if not project:
+        return sensor, None
+    try:
+        project_id = int(project)
+    except ValueError:
+        raise TopicError(f"id_project inválido en el tópico '{topic}'")
+    if project_id <= 0:
+        raise TopicError(f"id_project debe ser positivo en el tópico '{topic}'")
+    return sensor, project_id
+
+
+def topic_name(sensor: str, project_id: Optional[int] = None) -> str:
+    return sensor if project_id is None else f"{sensor}:{project_id}"
+
+
+def sse_frame(event: str, data: str, event_id: Optional[int] = None) -> str:
+    """Evento Server-Sent Events (el JSON compacto de orjson no lleva saltos de línea)."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {data}\n\n"
+
+
+class HubClient:
+    """
+    Conexión registrada en el hub, con su cola de envío acotada y su tarea escritora.
+
+    Las lecturas van a una cola de tamaño fijo: si el cliente se atrasa se
+    descarta la lectura más vieja (solo interesa la más reciente). Los mensajes
+    de control (bienvenida, respuestas, estado) van a una cola aparte que no
+    descarta y se envía primero; también está acotada (control_size): si se
+    llena, el cliente no está leyendo y el hub lo expulsa.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, websocket: WebSocket, legacy: bool = False, queue_size: int = 32, sse: bool = False,
+                 control_size: int = 64):
+        self.id = next(self._ids)
+        self.websocket = websocket
+        self.legacy = legacy  # True = recibe la lectura sin sobre (endpoints por sensor)
+        self.sse = sse  # True = Server-Sent Events: sin tarea escritora, la respuesta HTTP consume la cola
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.encoding = ENCODING_JSON
+        self.delta: Optional[DeltaEncoder] = None
+        self.queue_size = queue_size
+        self.control_size = control_size
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self._frames: Deque[Union[str, bytes]] = deque()
+        self._control: Deque[str] = deque()
+        self._wakeup = asyncio.Event()
+        # Estadísticas
+        self.connected_at = time.monotonic()
+        self.last_send_at = self.connected_at
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+        self.max_depth = 0
+
+    @property
+    def topics(self) -> List[str]:
+        return sorted(self.subscriptions)
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames) + len(self._control)
+
+    @property
+    def lag(self) -> float:
+        """Segundos sin poder enviar teniendo mensajes pendientes."""
+        if not self.depth:
+            return 0.0
+        return time.monotonic() - self.last_send_at
+
+    def set_encoding(self, encoding: str) -> None:
+        self.encoding = encoding
+        self.delta = DeltaEncoder() if encoding == ENCODING_DELTA else None
+
+    def enqueue(self, frame: Union[str, bytes], control: bool = False) -> bool:
+        """O(1): encola sin esperar al socket. False si la cola de control está llena."""
+        if control:
+            if len(self._control) >= self.control_size:
+                return False
+            self._control.append(frame)
+        else:
+            if len(self._frames) >= self.queue_size:
+                self._frames.popleft()  # Lectura obsoleta
+                self.dropped += 1
+                if self.delta:
+                    self.delta.reset()  # Los deltas encolados ya no tienen base: próximo frame completo
+            self._frames.append(frame)
+            self.enqueued += 1
+        depth = self.depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._wakeup.set()
+        return True
+
+    async def next_frame(self) -> Optional[Union[str, bytes]]:
+        """Siguiente frame a enviar; None si el cliente fue desconectado."""
+        while not self._control and not self._frames:
+            if self.closed:
+                return None
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._control.popleft() if self._control else self._frames.popleft()
+
+    def mark_sent(self, frame: Union[str, bytes]) -> None:
+        self.sent += 1
+        self.bytes_sent += len(frame)
+        self.last_send_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "legacy": self.legacy,
+            "transport": "sse" if self.sse else "websocket",
+            "subscriptions": [sub.describe() for sub in self.subscriptions.values()],
+            "folded": sum(sub.folded for sub in self.subscriptions.values()),
+            "encoding": self.encoding,
+            "queue_depth": self.depth,
+            "max_depth": self.max_depth,
+            "queue_size": self.queue_size,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "bytes_sent": self.bytes_sent,
+            "lag_s": round(self.lag, 3),
+            "connected_s": round(time.monotonic() - self.connected_at, 1),
+        }
+
+
+class WebSocketHub:
+    """
+    Registro de clientes e índice tópico -> clientes.
+    Cada publicación se codifica una sola vez por formato (sobre / legacy)
+    y se encola (O(1)) en la unión de suscriptores del sensor y del proyecto;
+    la tarea escritora de cada cliente la envía a su ritmo.
+
+    Args:
+        queue_size: Lecturas pendientes por cliente antes de descartar la más vieja
+        send_timeout: Segundos máximos de un envío antes de expulsar al cliente
+        max_lag: Segundos sin enviar con la cola llena antes de expulsar al cliente
+        history_size: Lecturas recientes guardadas por sensor y por proyecto
+        is_online: Estado de conectividad; con internet los clientes legacy no reciben lecturas
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 32,
+        send_timeout: float = 5.0,
+        max_lag: float = 15.0,
+        history_size: int = 100,
+        is_online: Optional[Callable[[], bool]] = None
+    ):
+        self.queue_size = queue_size
+        self.is_online = is_online or (lambda: False)
+        self.history_size = history_size
+        self._history: Dict[str, RingBuffer] = {}
+        self.send_timeout = send_timeout
+        self.max_lag = max_lag
+        self._clients: Dict[WebSocket, HubClient] = {}
+        self._index: Dict[str, Set[HubClient]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.evicted = 0
+        self._dropped_closed = 0  # Descartes de clientes ya desconectados
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+    def attach(
+        self,
+        websocket: WebSocket,
+        topics: Iterable[str] = (),
+        legacy: bool = False,
+        backfill: Union[bool, int] = False,
+        sse: bool = False,
+        max_rate: Any = None,
+        aggregate: Any = None
+    ) -> HubClient:
+        """
+        Registra una conexión ya aceptada y arranca su tarea escritora.
+        Con sse=True no hay tarea escritora: el generador SSE consume la cola (ver core/sse.py).
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            # Control: respuestas y backfill; un resume SSE completo manda hasta history_size frames
+            client = HubClient(websocket=websocket, legacy=legacy, queue_size=self.queue_size, sse=sse,
+                               control_size=self.queue_size + self.history_size)
+            self._clients[websocket] = client
+            if not sse:
+                client.writer = asyncio.create_task(self._writer(client), name=f"ws-writer-{client.id}")
+        if legacy and self.is_online():
+            backfill = False  # Endpoint por sensor con internet: sin lecturas, tampoco historial
+        self.subscribe(websocket, topics, max_rate, aggregate, backfill=backfill)
+        return client
+
+    def detach(self, websocket: WebSocket) -> None:
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        client.closed = True
+        client._wakeup.set()  # Despertar a quien espere en next_frame()
+        self._dropped_closed += client.dropped
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+        for topic in list(client.subscriptions):
+            self._remove(client, topic)
+
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        topics: Iterable[str],
+        max_rate: Any = None,
+        aggregate: Any = None,
+        backfill: Union[bool, int] = False
+    ) -> List[str]:
+        """
+        Suscribe a los tópicos indicados con tasa máxima y agregación opcionales.
+        Re-suscribirse a un tópico actualiza sus opciones.
+        backfill: True = enviar todo el historial del tópico, n = las últimas n lecturas.
+        Lanza TopicError / SubscriptionError si algún parámetro es inválido.
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            return []
+        max_rate, aggregate = validate_options(max_rate, aggregate)
+        normalized = [topic_name(*parse_topic(t)) for t in topics]
+        for topic in normalized:
+            subscription = client.subscriptions.get(topic)
+            if subscription is None:
+                client.subscriptions[topic] = Subscription(topic, max_rate, aggregate)
+                self._index.setdefault(topic, set()).add(client)
+            else:
+                subscription.configure(max_rate, aggregate)
+        if backfill:
+            self._send_backfill(client, normalized, backfill)
+        return normalized
+
+    def _send_backfill(self, client: HubClient, topics: Iterable[str], backfill: Union[bool, int]) -> None:
+        if not backfill:
+            return
+        limit = None if backfill is True else int(backfill)
+        for topic in topics:
+            message = self.backfill_message(topic, limit)
+            if message is not None and not client.enqueue(message, control=True):
+                self._evict(client, "cola de control llena")
+                return
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        client = self._clients.get(websocket)
+        if client is None:
+            return []
+        normalized = [topic_name(*parse_topic(t)) for t in topics]
+        for topic in normalized:
+            self._remove(client, topic)
+        return normalized
+
+    def _remove(self, client: HubClient, topic: str) -> None:
+        subscription = client.subscriptions.pop(topic, None)
+        if subscription is not None:
+            subscription.cancel_timer()
+        subscribers = self._index.get(topic)
+        if subscribers:
+            subscribers.discard(client)
+            if not subscribers:
+                del self._index[topic]
+
+    def subscribers(self, sensor: str, project_id: Optional[int] = None) -> Set[HubClient]:
+        """Unión de suscriptores del sensor y, si aplica, del proyecto."""
+        return set(self._recipients(sensor, project_id))
+
+    def _recipients(self, sensor: str, project_id: Optional[int]) -> Dict[HubClient, Subscription]:
+        """Cliente -> suscripción que aplica (la del proyecto tiene prioridad sobre la del sensor)."""
+        recipients = {client: client.subscriptions[sensor] for client in self._index.get(sensor, ())}
+        if project_id is not None:
+            topic = topic_name(sensor, project_id)
+            for client in self._index.get(topic, ()):
+                recipients[client] = client.subscriptions[topic]
+        return recipients
+
+    def has_subscribers(self, sensor: str) -> bool:
+        return any(t == sensor or t.startswith(f"{sensor}:") for t in self._index)
+
+    # ------------------------------------------------------------------
+    # Publicación
+    # ------------------------------------------------------------------
+    async def publish(self, sensor: str, data: Any, project_id: Optional[int] = None) -> int:
+        """
+        Único punto de publicación de lecturas hacia WebSocket.
+        No espera a ningún socket: solo encola. Las suscripciones con max_rate
+        acumulan y emiten a su ritmo. Retorna el número de clientes alcanzados.
+        /ws y SSE la reciben siempre; los clientes legacy (endpoints por sensor)
+        solo sin internet, como antes del hub.
+        """
+        if project_id is None:
+            project_id = data.get("id_project") if isinstance(data, dict) else getattr(data, "id_project", None)
+        seqs = self.record(sensor, project_id, data)
+        recipients = self._recipients(sensor, project_id)
+        self.published += 1
+        if not recipients:
+            return 0
+
+        frames: Dict[str, Union[str, bytes, None]] = {}  # Frames compartidos de esta publicación
+        now = time.monotonic()
+        delivered = 0
+        online = None
+
+        for client, subscription in recipients.items():
+            if client.legacy:
+                if online is None:
+                    online = self.is_online()
+                if online:
+                    continue
+            if client.depth >= client.queue_size and client.lag > self.max_lag:
+                self._evict(client, f"sin enviar desde hace {client.lag:.0f}s")
+                continue
+            if not subscription.limited:
+                self._deliver(client, sensor, project_id, data, None, frames,
+                              subscription.topic, seqs.get(subscription.topic))
+            else:
+                subscription.add(data, project_id, seqs.get(subscription.topic))
+                wait = subscription.due_in(now)
+                if wait == 0:
+                    self._flush(client, subscription, sensor, now)
+                elif subscription.timer is None:
+                    subscription.timer = asyncio.get_running_loop().call_later(
+                        wait, self._flush, client, subscription, sensor
+                    )
+            delivered += 1
+
+        self.delivered += delivered
+        return delivered
+
+    def _flush(
+        self,
+        client: HubClient,
+        subscription: Subscription,
+        sensor: str,
+        now: Optional[float] = None
+    ) -> None:
+        """Emite lo acumulado en una suscripción con tasa limitada: un mensaje por proyecto."""
+        subscription.timer = None
+        if client.closed:
+            return
+        for project_id, data, meta, seq in subscription.take(now):
+            self._deliver(client, sensor, project_id, data, meta, {} if meta else None,
+                          subscription.topic, seq)
+
+    def _deliver(
+        self,
+        client: HubClient,
+        sensor: str,
+        project_id: Optional[int],
+        data: Any,
+        meta: Optional[dict],
+        frames: Optional[Dict[str, Union[str, bytes, None]]],
+        topic: Optional[str] = None,
+        seq: Optional[int] = None
+    ) -> None:
+        """Encola una lectura en el formato del cliente, reutilizando frames ya codificados."""
+        frames = {} if frames is None else frames
+        if client.sse:
+            key = f"sse:{topic}"
+            if key not in frames:
+                if meta:
+                    frames[key] = sse_frame("aggregate", self._envelope(sensor, project_id, data, meta), seq)
+                else:
+                    frames[key] = sse_frame("reading", to_text(data), seq)
+            client.enqueue(frames[key])
+            return
+        if client.legacy:
+            if "legacy" not in frames:
+                frames["legacy"] = to_text(data)
+            client.enqueue(frames["legacy"])
+            return
+        if client.encoding == ENCODING_DELTA:
+            client.enqueue(client.delta.encode(sensor, project_id, data))
+            return
+        # minmax no cabe en el layout binario: va como JSON
+        if client.encoding == ENCODING_BINARY and not (meta and "min" in meta):
+            if "binary" not in frames:
+                frames["binary"] = encode_binary(sensor, project_id, data)
+            if frames["binary"] is not None:
+                client.enqueue(frames["binary"])
+                return
+        if "json" not in frames:
+            frames["json"] = self._envelope(sensor, project_id, data, meta)
+        client.enqueue(frames["json"])
+
+    # ------------------------------------------------------------------
+    # Historial
+    # ------------------------------------------------------------------
+    def history(self, topic: str) -> RingBuffer:
+        """Buffer circular del tópico (se crea vacío si no existe)."""
+        ring = self._history.get(topic)
+        if ring is None:
+            ring = self._history[topic] = RingBuffer(self.history_size)
+        return ring
+
+    def record(self, sensor: str, project_id: Optional[int], data: Any) -> Dict[str, int]:
+        """Guarda la lectura en el historial del sensor y del proyecto. Retorna {tópico: seq}."""
+        seqs = {sensor: self.history(sensor).append(data)}
+        if project_id is not None:
+            topic = topic_name(sensor, project_id)
+            seqs[topic] = self.history(topic).append(data)
+        return seqs
+
+    def backfill_message(self, topic: str, limit: Optional[int] = None) -> Optional[str]:
+        """Un único mensaje con las lecturas recientes del tópico (None si no hay historial)."""
+        ring = self._history.get(topic)
+        items = ring.latest(limit) if ring else []
+        if not items:
+            return None
+        return dumps({
+            "type": "backfill",
+            "topic": topic,
+            "count": len(items),
+            "last_seq": items[-1][0],
+            "readings": [orjson.Fragment(to_bytes(data)) for _, data in items],
+        }).decode()
+
+    def send_to(self, websocket: WebSocket, payload: Any) -> bool:
+        """
+        Encola un mensaje de control (no se descarta) para un cliente registrado.
+        Si su cola de control está llena (no lee: p. ej. solo manda pings) se expulsa.
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            return False
+        if not client.enqueue(to_text(payload), control=True):
+            self._evict(client, "cola de control llena")
+        return True
+
+    @staticmethod
+    def _envelope(sensor: str, project_id: Optional[int], data: Any, meta: Optional[dict] = None) -> str:
+        """Sobre del hub reutilizando los bytes ya codificados de la lectura."""
+        envelope = {
+            "type": "reading",
+            "topic": sensor,
+            "project_id": project_id,
+            "data": orjson.Fragment(to_bytes(data)),
+        }
+        if meta:
+            envelope["aggregate"] = meta
+        return dumps(envelope).decode()
+
+    async def _writer(self, client: HubClient) -> None:
+        """Tarea escritora: un envío a la vez por cliente, con timeout."""
+        try:
+            while True:
+                frame = await client.next_frame()
+                if frame is None:
+                    return
+                try:
+                    send = client.websocket.send_bytes(frame) if isinstance(frame, bytes) else client.websocket.send_text(frame)
+                    await asyncio.wait_for(send, timeout=self.send_timeout)
+                except asyncio.TimeoutError:
+                    self._evict(client, f"envío bloqueado más de {self.send_timeout:g}s")
+                    return
+                except (WebSocketDisconnect, RuntimeError):
+                    self.detach(client.websocket)
+                    return
+                except Exception as e:
+                    print(f"❌ WS hub: error enviando al cliente {client.id}: {e}")
+                    self.detach(client.websocket)
+                    return
+                client.mark_sent(frame)
+        except asyncio.CancelledError:
+            pass
+
+    def _evict(self, client: HubClient, reason: str) -> None:
+        """Expulsa a un cliente atascado y cierra su socket en segundo plano."""
+        if client.closed:
+            return
+        print(f"🐢 WS hub: expulsando cliente {client.id} ({reason}) - descartados: {client.dropped}")
+        self.evicted += 1
+        self.detach(client.websocket)
+        asyncio.create_task(self._close_quietly(client.websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=1013, reason="Cliente demasiado lento"), timeout=1.0)
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Conexiones del endpoint /ws
+    # ------------------------------------------------------------------
+    async def handle(
+        self,
+        websocket: WebSocket,
+        initial_topics: Iterable[str] = (),
+        encoding: str = ENCODING_JSON,
+        max_rate: Any = None,
+        aggregate: Any = None,
+        backfill: Union[bool, int] = True
+    ) -> None:
+        """Ciclo de vida completo de un cliente del hub."""
+        await websocket.accept()
+        self.attach(websocket)
+        try:
+            try:
+                subscribed = self.subscribe(websocket, initial_topics, max_rate, aggregate)
+            except (TopicError, SubscriptionError) as e:
+                subscribed = []
+                self._reply(websocket, {"type": "error", "message": str(e)})
+            print(f"🔗 Cliente WebSocket conectado (hub) - Total: {len(self._clients)}")
+            self._reply(websocket, {
+                "type": "welcome",
+                "topics": list(SENSOR_TOPICS),
+                "subscriptions": sorted(subscribed),
+            })
+            if encoding != ENCODING_JSON:
+                self._set_encoding(websocket, encoding)
+            self._send_backfill(self._clients[websocket], subscribed, backfill)
+            while True:
+                raw = await websocket.receive_text()
+                await self._handle_message(websocket, raw)
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            print(f"❌ WS hub: error en la conexión: {e}")
+        finally:
+            self.detach(websocket)
+            print(f"🔌 Cliente WebSocket desconectado (hub) - Restantes: {len(self._clients)}")
+
+    async def _handle_message(self, websocket: WebSocket, raw: str) -> None:
+        try:
+            message = loads(raw)
+        except orjson.JSONDecodeError:
+            self._reply(websocket, {"type": "error", "message": "Mensaje no es JSON válido"})
+            return
+        if not isinstance(message, dict):
+            self._reply(websocket, {"type": "error", "message": "Se esperaba un objeto JSON"})
+            return
+
+        action = message.get("action")
+        topics = message.get("topics") or []
+        if isinstance(topics, str):
+            topics = [topics]
+
+        try:
+            if action == "subscribe":
+                subscribed = self.subscribe(websocket, topics, message.get("max_rate"), message.get("aggregate"))
+                client = self._clients.get(websocket)
+                if client:
+                    self._reply(websocket, {
+                        "type": "subscribed",
+                        "topics": subscribed,
+                        "options": [client.subscriptions[t].describe() for t in subscribed],
+                    })
+                    self._send_backfill(client, subscribed, message.get("backfill", True))
+            elif action == "unsubscribe":
+                self._reply(websocket, {"type": "unsubscribed", "topics": self.unsubscribe(websocket, topics)})
+            elif action == "list":
+                client = self._clients.get(websocket)
+                self._reply(websocket, {
+                    "type": "subscriptions",
+                    "subscriptions": [sub.describe() for sub in client.subscriptions.values()] if client else [],
+                })
+            elif action == "ping":
+                self._reply(websocket, {"type": "pong"})
+            elif action == "encoding":
+                self._set_encoding(websocket, message.get("encoding"))
+            else:
+                self._reply(websocket, {"type": "error", "message": f"Acción desconocida: {action}"})
+        except (TopicError, SubscriptionError) as e:
+            self._reply(websocket, {"type": "error", "message": str(e)})
+
+    def _set_encoding(self, websocket: WebSocket, encoding: Any) -> None:
+        """Negocia la codificación de lecturas y envía el esquema una sola vez."""
+        client = self._clients.get(websocket)
+        if client is None:
+            return
+        if encoding not in ENCODINGS:
+            self._reply(websocket, {
+                "type": "error",
+                "message": f"Codificación no soportada: {encoding}. Disponibles: {', '.join(ENCODINGS)}"
+            })
+            return
+        client.set_encoding(encoding)
+        self._reply(websocket, schema_message(encoding))
+
+    def _reply(self, websocket: WebSocket, payload: dict) -> None:
+        self.send_to(websocket, payload)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def get_stats(self) -> dict:
+        clients = list(self._clients.values())
+        return {
+            "clients": len(clients),
+            "legacy_clients": sum(1 for c in clients if c.legacy),
+            "sse_clients": sum(1 for c in clients if c.sse),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self._dropped_closed + sum(c.dropped for c in clients),
+            "evicted": self.evicted,
+            "queue_size": self.queue_size,
+            "topics": {topic: len(subs) for topic, subs in sorted(self._index.items())},
+            "history": {topic: len(ring) for topic, ring in sorted(self._history.items())},
+            "per_client": [c.snapshot() for c in clients],
+        }
+
+
+# Instancia global
+ws_hub = WebSocketHub(is_online=lambda: connectivity_monitor.is_online)
+
@@ -0,0 +1,29 @@
+# core/ws_routes.py
+from typing import Optional
+from fastapi import APIRouter, WebSocket
+from core.ws_hub import ws_hub
+
+router_ws_hub = APIRouter()
+
+@router_ws_hub.websocket("/ws")
+async def sensors_ws(
+    websocket: WebSocket,
+    topics: str = "",
+    encoding: str = "json",
+    max_rate: Optional[float] = None,
+    aggregate: Optional[str] = None,
+    backfill: Optional[int] = None
+):
+    """
+    Hub multiplexado de lecturas. Suscripción, codificación y tasa iniciales opcionales:
+    /ws?topics=tfluna,mpu6050:3&encoding=binary&max_rate=2&aggregate=mean&backfill=20
+    backfill: lecturas recientes a enviar al suscribirse (por defecto todas, 0 = ninguna)
+    """
+    await ws_hub.handle(
+        websocket,
+        [t for t in topics.split(",") if t.strip()],
+        encoding=encoding,
+        max_rate=max_rate,
+        aggregate=aggregate,
+        backfill=True if backfill is None else backfill
+    )
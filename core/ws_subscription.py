@@ -0,0 +1,169 @@
+# core/ws_subscription.py
+"""
+Control de tasa por suscripción para el hub WebSocket.
+
+Cada suscripción (cliente + tópico) puede pedir una tasa máxima y un modo de
+agregación sobre el intervalo 1/max_rate:
+    latest: solo la última lectura del intervalo (decimación)
+    mean:   promedio de los campos numéricos; el resto, de la última lectura
+    minmax: última lectura + mínimos y máximos de los campos numéricos
+
+Sin max_rate la suscripción recibe cada lectura publicada. En un tópico de
+sensor sin proyecto ("tfluna") se acumula por separado cada id_project: al
+cerrar el intervalo se emite un agregado por proyecto, nunca mezclados.
+"""
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from core.ws_codec import reading_values
+
+AGGREGATE_LATEST = "latest"
+AGGREGATE_MEAN = "mean"
+AGGREGATE_MINMAX = "minmax"
+AGGREGATES = (AGGREGATE_LATEST, AGGREGATE_MEAN, AGGREGATE_MINMAX)
+
+MAX_RATE_LIMIT = 50.0  # Hz
+_NON_AGGREGATED = ("id", "id_project", "measurement_count")
+
+
+class SubscriptionError(ValueError):
+    """Parámetros de suscripción inválidos."""
+
+
+def validate_options(max_rate: Any = None, aggregate: Any = None) -> tuple:
+    """Normaliza (max_rate, aggregate). Lanza SubscriptionError si no son válidos."""
+    if max_rate in (None, "", 0):
+        max_rate = None
+    else:
+        try:
+            max_rate = float(max_rate)
+        except (TypeError, ValueError):
+            raise SubscriptionError(f"max_rate inválido: {max_rate}")
+        if max_rate <= 0 or max_rate > MAX_RATE_LIMIT:
+            raise SubscriptionError(f"max_rate debe estar entre 0 y {MAX_RATE_LIMIT:g} Hz")
+    aggregate = aggregate or AGGREGATE_LATEST
+    if aggregate not in AGGREGATES:
+        raise SubscriptionError(f"Agregación no soportada: {aggregate}. Disponibles: {', '.join(AGGREGATES)}")
+    return max_rate, aggregate
+
+
+def _is_numeric(key: str, value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and key not in _NON_AGGREGATED
+
+
+class Emission(NamedTuple):
+    project_id: Optional[int]
+    data: Any
+    meta: Optional[dict]
+    seq: Optional[int]  # seq del historial de la última lectura (ids SSE)
+
+
+class _Window:
+    """Acumulador del intervalo en curso para un proyecto."""
+
+    __slots__ = ("count", "latest", "latest_seq", "sums", "mins", "maxs")
+
+    def __init__(self):
+        self.count = 0
+        self.latest = None
+        self.latest_seq = None
+        self.sums: Dict[str, float] = {}
+        self.mins: Dict[str, float] = {}
+        self.maxs: Dict[str, float] = {}
+
+
+class Subscription:
+    """Estado de una suscripción: opciones y acumuladores (por proyecto) del intervalo en curso."""
+
+    __slots__ = (
+        "topic", "max_rate", "aggregate", "interval", "last_emit", "timer",
+        "pending", "emitted", "folded",
+    )
+
+    def __init__(self, topic: str, max_rate: Optional[float] = None, aggregate: str = AGGREGATE_LATEST):
+        self.topic = topic
+        self.timer = None
+        self.emitted = 0
+        self.folded = 0  # Lecturas absorbidas por la agregación/decimación
+        self.configure(max_rate, aggregate)
+
+    def configure(self, max_rate: Optional[float], aggregate: str) -> None:
+        self.max_rate = max_rate
+        self.aggregate = aggregate
+        self.interval = 1.0 / max_rate if max_rate else 0.0
+        self.last_emit = 0.0
+        self.cancel_timer()
+        self._reset()
+
+    @property
+    def limited(self) -> bool:
+        return self.max_rate is not None
+
+    def _reset(self) -> None:
+        self.pending: Dict[Optional[int], _Window] = {}
+
+    def cancel_timer(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def add(self, data: Any, project_id: Optional[int] = None, seq: Optional[int] = None) -> None:
+        """Acumula una lectura en el intervalo en curso de su proyecto."""
+        window = self.pending.get(project_id)
+        if window is None:
+            window = self.pending[project_id] = _Window()
+        window.count += 1
+        window.latest = data
+        window.latest_seq = seq
+        if self.aggregate == AGGREGATE_LATEST:
+            return
+        for key, value in reading_values(data).items():
+            if not _is_numeric(key, value):
+                continue
+            if self.aggregate == AGGREGATE_MEAN:
+                window.sums[key] = window.sums.get(key, 0.0) + value
+            else:
+                if key not in window.mins or value < window.mins[key]:
+                    window.mins[key] = value
+                if key not in window.maxs or value > window.maxs[key]:
+                    window.maxs[key] = value
+
+    def due_in(self, now: Optional[float] = None) -> float:
+        """Segundos hasta poder emitir (0 = ya)."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.last_emit + self.interval - now)
+
+    def take(self, now: Optional[float] = None) -> List[Emission]:
+        """
+        Cierra el intervalo y retorna una Emission por proyecto con lecturas, en
+        orden de llegada de su última lectura: data es la lectura original
+        (latest) o un dict agregado; meta describe la agregación.
+        """
+        self.cancel_timer()
+        if not self.pending:
+            return []
+        self.last_emit = time.monotonic() if now is None else now
+        emissions = []
+        for project_id, window in self.pending.items():
+            self.emitted += 1
+            self.folded += window.count - 1
+            emissions.append(Emission(project_id, *self._aggregate(window), window.latest_seq))
+        self._reset()
+        emissions.sort(key=lambda e: -1 if e.seq is None else e.seq)
+        return emissions
+
+    def _aggregate(self, window: _Window):
+        count, latest = window.count, window.latest
+        if self.aggregate == AGGREGATE_LATEST:
+            return latest, None
+        if self.aggregate == AGGREGATE_MEAN:
+            data = dict(reading_values(latest))
+            for key, total in window.sums.items():
+                data[key] = round(total / count, 4)
+            return data, {"mode": AGGREGATE_MEAN, "samples": count}
+        return reading_values(latest), {
+            "mode": AGGREGATE_MINMAX, "samples": count, "min": dict(window.mins), "max": dict(window.maxs)
+        }
+
+    def describe(self) -> dict:
+        return {"topic": self.topic, "max_rate": self.max_rate, "aggregate": self.aggregate}
@@ -7,10 +7,15 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 import aiohttp
 from concurrent.futures import ThreadPoolExecutor
 from core.concurrency import connectivity_cache, cleanup as cleanup_concurrency
-from core.config import get_local_engine, get_remote_engine, get_rabbitmq_config
+from core.config import get_local_engine, get_remote_engine, get_rabbitmq_config, add_missing_columns
 from core.cors import setup_cors
-from core.connectivity import is_connected  # Nueva versión async con caché
+from core.connectivity import is_connected, connectivity_monitor  # Nueva versión async con caché + monitor de transiciones
 from core.rabbitmq_pool import init_rabbitmq_pool, stop_rabbitmq_pool  # Pool de conexiones
+from core.broker_transport import create_transport
+from core.serialization import ORJSONResponse
+from core.sampler import start_samplers, stop_samplers, samplers_stats
+from core.simulation import simulated_sensors
+from core.stream_log import close_stream_logs, get_recorder, get_replay_log
 from TFLuna.infraestructure.sync.sync_service import sync_tf_pending_data
 from IMX477.infraestructure.sync.sync_service import sync_imx_pending_data
 from MPU6050.infraestructure.sync.sync_service import sync_mpu_pending_data
@@ -20,12 +25,14 @@ from TFLuna.infraestructure.dependencies import init_tf_dependencies
 from IMX477.infraestructure.dependencies import init_imx_dependencies
 from MPU6050.infraestructure.dependencies import init_mpu_dependencies
 from HCSR04.infraestructure.dependencies import init_hc_dependencies
+from Snapshot.infraestructure.dependencies import init_snapshot_dependencies
 
 from TFLuna.infraestructure.routes.routes_tf import router as tf_router
 from IMX477.infraestructure.routes.routes_imx import router as imx_router
 from IMX477.infraestructure.routes.streaming_routes import router as streaming_router
 from MPU6050.infraestructure.routes.routes_mpu import router as mpu_router
 from HCSR04.infraestructure.routes.routes_hc import router as hc_router
+from Snapshot.infraestructure.routes.routes_snapshot import router as snapshot_router
 
 from TFLuna.infraestructure.repositories.schemas_sqlalchemy import Base as TFBase
 from IMX477.infraestructure.repositories.schemas_sqlalchemy import Base as IMXBase
@@ -37,10 +44,8 @@ from MPU6050.infraestructure.routes.routes_mpu import router_ws_mpu
 from IMX477.infraestructure.routes.routes_imx import router_ws_imx
 from HCSR04.infraestructure.routes.routes_hc import router_ws_hc
 
-from TFLuna.infraestructure.ws.ws_manager import ws_manager
-from MPU6050.infraestructure.ws.ws_manager import ws_manager_mpu
-from IMX477.infraestructure.ws.ws_manager import ws_manager_imx
-from HCSR04.infraestructure.ws.ws_manager import ws_manager_hc
+from core.ws_hub import ws_hub  # Punto único de publicación WebSocket
+from core.ws_routes import router_ws_hub
 
 local_session = get_local_engine()
 remote_session = get_remote_engine()
@@ -85,7 +90,13 @@ async def lifespan(app: FastAPI):
     init_rabbitmq_pool(
         host=rabbitmq_config["host"],
         user=rabbitmq_config["user"],
-        password=rabbitmq_config["pass"]  # La config usa "pass" no "password"
+        password=rabbitmq_config["pass"],  # La config usa "pass" no "password"
+        transport=create_transport(
+            rabbitmq_config["transport"],
+            rabbitmq_config["host"],
+            rabbitmq_config["user"],
+            rabbitmq_config["pass"]
+        )
     )
     
     init_tf_dependencies(app, local_session, remote_session, rabbitmq_config)
@@ -100,6 +111,7 @@ async def lifespan(app: FastAPI):
         device_name="ESP32_SensorBLE",
         char_uuid="beb5483e-36e1-4688-b7f5-ea07361b26a8"
     )
+    init_snapshot_dependencies(app, local_session, rabbitmq_config)
 
     async def create_tables(engine: AsyncEngine):
         async with engine.begin() as conn:
@@ -107,6 +119,8 @@ async def lifespan(app: FastAPI):
             await conn.run_sync(IMXBase.metadata.create_all)
             await conn.run_sync(MPUBase.metadata.create_all)
             await conn.run_sync(HCBase.metadata.create_all)
+            await conn.run_sync(add_missing_columns, TFBase.metadata)
+            await conn.run_sync(add_missing_columns, HCBase.metadata)
 
     await create_tables(local_session.kw["bind"])
 
@@ -121,29 +135,13 @@ async def lifespan(app: FastAPI):
     else:
         print("🔌 Sin conexión: se omitió la creación de tablas remotas :(")
 
-    _cached_internet_status = False
-    _last_connectivity_check = 0
-    
     # Flag para habilitar/deshabilitar tareas de sensores
     ENABLE_SENSOR_TASKS = True  # Cambiar a False para deshabilitar tareas de background
     SENSOR_TASK_INTERVAL = 5    # Segundos entre lecturas de sensores
     
-    async def check_connectivity_periodically():
-        """Tarea dedicada para verificar conectividad cada 30 segundos."""
-        nonlocal _cached_internet_status, _last_connectivity_check
-        import time
-        while True:
-            try:
-                _cached_internet_status = await is_connected()
-                _last_connectivity_check = time.time()
-                print(f"🌐 Conectividad: {'✅ Online' if _cached_internet_status else '❌ Offline'}")
-            except Exception:
-                _cached_internet_status = False
-            await asyncio.sleep(30)  # Reducido a cada 30 segundos
-    
     def get_cached_connectivity():
-        """Obtener estado de conectividad sin bloquear."""
-        return _cached_internet_status
+        """Obtener estado de conectividad sin bloquear (último estado del monitor)."""
+        return connectivity_monitor.is_online
 
     async def tf_task():
         """Tarea de lectura TF-Luna con prioridad baja."""
@@ -158,8 +156,8 @@ async def lifespan(app: FastAPI):
                     data = await controller.get_tf_data(event=False)
                     if data:
                         print("📡 TF-Luna:", data.dict())
-                        if not get_cached_connectivity():
-                            await ws_manager.send_data(data.dict())
+                        # Llega siempre a /ws y SSE; a /tfluna/sensor/ws solo sin internet (filtro del hub)
+                        await ws_hub.publish("tfluna", data)
             except asyncio.TimeoutError:
                 pass  # Silenciar timeouts
             except Exception:
@@ -182,13 +180,13 @@ async def lifespan(app: FastAPI):
                         if frame is not None:
                             controller = app.state.imx_controller
                             data = await controller.get_imx_data(event=False)
-                            if data and not get_cached_connectivity():
-                                await ws_manager_imx.send_data(data.dict())
+                            if data:
+                                await ws_hub.publish("imx477", data)
                     else:
                         controller = app.state.imx_controller
                         data = await controller.get_imx_data(event=False)
-                        if data and not get_cached_connectivity():
-                            await ws_manager_imx.send_data(data.dict())
+                        if data:
+                            await ws_hub.publish("imx477", data)
             except (asyncio.TimeoutError, Exception):
                 pass
             await asyncio.sleep(SENSOR_TASK_INTERVAL + 2)  # Más lento que otros
@@ -203,8 +201,8 @@ async def lifespan(app: FastAPI):
                 async with asyncio.timeout(2):
                     controller = app.state.mpu_controller
                     data = await controller.get_mpu_data(event=False)
-                    if data and not get_cached_connectivity():
-                        await ws_manager_mpu.send_data(data.dict())
+                    if data:
+                        await ws_hub.publish("mpu6050", data)
             except (asyncio.TimeoutError, Exception):
                 pass
             await asyncio.sleep(SENSOR_TASK_INTERVAL)
@@ -215,47 +213,33 @@ async def lifespan(app: FastAPI):
         
         controller = app.state.hc_controller
         reader = controller.usecase.reader
-        connection_attempts = 0
-        max_connection_attempts = 3
         
-        print("🔵 HC-SR04: Iniciando tarea de lectura BLE...")
+        async def publish_hc(device_id):
+            async with asyncio.timeout(2):
+                data = await controller.get_hc_data(
+                    project_id=reader.project_for(device_id), event=False, device_id=device_id
+                )
+                if data:
+                    await ws_hub.publish("hcsr04", data)
         
-        # Intentar conexión inicial
-        while connection_attempts < max_connection_attempts:
-            await asyncio.sleep(0)  # Ceder event loop
-            print(f"🔵 HC-SR04: Intento de conexión {connection_attempts + 1}/{max_connection_attempts}")
-            try:
-                async with asyncio.timeout(5):
-                    if await reader.connect():
-                        print("HC-SR04: Conexión inicial establecida")
-                        break
-            except asyncio.TimeoutError:
-                print("HC-SR04: Timeout en conexión")
-            connection_attempts += 1
-            if connection_attempts < max_connection_attempts:
-                await asyncio.sleep(10)
-        
-        if connection_attempts >= max_connection_attempts:
-            print("HC-SR04: No se pudo establecer conexión inicial")
+        print("🔵 HC-SR04: Iniciando tarea de lectura BLE...")
+        # El gestor BLE descubre los nodos y cada uno tiene su supervisor de conexión
+        # (directo a la dirección conocida, luego escaneo dirigido, con backoff);
+        # esta tarea solo lee y publica
+        reader.start()
         
         # Loop principal con prioridad baja
         while True:
             try:
                 await asyncio.sleep(0)  # Ceder event loop PRIMERO
                 
-                if not reader.is_connected:
-                    await asyncio.sleep(15)  # Esperar más si no hay conexión
-                    try:
-                        async with asyncio.timeout(5):
-                            await reader.connect()
-                    except asyncio.TimeoutError:
-                        pass
-                    continue
-                
-                async with asyncio.timeout(2):
-                    data = await controller.get_hc_data(project_id=1, event=False)
-                    if data and not get_cached_connectivity():
-                        await ws_manager_hc.send_data(data.dict())
+                # Cada nodo con su propio timeout: uno lento no retrasa a los demás
+                devices = reader.connected_devices()
+                if devices:
+                    await asyncio.gather(
+                        *(publish_hc(device_id) for device_id in devices),
+                        return_exceptions=True
+                    )
                                                                                 
             except asyncio.CancelledError:
                 break
@@ -265,10 +249,9 @@ async def lifespan(app: FastAPI):
             await asyncio.sleep(SENSOR_TASK_INTERVAL + 1)
         
         try:
-            if reader.is_connected:
-                await reader.disconnect()
-                print("🔵 HC-SR04: Desconectado al finalizar tarea")
-        except:
+            await reader.stop()
+            print("🔵 HC-SR04: Desconectado al finalizar tarea")
+        except Exception:
             pass
 
     async def sync_tf():
@@ -315,8 +298,11 @@ async def lifespan(app: FastAPI):
                 print(f"Error en sync HC-SR04: {e}")
                 await asyncio.sleep(30)
 
-    print("Creando tarea de verificación de conectividad...")
-    asyncio.create_task(check_connectivity_periodically())
+    print("Creando monitor de conectividad...")
+    connectivity_monitor.start(interval=10)  # Un solo sondeo; los suscriptores reaccionan a las transiciones
+    
+    # Un dueño por sensor (sampler o hilo del lector): peticiones y tareas leen de su buffer
+    start_samplers()
     
     if ENABLE_SENSOR_TASKS:
         print("Creando tareas de sensores (HABILITADAS)...")
@@ -336,6 +322,12 @@ async def lifespan(app: FastAPI):
     print("📷 Streaming de IMX477 listo para usar")
     yield
     print("Cerrando aplicación...")
+    connectivity_monitor.stop()
+    await stop_samplers()
+    for reader_name in ("tf_reader", "mpu_reader", "imx_reader", "tf_simulator"):
+        if getattr(app.state, reader_name, None):
+            getattr(app.state, reader_name).stop()
+    close_stream_logs()
     cleanup_concurrency()
     print("🐰 Cerrando pool de RabbitMQ...")
     stop_rabbitmq_pool()
@@ -344,7 +336,8 @@ app = FastAPI(
     title="Raspberry Pi Sensor API",
     description="API para sensores IMX477, TF-Luna, MPU6050 con streaming de video en tiempo real",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # ============================================
@@ -456,6 +449,7 @@ app.add_middleware(
     max_age=600,
 )
 
+app.include_router(router_ws_hub)
 app.include_router(router_ws_tf)
 app.include_router(router_ws_mpu)
 app.include_router(router_ws_imx)
@@ -466,6 +460,7 @@ app.include_router(imx_router, tags=["IMX477"])
 app.include_router(streaming_router, tags=["Streaming"])
 app.include_router(mpu_router, tags=["MPU6050"])
 app.include_router(hc_router, tags=["HC-SR04"])
+app.include_router(snapshot_router, tags=["Snapshot"])
 
 @app.get("/")
 def root():
@@ -485,6 +480,7 @@ def root():
                 "status": "/imx477/streaming/status"
             },
             "mpu6050": "/mpu6050/",
+            "websocket": "/ws?topics=tfluna,mpu6050,hcsr04,imx477",
             "health": "/health",
             "ping": "/ping"
         }
@@ -565,6 +561,7 @@ async def get_metrics():
         DB_SEMAPHORE_LOCAL, DB_SEMAPHORE_REMOTE,
         RATE_LIMITERS, connectivity_cache
     )
+    from core.rabbitmq_pool import get_rabbitmq_pool
     
     return {
         "semaphores": {
@@ -591,7 +588,18 @@ async def get_metrics():
             "is_cached": connectivity_cache.get() is not None,
             "cached_value": connectivity_cache.get(),
             "ttl_seconds": connectivity_cache._ttl
-        }
+        },
+        "connectivity_monitor": connectivity_monitor.get_status(),
+        "rabbitmq": get_rabbitmq_pool().get_metrics(),
+        "websocket": ws_hub.get_stats(),
+        "tfluna_reader": app.state.tf_reader.get_stats() if getattr(app.state, "tf_reader", None) else None,
+        "mpu_sampler": app.state.mpu_reader.get_stats() if getattr(app.state, "mpu_reader", None) else None,
+        "hc_ble": app.state.hc_reader.get_stats() if getattr(app.state, "hc_reader", None) else None,
+        "imx_camera": app.state.imx_reader.get_stats() if getattr(app.state, "imx_reader", None) else None,
+        "samplers": samplers_stats(),
+        "simulated_sensors": simulated_sensors(),
+        "stream_recorder": get_recorder().get_stats() if get_recorder() else None,
+        "stream_replay": get_replay_log().path if get_replay_log() else None
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""
+Pruebas de la alineación temporal de muestras del snapshot.
+Ejecutar: python -m pytest -q test_alignment.py
+"""
+from Snapshot.domain.services.alignment import align, nearest
+
+
+def test_nearest_elige_la_muestra_mas_cercana():
+    candidates = [(1.0, "a"), (2.0, "b"), (3.0, "c")]
+    assert nearest(candidates, 0.5) == (1.0, "a")
+    assert nearest(candidates, 2.4) == (2.0, "b")
+    assert nearest(candidates, 2.6) == (3.0, "c")
+    assert nearest(candidates, 9.0) == (3.0, "c")
+
+
+def test_align_usa_el_ultimo_instante_cubierto_por_todos():
+    channels = {
+        "tfluna": [(10.000, 1), (10.012, 2), (10.030, 3)],
+        "mpu6050": [(10.000, "a"), (10.005, "b"), (10.010, "c"), (10.015, "d")],
+    }
+    result = align(channels, tolerance_ms=20)
+    assert result.timestamp == 10.015
+    assert result.samples["mpu6050"].value == "d"
+    assert result.samples["tfluna"].value == 2
+    assert result.samples["tfluna"].skew_ms == -3.0
+    assert result.missing == []
+    assert result.stale == []
+
+
+def test_align_excluye_canales_fuera_de_tolerancia():
+    channels = {
+        "tfluna": [(10.0, 1)],
+        "imx477": [(10.5, "frame")],
+    }
+    result = align(channels, tolerance_ms=100)
+    assert result.timestamp == 10.0
+    assert "tfluna" in result.samples
+    assert result.missing == ["imx477"]
+    assert result.skew_ms["imx477"] == 500.0
+
+
+def test_align_canales_vacios_y_viejos():
+    channels = {
+        "tfluna": [(9.0, 1), (10.2, 2)],
+        "mpu6050": [(9.5, "a")],   # Todo anterior a not_before
+        "hcsr04/nodo": [],
+    }
+    result = align(channels, tolerance_ms=50, not_before=10.0)
+    assert result.timestamp == 10.2
+    assert list(result.samples) == ["tfluna"]
+    assert result.stale == ["mpu6050"]
+    assert set(result.missing) == {"mpu6050", "hcsr04/nodo"}
+
+
+def test_align_sin_datos():
+    result = align({"tfluna": []}, tolerance_ms=50)
+    assert result.timestamp is None
+    assert result.samples == {}
+    assert result.missing == ["tfluna"]
@@ -0,0 +1,30 @@
+"""
+Pruebas del broker AMQP simulado en memoria (RABBITMQ_TRANSPORT=memory).
+Ejecutar: python -m pytest -q test_broker_transport.py
+"""
+from pika.exceptions import NackError
+
+from core.broker_transport import InMemoryBrokerTransport
+
+
+def publish_all(transport, count):
+    nacks = 0
+    for _ in range(count):
+        try:
+            transport.publish("amq.topic", "tfluna", b"{}")
+        except NackError:
+            nacks += 1
+    return nacks
+
+
+def test_nack_no_encola_el_mensaje():
+    transport = InMemoryBrokerTransport(consumer_rate=1, nack_probability=0.5, seed=7)
+    transport.connect()
+    try:
+        nacks = publish_all(transport, 100)
+        assert 0 < nacks < 100
+        assert transport.received == 100 - nacks
+        assert transport.backlog + transport.consumed == transport.received
+    finally:
+        transport.shutdown()
+
@@ -0,0 +1,63 @@
+"""
+Pruebas del decode de notificaciones BLE del HC-SR04 (binario y JSON).
+Ejecutar: python -m pytest -q test_hc_ble_decode.py
+"""
+import struct
+
+import pytest
+
+from HCSR04.infraestructure.ble.hc_ble_reader import BINARY_MAGIC, NO_ECHO, HCBLEReader
+
+
+def notification(seq: int, distances_mm, interval_ms: int = 50) -> bytes:
+    header = struct.pack("<BBHH", BINARY_MAGIC, len(distances_mm), seq, interval_ms)
+    return header + struct.pack(f"<{len(distances_mm)}H", *distances_mm)
+
+
+def reader() -> HCBLEReader:
+    return HCBLEReader(device_id="nodo-1")
+
+
+def test_lote_binario_con_timestamps_espaciados():
+    hc = reader()
+    hc._notification_handler(None, notification(1, [1000, 1010, 1025]))
+    samples = hc.window()
+    assert [s.distancia_cm for s in samples] == [100.0, 101.0, 102.5]
+    assert samples[1].timestamp - samples[0].timestamp == pytest.approx(0.05)
+    assert hc.latest().distancia_cm == 102.5
+    assert hc.stats["binary"] == 1
+
+
+def test_sin_eco_y_fuera_de_rango_se_descartan():
+    hc = reader()
+    hc._notification_handler(None, notification(1, [NO_ECHO, 0, 5000, 1500]))
+    assert [s.distancia_cm for s in hc.window()] == [150.0]
+    assert hc.stats["invalid_samples"] == 3
+
+
+def test_seq_cuenta_notificaciones_perdidas_y_reinicios():
+    hc = reader()
+    hc._notification_handler(None, notification(0xFFFE, [1000]))
+    hc._notification_handler(None, notification(1, [1000]))   # Se perdieron 0xFFFF y 0x0000
+    assert hc.stats["lost_notifications"] == 2
+    hc._notification_handler(None, notification(0, [1000]))   # Reinicio de la ESP32
+    assert hc.stats["lost_notifications"] == 2
+
+
+def test_formato_json_anterior():
+    hc = reader()
+    hc._notification_handler(None, b'{"distance": 42.5}')
+    hc._notification_handler(None, b'{"distance": [10, 20]}')
+    hc._notification_handler(None, b'{"otro": 1}')
+    assert [s.distancia_cm for s in hc.window()] == [42.5, 10.0, 20.0]
+    assert hc.stats["json"] == 3
+    assert hc.stats["invalid_samples"] == 1
+
+
+def test_payload_invalido_cuenta_error_de_decode():
+    hc = reader()
+    hc._notification_handler(None, b"\x00\x01")
+    hc._notification_handler(None, bytes((BINARY_MAGIC, 4, 0)))  # Cabecera cortada
+    hc._notification_handler(None, b"{no es json")
+    assert hc.stats["decode_errors"] == 3
+    assert hc.samples.total == 0
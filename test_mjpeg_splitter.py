@@ -0,0 +1,37 @@
+"""
+Pruebas del separador de frames MJPEG del daemon de captura de la IMX477.
+Ejecutar: python -m pytest -q test_mjpeg_splitter.py
+"""
+from IMX477.infraestructure.camera.capture_daemon import EOI, SOI, MJPEGSplitter
+
+
+def jpeg(body: bytes) -> bytes:
+    return SOI + body + EOI
+
+
+def test_separa_frames_completos():
+    splitter = MJPEGSplitter()
+    assert splitter.feed(jpeg(b"uno") + jpeg(b"dos")) == [jpeg(b"uno"), jpeg(b"dos")]
+    assert splitter.truncated == 0
+
+
+def test_frame_repartido_en_varios_chunks():
+    splitter = MJPEGSplitter()
+    data = b"basura" + jpeg(b"frame")
+    frames = []
+    for i in range(len(data)):
+        frames += splitter.feed(data[i:i + 1])  # Byte a byte: marcadores partidos incluidos
+    assert frames == [jpeg(b"frame")]
+
+
+def test_soi_antes_del_eoi_descarta_el_frame_cortado():
+    splitter = MJPEGSplitter()
+    assert splitter.feed(SOI + b"cortado" + jpeg(b"entero")) == [jpeg(b"entero")]
+    assert splitter.truncated == 1
+
+
+def test_buffer_sin_eoi_se_descarta_al_superar_el_maximo():
+    splitter = MJPEGSplitter(max_buffer=16)
+    assert splitter.feed(SOI + b"x" * 32) == []
+    assert splitter.truncated == 1
+    assert splitter.feed(jpeg(b"ok")) == [jpeg(b"ok")]
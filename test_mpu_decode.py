@@ -0,0 +1,54 @@
+"""
+Pruebas del decode de la FIFO del MPU6050 y de la composición de calibraciones.
+Ejecutar: python -m pytest -q test_mpu_decode.py
+"""
+import numpy as np
+
+from MPU6050.domain.services.calibration import MPUCalibration
+from MPU6050.infraestructure.serial.mpu_serial_reader import (
+    ACCEL_SCALE, GYRO_SCALE, MAX_BATCH, MPUSerialReader, decode_fifo,
+)
+
+
+def fifo_bytes(*samples) -> bytes:
+    return np.array(samples, dtype=">i2").tobytes()
+
+
+def test_decode_sin_calibrar_aplica_la_escala_nominal():
+    raw = fifo_bytes((16384, -8192, 0, 131, -262, 0), (0, 0, 16384, 0, 0, 1310))
+    gain = 1.0 / np.array([ACCEL_SCALE] * 3 + [GYRO_SCALE] * 3)
+    out = np.empty((MAX_BATCH, 6))
+    values = decode_fifo(raw, gain, np.zeros(6), out)
+    assert values.shape == (2, 6)
+    assert np.shares_memory(values, out)
+    np.testing.assert_allclose(values, [[1, -0.5, 0, 1, -2, 0], [0, 0, 1, 0, 0, 10]])
+
+
+def test_decode_aplica_la_calibracion_del_lector():
+    calibration = MPUCalibration(device_id="mpu", accel_bias=[0.1, 0.0, -0.05], accel_scale=[2.0, 1.0, 1.0],
+                                 gyro_bias=[1.0, 0.0, -1.0], method="six_position")
+    reader = MPUSerialReader.__new__(MPUSerialReader)  # Sin bus ni hilo de muestreo: solo la corrección
+    reader.set_calibration(calibration)
+    gain, offset = reader._correction
+    raw = fifo_bytes((16384, 16384, 16384, 131, 131, 131))
+    values = decode_fifo(raw, gain, offset, np.empty((1, 6)))
+    # accel = (a - bias) / escala ; gyro = g - bias
+    np.testing.assert_allclose(values[0], [(1 - 0.1) / 2, 1.0, 1.05, 0.0, 1.0, 2.0])
+
+    reader.set_calibration(None)
+    gain, offset = reader._correction
+    np.testing.assert_allclose(decode_fifo(raw, gain, offset, np.empty((1, 6)))[0], [1, 1, 1, 1, 1, 1])
+
+
+def test_compose_equivale_a_aplicar_ambas_correcciones():
+    current = MPUCalibration(device_id="mpu", accel_bias=[0.02, -0.01, 0.03], accel_scale=[1.01, 0.99, 1.02],
+                             gyro_bias=[0.5, -0.3, 0.1], method="level")
+    extra_bias, extra_scale, extra_gyro = [0.01, 0.02, -0.01], [1.005, 1.0, 0.995], [0.05, 0.0, -0.02]
+    composed = current.compose(extra_bias, extra_scale, extra_gyro)
+
+    raw = np.array([0.7, -0.4, 1.1, 3.0, -2.0, 0.5])
+    gain, offset = current.gain_offset()
+    once = raw * gain - offset
+    twice = np.concatenate(((once[:3] - extra_bias) / extra_scale, once[3:] - extra_gyro))
+    gain, offset = composed.gain_offset()
+    np.testing.assert_allclose(raw * gain - offset, twice, atol=1e-5)
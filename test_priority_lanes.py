@@ -0,0 +1,54 @@
+"""
+Pruebas de los carriles de prioridad del pool de publicación RabbitMQ.
+Ejecutar: python -m pytest -q test_priority_lanes.py
+"""
+from core.rabbitmq_pool import (
+    DROP_NEWEST, DROP_OLDEST, LANE_CONTROL, LANE_EVENT, LANE_TELEMETRY,
+    LaneConfig, PriorityLanes, PublishMessage,
+)
+
+
+def message(name: str, lane: str) -> PublishMessage:
+    return PublishMessage(routing_key=name, body={}, lane=lane)
+
+
+def drain(lanes: PriorityLanes, count: int):
+    return [lanes.get(timeout=0).routing_key for _ in range(count)]
+
+
+def test_drenado_ponderado_no_deja_sin_servicio_a_la_telemetria():
+    lanes = PriorityLanes({
+        LANE_CONTROL: LaneConfig(capacity=10, weight=2),
+        LANE_TELEMETRY: LaneConfig(capacity=10, weight=1),
+    })
+    for i in range(4):
+        lanes.put(LANE_CONTROL, message(f"c{i}", LANE_CONTROL))
+        lanes.put(LANE_TELEMETRY, message(f"t{i}", LANE_TELEMETRY))
+    assert drain(lanes, 8) == ["c0", "c1", "t0", "c2", "c3", "t1", "t2", "t3"]
+    assert lanes.get(timeout=0) is None
+
+
+def test_carril_vacio_cede_su_turno():
+    lanes = PriorityLanes({
+        LANE_EVENT: LaneConfig(capacity=10, weight=4),
+        LANE_TELEMETRY: LaneConfig(capacity=10, weight=1),
+    })
+    for i in range(3):
+        lanes.put(LANE_TELEMETRY, message(f"t{i}", LANE_TELEMETRY))
+    assert drain(lanes, 3) == ["t0", "t1", "t2"]
+
+
+def test_politicas_de_descarte():
+    lanes = PriorityLanes({
+        LANE_EVENT: LaneConfig(capacity=2, weight=1, drop_policy=DROP_NEWEST),
+        LANE_TELEMETRY: LaneConfig(capacity=2, weight=1, drop_policy=DROP_OLDEST),
+    })
+    for name in ("e0", "e1"):
+        assert lanes.put(LANE_EVENT, message(name, LANE_EVENT)) == (True, None)
+    assert lanes.put(LANE_EVENT, message("e2", LANE_EVENT)) == (False, None)
+
+    lanes.put(LANE_TELEMETRY, message("t0", LANE_TELEMETRY))
+    lanes.put(LANE_TELEMETRY, message("t1", LANE_TELEMETRY))
+    accepted, evicted = lanes.put(LANE_TELEMETRY, message("t2", LANE_TELEMETRY))
+    assert accepted and evicted.routing_key == "t0"
+    assert sorted(drain(lanes, 4)) == ["e0", "e1", "t1", "t2"]
@@ -0,0 +1,70 @@
+"""
+Pruebas de los buffers circulares SampleRing y ArrayRing (vuelta completa incluida).
+Ejecutar: python -m pytest -q test_sample_ring.py
+"""
+import numpy as np
+import pytest
+
+from core.sample_ring import ArrayRing, SampleRing
+
+
+def test_sample_ring_vacio():
+    ring = SampleRing(4)
+    assert ring.latest() is None
+    assert ring.window() == []
+    assert len(ring) == 0
+
+
+def test_sample_ring_da_la_vuelta():
+    ring = SampleRing(4)
+    for i in range(10):
+        ring.push((i,))
+    assert ring.latest() == (9,)
+    assert ring.window() == [(6,), (7,), (8,), (9,)]
+    assert ring.window(2) == [(8,), (9,)]
+    assert ring.window(100) == ring.window()
+    assert ring.window(0) == []
+    assert ring.total == 10
+    assert len(ring) == 4
+
+
+def test_sample_ring_capacidad_invalida():
+    with pytest.raises(ValueError):
+        SampleRing(0)
+
+
+def rows(start: int, n: int) -> np.ndarray:
+    return np.arange(start, start + n, dtype=np.float64).repeat(2).reshape(n, 2)
+
+
+def test_array_ring_lote_que_cruza_el_final():
+    ring = ArrayRing(5, 2)
+    ring.push_batch(rows(0, 3))
+    ring.push_batch(rows(3, 4))  # Escribe 2 filas al final y 2 al inicio
+    assert ring.total == 7
+    assert ring.window()[:, 0].tolist() == [2, 3, 4, 5, 6]
+    assert ring.latest().tolist() == [6, 6]
+
+
+def test_array_ring_lote_mayor_que_la_capacidad():
+    ring = ArrayRing(4, 2)
+    ring.push_batch(rows(0, 2))
+    ring.push_batch(rows(2, 9))
+    assert ring.total == 11
+    assert ring.window()[:, 0].tolist() == [7, 8, 9, 10]
+    assert ring.window(2)[:, 0].tolist() == [9, 10]
+
+
+def test_array_ring_devuelve_copias():
+    ring = ArrayRing(3, 2)
+    ring.push_batch(rows(0, 2))
+    ring.latest()[0] = -1
+    ring.window()[:] = -1
+    assert ring.window()[:, 0].tolist() == [0, 1]
+
+
+def test_array_ring_lote_vacio():
+    ring = ArrayRing(3, 2)
+    ring.push_batch(np.empty((0, 2)))
+    assert ring.total == 0
+    assert ring.latest() is None
@@ -0,0 +1,52 @@
+"""
+Pruebas de la codificación memorizada de lecturas (core/serialization.py).
+Ejecutar: python -m pytest -q test_serialization.py
+"""
+import gc
+
+from core.serialization import encode_reading, encode_reading_text, encoding_cache, loads
+from core.ws_codec import reading_values
+from TFLuna.domain.entities.sensor_tf import SensorTFLuna
+
+
+def reading(**overrides) -> SensorTFLuna:
+    fields = dict(id_project=1, distancia_cm=120, distancia_m=1.2, fuerza_senal=800, temperatura=31.5)
+    fields.update(overrides)
+    return SensorTFLuna(**fields)
+
+
+def test_codifica_una_sola_vez():
+    sensor = reading()
+    first = encode_reading(sensor)
+    assert encode_reading(sensor) is first
+    assert encode_reading_text(sensor) == first.decode()
+    assert loads(first)["distancia_cm"] == 120
+
+
+def test_el_cache_no_altera_la_entidad():
+    encoded, plain = reading(), reading()
+    encode_reading(encoded)
+    reading_values(encoded)
+    assert encoded == plain
+    assert encoded.model_dump() == plain.model_dump()
+
+
+def test_modificar_la_entidad_invalida_el_cache():
+    sensor = reading()
+    encode_reading_text(sensor)
+    reading_values(sensor)
+    sensor.distancia_cm = 250
+    assert loads(encode_reading(sensor))["distancia_cm"] == 250
+    assert loads(encode_reading_text(sensor))["distancia_cm"] == 250
+    assert reading_values(sensor)["distancia_cm"] == 250
+
+
+def test_la_entrada_se_libera_con_la_instancia():
+    gc.collect()
+    before = len(encoding_cache)
+    sensor = reading()
+    encode_reading(sensor)
+    assert len(encoding_cache) == before + 1
+    del sensor
+    gc.collect()
+    assert len(encoding_cache) == before
@@ -0,0 +1,69 @@
+"""
+Pruebas del log de flujos crudos: ida y vuelta, sesiones anexadas y
+recuperación de un último registro incompleto.
+Ejecutar: python -m pytest -q test_stream_log.py
+"""
+import os
+
+import pytest
+
+from core.stream_log import StreamLog, StreamRecorder
+
+
+def record_session(path, records):
+    recorder = StreamRecorder(str(path))
+    for channel, payload, timestamp in records:
+        recorder.write(channel, payload, timestamp)
+    recorder.close()
+
+
+def read_all(path, channels=None):
+    log = StreamLog(str(path))
+    try:
+        return [(r.timestamp, r.channel, bytes(r.payload)) for r in log.records(channels)], log.truncated
+    finally:
+        log.close()
+
+
+def test_ida_y_vuelta_y_filtro_por_canal(tmp_path):
+    path = tmp_path / "captura.glog"
+    record_session(path, [("tfluna", b"\x59\x59abc", 1.0), ("hcsr04/nodo", b"\xa5", 1.5), ("tfluna", b"def", 2.0)])
+    records, truncated = read_all(path)
+    assert records == [(1.0, "tfluna", b"\x59\x59abc"), (1.5, "hcsr04/nodo", b"\xa5"), (2.0, "tfluna", b"def")]
+    assert not truncated
+    assert read_all(path, ["tfluna"])[0] == [records[0], records[2]]
+
+    log = StreamLog(str(path))
+    assert log.has_channel("hcsr04") and not log.has_channel("hc")
+    assert log.duration() == 1.0
+    log.close()
+
+
+def test_sesiones_anexadas_reusan_los_canales(tmp_path):
+    path = tmp_path / "captura.glog"
+    record_session(path, [("tfluna", b"a", 1.0)])
+    record_session(path, [("mpu6050", b"b", 2.0), ("tfluna", b"c", 3.0)])
+    records, _ = read_all(path)
+    assert [(channel, payload) for _, channel, payload in records] == [("tfluna", b"a"), ("mpu6050", b"b"), ("tfluna", b"c")]
+
+
+def test_registro_cortado_se_ignora_y_se_descarta_al_grabar(tmp_path):
+    path = tmp_path / "captura.glog"
+    record_session(path, [("tfluna", b"completo", 1.0), ("tfluna", b"cortado-por-un-corte-de-luz", 2.0)])
+    os.truncate(path, os.path.getsize(path) - 5)
+
+    records, truncated = read_all(path)
+    assert truncated
+    assert [payload for _, _, payload in records] == [b"completo"]
+
+    record_session(path, [("tfluna", b"nuevo", 3.0)])
+    records, truncated = read_all(path)
+    assert not truncated
+    assert [payload for _, _, payload in records] == [b"completo", b"nuevo"]
+
+
+def test_archivo_que_no_es_un_log(tmp_path):
+    path = tmp_path / "otro.bin"
+    path.write_bytes(b"no es un log de flujos")
+    with pytest.raises(ValueError):
+        StreamLog(str(path))
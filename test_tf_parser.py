@@ -0,0 +1,88 @@
+"""
+Pruebas del parser de tramas TF-Luna y del filtrado robusto de ráfagas.
+Ejecutar: python -m pytest -q test_tf_parser.py
+"""
+import pytest
+
+from TFLuna.domain.services.tf_filter import (
+    ESTIMATOR_TRIMMED_MEAN, TFFilterConfig, robust_filter,
+)
+from TFLuna.infraestructure.serial.tf_serial_reader import TFFrameParser
+
+
+def frame(distance: int, strength: int = 500, temperature: float = 25.0) -> bytes:
+    raw_temp = int((temperature + 256) * 8)
+    body = bytes((0x59, 0x59, distance & 0xFF, distance >> 8, strength & 0xFF, strength >> 8,
+                  raw_temp & 0xFF, raw_temp >> 8))
+    return body + bytes((sum(body) & 0xFF,))
+
+
+def test_parser_decodifica_tramas_validas():
+    parser = TFFrameParser()
+    assert parser.feed(frame(123) + frame(456, 800, 30.5)) == [(123, 500, 25.0), (456, 800, 30.5)]
+    assert parser.frames == 2
+    assert parser.checksum_errors == 0
+    assert parser.bytes_discarded == 0
+
+
+def test_parser_trama_partida_entre_lecturas():
+    parser = TFFrameParser()
+    data = frame(321)
+    assert parser.feed(data[:4]) == []
+    assert parser.feed(data[4:]) == [(321, 500, 25.0)]
+
+
+def test_parser_cabecera_partida_conserva_el_primer_byte():
+    parser = TFFrameParser()
+    data = frame(200)
+    assert parser.feed(b"\x00\x01" + data[:1]) == []
+    assert parser.bytes_discarded == 2
+    assert parser.feed(data[1:]) == [(200, 500, 25.0)]
+
+
+def test_parser_se_resincroniza_tras_basura():
+    parser = TFFrameParser()
+    assert parser.feed(b"\x10\x20\x59\x30" + frame(150)) == [(150, 500, 25.0)]
+    assert parser.bytes_discarded == 4
+
+
+def test_parser_descarta_checksum_invalido():
+    parser = TFFrameParser()
+    corrupt = bytearray(frame(100))
+    corrupt[8] ^= 0xFF
+    assert parser.feed(bytes(corrupt) + frame(101)) == [(101, 500, 25.0)]
+    assert parser.checksum_errors >= 1
+    assert parser.frames == 1
+
+
+def test_filtro_descarta_outliers_por_mad():
+    distances = [100, 101, 99, 100, 102, 100, 500]
+    result = robust_filter(distances, [500] * 7, [25.0] * 7, TFFilterConfig())
+    assert result.distancia_cm == 100
+    assert result.muestras == 6
+    assert result.descartadas == 1
+
+
+def test_filtro_descarta_senal_baja_y_saturada():
+    distances = [100, 100, 100, 100, 300, 300]
+    strengths = [500, 500, 500, 500, 50, 65535]
+    result = robust_filter(distances, strengths, [25.0] * 6, TFFilterConfig())
+    assert result.distancia_cm == 100
+    assert result.descartadas == 2
+
+
+def test_filtro_sin_tramas_suficientes_retorna_none():
+    assert robust_filter([], [], [], TFFilterConfig()) is None
+    assert robust_filter([100, 100, 100], [10, 10, 10], [25.0] * 3, TFFilterConfig()) is None
+
+
+def test_filtro_media_recortada():
+    config = TFFilterConfig(estimator=ESTIMATOR_TRIMMED_MEAN, trim=0.2)
+    result = robust_filter([100, 101, 102, 103, 104], [500] * 5, [25.0] * 5, config)
+    assert result.distancia_cm == 102
+
+
+@pytest.mark.parametrize("field, value", [("frames", 0), ("frames", 1001), ("window_ms", 5), ("estimator", "mean")])
+def test_config_valida_rangos(field, value):
+    with pytest.raises(ValueError):
+        TFFilterConfig(**{field: value})
@@ -0,0 +1,104 @@
+"""
+Pruebas de las codificaciones del hub WebSocket (delta y binaria) y de la
+agregación por proyecto de las suscripciones con tasa limitada.
+Ejecutar: python -m pytest -q test_ws_codec.py
+"""
+import json
+
+import pytest
+
+from core.ws_codec import DeltaEncoder, decode_binary, encode_binary
+from core.ws_subscription import (
+    AGGREGATE_MEAN, AGGREGATE_MINMAX, Subscription, SubscriptionError, validate_options,
+)
+
+
+def tf_reading(distancia_cm=120, fuerza_senal=800, temperatura=31.5, event=False):
+    return {
+        "id_project": 1, "distancia_cm": distancia_cm, "distancia_m": distancia_cm / 100,
+        "fuerza_senal": fuerza_senal, "temperatura": temperatura, "event": event,
+        "timestamp": 1700000000.25,
+    }
+
+
+def test_delta_envia_keyframe_y_luego_solo_cambios():
+    encoder = DeltaEncoder(keyframe_every=3)
+    first = json.loads(encoder.encode("tfluna", 1, tf_reading()))
+    second = json.loads(encoder.encode("tfluna", 1, tf_reading(fuerza_senal=810)))
+    third = json.loads(encoder.encode("tfluna", 1, tf_reading(fuerza_senal=810)))
+    fourth = json.loads(encoder.encode("tfluna", 1, tf_reading()))
+
+    assert first["type"] == "reading" and first["key"] is True and first["seq"] == 1
+    assert second == {"type": "delta", "topic": "tfluna", "project_id": 1, "seq": 2, "base": 1,
+                      "data": {"fuerza_senal": 810}}
+    assert third["type"] == "delta" and third["data"] == {}
+    assert fourth["type"] == "reading" and fourth["key"] is True and fourth["seq"] == 4
+
+
+def test_delta_separa_proyectos_y_reset_fuerza_keyframe():
+    encoder = DeltaEncoder()
+    encoder.encode("tfluna", 1, tf_reading())
+    other = json.loads(encoder.encode("tfluna", 2, tf_reading()))
+    assert other["type"] == "reading" and other["seq"] == 1
+
+    encoder.reset()
+    again = json.loads(encoder.encode("tfluna", 1, tf_reading()))
+    assert again["type"] == "reading" and again["seq"] == 2  # El seq sigue; solo se fuerza la lectura completa
+
+
+def test_binario_ida_y_vuelta():
+    frame = encode_binary("tfluna", 7, tf_reading(event=True))
+    values = decode_binary(frame)
+    assert values["sensor"] == "tfluna"
+    assert values["id_project"] == 7
+    assert values["event"] is True
+    assert values["distancia_cm"] == 120
+    assert values["fuerza_senal"] == 800
+    assert values["timestamp"] == 1700000000.25
+    assert values["temperatura"] == pytest.approx(31.5)
+
+
+def test_binario_redondea_enteros_agregados_y_marca_laser():
+    frame = encode_binary("tfluna", 1, tf_reading(distancia_cm=120.6))
+    assert decode_binary(frame)["distancia_cm"] == 121
+    imx = decode_binary(encode_binary("imx477", 1, {"laser_detectado": True, "nitidez_score": 2.5}))
+    assert imx["laser_detectado"] is True
+    assert imx["nitidez_score"] == pytest.approx(2.5)
+
+
+def test_binario_sensor_sin_esquema():
+    assert encode_binary("desconocido", 1, {}) is None
+
+
+def test_suscripcion_mean_por_proyecto():
+    subscription = Subscription("tfluna", max_rate=2, aggregate=AGGREGATE_MEAN)
+    subscription.add(tf_reading(distancia_cm=100), project_id=1, seq=1)
+    subscription.add(tf_reading(distancia_cm=200), project_id=2, seq=2)
+    subscription.add(tf_reading(distancia_cm=106), project_id=1, seq=3)
+
+    emissions = subscription.take(now=10.0)
+    assert [e.project_id for e in emissions] == [2, 1]  # Orden de la última lectura de cada proyecto
+    by_project = {e.project_id: e for e in emissions}
+    assert by_project[1].data["distancia_cm"] == 103
+    assert by_project[1].meta == {"mode": AGGREGATE_MEAN, "samples": 2}
+    assert by_project[2].data["distancia_cm"] == 200
+    assert subscription.folded == 1
+    assert subscription.take(now=10.1) == []
+    assert subscription.due_in(now=10.1) == pytest.approx(0.4)
+
+
+def test_suscripcion_minmax():
+    subscription = Subscription("tfluna", max_rate=1, aggregate=AGGREGATE_MINMAX)
+    for distance in (110, 90, 100):
+        subscription.add(tf_reading(distancia_cm=distance), project_id=1)
+    (emission,) = subscription.take(now=1.0)
+    assert emission.data["distancia_cm"] == 100
+    assert emission.meta["min"]["distancia_cm"] == 90
+    assert emission.meta["max"]["distancia_cm"] == 110
+    assert "id_project" not in emission.meta["min"]
+
+
+@pytest.mark.parametrize("max_rate, aggregate", [(-1, None), (500, None), ("rápido", None), (5, "median")])
+def test_opciones_invalidas(max_rate, aggregate):
+    with pytest.raises(SubscriptionError):
+        validate_options(max_rate, aggregate)